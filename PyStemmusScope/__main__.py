@@ -0,0 +1,6 @@
+"""Entry point for `python -m PyStemmusScope`."""
+import sys
+from PyStemmusScope.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,94 @@
+"""Command line interface of PyStemmusScope.
+
+Usage:
+    python -m PyStemmusScope prepare-forcing --workers 8 config_1.txt config_2.txt
+    python -m PyStemmusScope build-era5-store /path/to/global_data
+"""
+import argparse
+import logging
+from pathlib import Path
+from typing import Optional
+from PyStemmusScope import config_io
+from PyStemmusScope import forcing_io
+from PyStemmusScope import global_data as gd
+
+
+def _prepare_forcing(args: argparse.Namespace) -> int:
+    """Prepare the forcing files for all config files, see `prepare_forcing_batch`."""
+    configs = [config_io.read_config(file) for file in args.config_files]
+    results = forcing_io.prepare_forcing_batch(configs, workers=args.workers)
+
+    for file, result in zip(args.config_files, results):
+        status = "ok" if result["success"] else f"FAILED ({result['error']})"
+        print(f"{file}: {result['Location']} {result['duration']:.2f} s {status}")
+    return 0 if all(result["success"] for result in results) else 1
+
+
+def _build_era5_store(args: argparse.Namespace) -> int:
+    """Build the ERA5 and ERA5-land point store, see `era5.build_point_store`."""
+    stores = gd.era5.build_point_store(
+        args.global_data_dir, time_chunk=args.time_chunk, space_chunk=args.space_chunk
+    )
+    for store in stores:
+        print(store)
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the PyStemmusScope command line interface.
+
+    Args:
+        argv: Command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        Exit code: 0 on success, 1 if any of the runs failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m PyStemmusScope",
+        description="Command line tools of PyStemmusScope.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="log info")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    forcing_parser = subparsers.add_parser(
+        "prepare-forcing",
+        help="prepare the forcing files for many config files in parallel",
+        description=(
+            "Prepare the STEMMUS_SCOPE forcing files for many config files. Every "
+            "config file should contain the InputPath to which the forcing files of "
+            "that run are written."
+        ),
+    )
+    forcing_parser.add_argument("config_files", nargs="+", type=Path)
+    forcing_parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="number of worker processes"
+    )
+    forcing_parser.set_defaults(func=_prepare_forcing)
+
+    store_parser = subparsers.add_parser(
+        "build-era5-store",
+        help="rechunk the ERA5 and ERA5-land data for fast extraction of sites",
+        description=(
+            "Rechunk the ERA5 and ERA5-land files in the global data directory into a "
+            "store with long time chunks and small latitude/longitude chunks. The "
+            "store is used in global mode for as long as the files are not modified."
+        ),
+    )
+    store_parser.add_argument("global_data_dir", type=Path)
+    store_parser.add_argument(
+        "--time-chunk",
+        type=int,
+        default=gd.era5.POINT_STORE_TIME_CHUNK,
+        help="length of the chunks along time",
+    )
+    store_parser.add_argument(
+        "--space-chunk",
+        type=int,
+        default=gd.era5.POINT_STORE_SPACE_CHUNK,
+        help="length of the chunks along latitude and longitude",
+    )
+    store_parser.set_defaults(func=_build_era5_store)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    return args.func(args)
@@ -8,11 +8,15 @@ import shutil
 import time
 from pathlib import Path
 from typing import Union
+import numpy as np
 from . import utils
 
 
 logger = logging.getLogger(__name__)
 
+# Name of the config file in the input directory of every grid cell of a bounding box
+BBOX_CELL_CONFIG_FILE = "config.txt"
+
 
 def read_config(config_file: Union[str, Path]) -> dict[str, str]:
     """Read config from given config file.
@@ -56,7 +60,9 @@ def validate_config(config: Union[Path, dict]):
 def create_io_dir(config: dict) -> tuple[Path, Path, Path]:
     """Create input directory and copy required files.
 
-    Work flow executor to create work directory and all sub-directories.
+    Work flow executor to create work directory and all sub-directories. For a
+    bounding box ("bbox") location, an input and output directory (and config file)
+    is created for every grid cell as well, see `bbox_cell_configs`.
 
     Returns:
         Path to input, output directory and config file for every station/forcing.
@@ -70,13 +76,11 @@ def create_io_dir(config: dict) -> tuple[Path, Path, Path]:
         input_dir_name = f"{loc}_{timestamp}"
     elif fmt == "latlon":
         site_name = "global"
-        latstr = f"{loc[0]:.3f}".replace(".", "-")
-        lonstr = f"{loc[1]:.3f}".replace(".", "-")
-        latstr = f"N{latstr}" if loc[0] >= 0 else f"S{latstr[1:]}"  # type: ignore
-        lonstr = f"E{lonstr}" if loc[1] >= 0 else f"W{lonstr[1:]}"  # type: ignore
-        input_dir_name = f"global_{latstr}_{lonstr}_{timestamp}"
+        input_dir_name = f"global_{_latlon_name(loc)}_{timestamp}"  # type: ignore
     else:
-        raise NotImplementedError()
+        site_name = "global"
+        corners = "_".join(_latlon_name(corner) for corner in loc)  # type: ignore
+        input_dir_name = f"global_bbox_{corners}_{timestamp}"
 
     # create input directory
     work_dir = utils.to_absolute_path(config["WorkDir"])
@@ -85,8 +89,9 @@ def create_io_dir(config: dict) -> tuple[Path, Path, Path]:
     message = f"Prepare work directory {input_dir} for the location: {loc}"
     logger.info("%s", message)
 
-    # copy model parameters to work directory
-    _copy_data(input_dir, config)
+    # copy model parameters to work directory, for a bbox to the cell directories
+    if fmt != "bbox":
+        _copy_data(input_dir, config)
 
     # create output directory
     output_dir = work_dir / "output" / input_dir_name
@@ -99,9 +104,77 @@ def create_io_dir(config: dict) -> tuple[Path, Path, Path]:
         input_dir, output_dir, config, site_name, timestamp  # type: ignore
     )
 
+    if fmt == "bbox":
+        for cell_config in bbox_cell_configs(read_config(config_file_path)):
+            _create_cell_io_dir(cell_config)
+
     return input_dir, output_dir, config_file_path
 
 
+def _latlon_name(latlon: utils.LatLonFmt) -> str:
+    """Format a location for a directory name, e.g. "N52-000_W4-050"."""
+    latstr = f"{latlon[0]:.3f}".replace(".", "-")
+    lonstr = f"{latlon[1]:.3f}".replace(".", "-")
+    latstr = f"N{latstr}" if latlon[0] >= 0 else f"S{latstr[1:]}"
+    lonstr = f"E{lonstr}" if latlon[1] >= 0 else f"W{lonstr[1:]}"
+    return f"{latstr}_{lonstr}"
+
+
+def bbox_cell_configs(config: dict) -> list[dict]:
+    """Get the configuration of every model grid cell in a bounding box.
+
+    A bounding box ("bbox") location is run as one model run per grid cell. The
+    cells are the centers of a grid with the resolution of the optional config key
+    `GridResolution` (in degrees, default 0.1), see `utils.bbox_grid_cells`. Every
+    cell gets a "latlon" location, and its own input and output directory within
+    those of the bounding box.
+
+    Args:
+        config: The configuration dictionary of the bounding box, with the input and
+            output directories created by `create_io_dir`.
+
+    Returns:
+        The configuration dictionary of every grid cell.
+    """
+    bbox, fmt = utils.check_location_fmt(config["Location"])
+    if fmt != "bbox":
+        raise ValueError(f"Location '{config['Location']}' is not a bounding box.")
+
+    resolution = float(config.get("GridResolution", utils.DEFAULT_GRID_RESOLUTION))
+    cell_configs = []
+    for lat, lon in utils.bbox_grid_cells(bbox, resolution):  # type: ignore
+        cell_name = f"global_{_latlon_name((lat, lon))}"
+        latstr = np.format_float_positional(lat, trim="-")
+        lonstr = np.format_float_positional(lon, trim="-")
+        cell_configs.append(
+            {
+                **config,
+                "Location": f"({latstr}, {lonstr})",
+                "InputPath": f"{Path(config['InputPath']) / cell_name}/",
+                "OutputPath": f"{Path(config['OutputPath']) / cell_name}/",
+            }
+        )
+    return cell_configs
+
+
+def bbox_cell_config_file(cell_config: dict) -> Path:
+    """Path to the config file of a grid cell, see `bbox_cell_configs`."""
+    return Path(cell_config["InputPath"]) / BBOX_CELL_CONFIG_FILE
+
+
+def _create_cell_io_dir(cell_config: dict) -> None:
+    """Create the input and output directory, and config file, of a grid cell."""
+    input_dir = Path(cell_config["InputPath"])
+    output_dir = Path(cell_config["OutputPath"])
+    input_dir.mkdir(parents=True, exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _copy_data(input_dir, cell_config)
+
+    with bbox_cell_config_file(cell_config).open(mode="w", encoding="utf8") as f:
+        for key, value in cell_config.items():
+            f.write(f"{key}={value}\n")
+
+
 def _copy_data(input_dir: Path, config: dict) -> None:
     """Copy required data to the work directory.
 
@@ -0,0 +1,205 @@
+"""Process-wide pool of opened (multi-file) datasets.
+
+The global data retrieval (`global_data`) and the soil data readers (`soil_io`) open
+the same netCDF files for every model run. In a long-lived process, such as a batch
+driver or a notebook, the files are then opened, and their metadata decoded, again
+for every site. This module keeps the opened datasets in a pool, keyed by the files
+and the open options, so that they are opened once per process.
+
+A file which was modified (by size or modification time) gets a new key, so it is
+opened again. The least recently used datasets are closed when the pool holds more
+than `max_open_files` files. The maximum can be set with the optional config key
+`DatasetPoolMaxFiles`, where 0 disables the pool.
+
+The pool returns a shallow copy of the dataset, which shares the (lazily loaded)
+data with the pooled dataset. Changing the copy, e.g. its attributes, does not
+change the pooled dataset, and closing it does not close the files.
+
+The netCDF-C library is not thread-safe, while the global datasets can be retrieved
+by concurrent threads. xarray serializes the reads of the data, but not the opening
+and closing of the files. The pool therefore opens and closes the files under
+`NETCDF_LOCK`, which the manifests and caches of the global data hold as well when
+they read or write a netCDF file.
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Callable
+from typing import Union
+import xarray as xr
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_OPEN_FILES = 128
+
+# Lock under which netCDF files are opened and closed (reentrant, as xarray may
+# close a cached file while another one is opened).
+NETCDF_LOCK = threading.RLock()
+
+
+def _file_key(path: Union[str, Path]) -> tuple[str, int, int]:
+    """Identify a file by its path, size and modification time."""
+    st = Path(path).stat()
+    return str(Path(path).resolve()), st.st_size, st.st_mtime_ns
+
+
+class DatasetPool:
+    """Pool of opened datasets with LRU eviction by the number of open files."""
+
+    def __init__(self, max_open_files: int = DEFAULT_MAX_OPEN_FILES):
+        """Pool of opened datasets with LRU eviction by the number of open files.
+
+        Args:
+            max_open_files: Maximum total number of files of the pooled datasets. If
+                0, datasets are not pooled.
+        """
+        self.max_open_files = max_open_files
+        self.hits = 0
+        self.misses = 0
+        self._datasets: OrderedDict[tuple, tuple[xr.Dataset, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def open_files(self) -> int:
+        """Total number of files of the pooled datasets."""
+        with self._lock:
+            return sum(nfiles for _, nfiles in self._datasets.values())
+
+    def open_dataset(self, path: Union[str, Path], **options) -> xr.Dataset:
+        """Get a dataset from the pool, or open it with `xr.open_dataset`.
+
+        Args:
+            path: Path to the netCDF file.
+            **options: Keyword arguments of `xr.open_dataset`.
+
+        Returns:
+            A shallow copy of the pooled dataset.
+        """
+        return self._get(
+            "open_dataset",
+            [path],
+            options,
+            lambda: xr.open_dataset(path, **options),
+        )
+
+    def open_mfdataset(
+        self, paths: Iterable[Union[str, Path]], **options
+    ) -> xr.Dataset:
+        """Get a dataset from the pool, or open it with `xr.open_mfdataset`.
+
+        Args:
+            paths: Paths to the netCDF files.
+            **options: Keyword arguments of `xr.open_mfdataset`, e.g. `chunks`.
+
+        Returns:
+            A shallow copy of the pooled dataset.
+        """
+        paths = list(paths)
+        return self._get(
+            "open_mfdataset",
+            paths,
+            options,
+            lambda: xr.open_mfdataset(paths, **options),
+        )
+
+    def evict(self) -> None:
+        """Close the least recently used datasets beyond the maximum of open files."""
+        with self._lock:
+            evicted = self._pop_evicted()
+        _close_datasets(evicted)
+
+    def clear(self) -> None:
+        """Close all pooled datasets."""
+        with self._lock:
+            evicted = [dataset for dataset, _ in self._datasets.values()]
+            self._datasets.clear()
+        _close_datasets(evicted)
+
+    def _pop_evicted(self) -> list[xr.Dataset]:
+        """Remove the datasets to evict from the pool, the lock should be held."""
+        evicted = []
+        total = sum(nfiles for _, nfiles in self._datasets.values())
+        while self._datasets and total > self.max_open_files:
+            _, (dataset, nfiles) = self._datasets.popitem(last=False)
+            logger.debug("Closing pooled dataset of %d file(s)", nfiles)
+            evicted.append(dataset)
+            total -= nfiles
+        return evicted
+
+    def _get(
+        self,
+        opener_name: str,
+        paths: list[Union[str, Path]],
+        options: dict,
+        opener: Callable[[], xr.Dataset],
+    ) -> xr.Dataset:
+        if len(paths) == 0 or len(paths) > self.max_open_files:
+            with NETCDF_LOCK:
+                return opener()
+
+        key = (
+            opener_name,
+            tuple(_file_key(path) for path in paths),
+            json.dumps(options, sort_keys=True, default=str),
+        )
+        with self._lock:
+            if key in self._datasets:
+                self._datasets.move_to_end(key)
+                self.hits += 1
+                return self._datasets[key][0].copy(deep=False)
+            self.misses += 1
+
+        # open outside of the pool lock, so that pooled datasets can be used meanwhile
+        with NETCDF_LOCK:
+            dataset = opener()
+        with self._lock:
+            if key in self._datasets:
+                # opened by another thread in the meantime
+                duplicate, dataset = dataset, self._datasets[key][0]
+                evicted = [duplicate]
+            else:
+                self._datasets[key] = (dataset, len(paths))
+                evicted = self._pop_evicted()
+        _close_datasets(evicted)
+        return dataset.copy(deep=False)
+
+
+def _close_datasets(datasets: list[xr.Dataset]) -> None:
+    """Close the files of the datasets, under the netCDF lock."""
+    with NETCDF_LOCK:
+        for dataset in datasets:
+            dataset.close()
+
+
+_POOL = DatasetPool()
+
+
+def get_dataset_pool() -> DatasetPool:
+    """Get the process-wide dataset pool."""
+    return _POOL
+
+
+def configure_pool(config: dict) -> None:
+    """Set the maximum number of open files of the pool from the config.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary. If it contains the key
+            `DatasetPoolMaxFiles`, the maximum is set to its value.
+    """
+    if config.get("DatasetPoolMaxFiles"):
+        _POOL.max_open_files = int(config["DatasetPoolMaxFiles"])
+        _POOL.evict()
+
+
+def open_dataset(path: Union[str, Path], **options) -> xr.Dataset:
+    """Open a dataset with `xr.open_dataset`, through the process-wide pool."""
+    return _POOL.open_dataset(path, **options)
+
+
+def open_mfdataset(paths: Iterable[Union[str, Path]], **options) -> xr.Dataset:
+    """Open a dataset with `xr.open_mfdataset`, through the process-wide pool."""
+    return _POOL.open_mfdataset(paths, **options)
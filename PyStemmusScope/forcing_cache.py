@@ -0,0 +1,288 @@
+"""Content-addressed cache for the prepared forcing files.
+
+Preparing the forcing input for STEMMUS_SCOPE can take a long time, especially when
+global data is used. When the same site and time range is run again (e.g. with
+different model parameters), the forcing files are identical. This module stores the
+written forcing files in a cache directory, keyed by everything that determines their
+content, and restores them on a subsequent run.
+
+The cache is enabled by setting `ForcingCachePath` in the config file. The maximum
+total size of the cache can be set with `ForcingCacheMaxSize` (e.g. "500MB", "10GB").
+When the cache grows beyond this size, the least recently used entries are removed.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import time
+from pathlib import Path
+from typing import Optional
+from typing import Union
+from PyStemmusScope import utils
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = "10GB"
+ENTRY_METADATA = "entry.json"
+
+_SIZE_UNITS = {"B": 1, "KB": 1e3, "MB": 1e6, "GB": 1e9, "TB": 1e12}
+
+
+def parse_size(size: Union[str, int, float]) -> int:
+    """Parse a size string (e.g. "500MB", "10GB" or "1024") to a number of bytes."""
+    size_str = str(size).strip().upper().replace(" ", "")
+    for unit in sorted(_SIZE_UNITS, key=len, reverse=True):
+        if size_str.endswith(unit):
+            number = size_str[: -len(unit)]
+            try:
+                return int(float(number) * _SIZE_UNITS[unit])
+            except ValueError:
+                break
+    try:
+        return int(float(size_str))
+    except ValueError as err:
+        raise ValueError(
+            f"Invalid size '{size}'. Use a number of bytes, or a number followed by "
+            f"one of the units: {', '.join(_SIZE_UNITS)}."
+        ) from err
+
+
+def fingerprint_path(path: Path) -> dict:
+    """Fingerprint a file or directory by the name, size and mtime of its file(s).
+
+    Args:
+        path: Path to a file, or to a directory which is fingerprinted recursively.
+
+    Returns:
+        Dictionary that changes when any of the files is modified, added or removed.
+    """
+    path = Path(path).resolve()
+    if path.is_file():
+        st = path.stat()
+        return {"path": str(path), "size": st.st_size, "mtime": st.st_mtime_ns}
+
+    digest = hashlib.sha256()
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        st = file.stat()
+        digest.update(
+            f"{file.relative_to(path)}:{st.st_size}:{st.st_mtime_ns}\n".encode()
+        )
+    return {"path": str(path), "files": digest.hexdigest()}
+
+
+def fingerprint_global_data(global_data_dir: Path, lat: float, lon: float) -> dict:
+    """Fingerprint the global data used for the forcing of a site.
+
+    Only the dataset folders (and the DEM and canopy height tiles of the site) which
+    the forcing is extracted from are fingerprinted, so files written elsewhere in
+    the global data directory (e.g. the ERA5 point store) do not change it. The
+    netCDF folders are fingerprinted with their manifest, see
+    `global_data.manifest.DatasetManifest.fingerprint`.
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        lat: Latitude of the site.
+        lon: Longitude of the site.
+
+    Returns:
+        Dictionary that changes when any of the used files is modified, added or
+            removed.
+    """
+    from PyStemmusScope import global_data  # avoid circular import
+
+    global_data_dir = Path(global_data_dir).resolve()
+    fingerprint: dict = {"path": str(global_data_dir)}
+    for folder in ("era5", "era5-land", "co2", "lai", "landcover"):
+        dataset_manifest = global_data.manifest.get_manifest(global_data_dir / folder)
+        fingerprint[folder] = dataset_manifest.fingerprint()
+    for folder, filename in [
+        ("dem", global_data.prism_dem.get_filename_dem(lat, lon)),
+        (
+            "canopy_height",
+            global_data.eth_canopy_height.get_filename_canopy_height(lat, lon),
+        ),
+    ]:
+        fingerprint[folder] = fingerprint_path(global_data_dir / folder / filename)
+    return fingerprint
+
+
+class ForcingCache:
+    """Cache of prepared forcing files with LRU eviction by total size."""
+
+    def __init__(self, cache_dir: Union[str, Path], max_size: Union[str, int]):
+        """Cache of prepared forcing files with LRU eviction by total size.
+
+        Args:
+            cache_dir: Directory in which the cache entries are stored.
+            max_size: Maximum total size of the cache, in bytes or as a size string
+                (e.g. "10GB").
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = parse_size(max_size)
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, config: dict, timestep: str, file_format: str) -> str:
+        """Create the cache key of the forcing files for this config.
+
+        Args:
+            config: The PyStemmusScope configuration dictionary.
+            timestep: The model timestep (or a description of how it is derived).
+            file_format: The format of the forcing files, see `ForcingFormat`.
+
+        Returns:
+            Hexadecimal hash of the forcing source, location, time range, timestep,
+                file format and package version.
+        """
+        import PyStemmusScope  # avoid circular import
+
+        loc, fmt = utils.check_location_fmt(config["Location"])
+        source = (
+            fingerprint_path(utils.get_forcing_file(config))
+            if fmt == "site"
+            else fingerprint_global_data(
+                Path(config["ForcingPath"]), loc[0], loc[1]  # type: ignore
+            )
+        )
+        key_data = {
+            "source": source,
+            "Location": config["Location"],
+            "StartTime": config["StartTime"],
+            "EndTime": config["EndTime"],
+            "timestep": timestep,
+            "format": file_format,
+            "version": PyStemmusScope.__version__,
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def restore(self, key: str, input_path: Path) -> bool:
+        """Hardlink (or copy) the cached forcing files into the input directory.
+
+        Args:
+            key: Cache key, generated by `make_key`.
+            input_path: The model input directory.
+
+        Returns:
+            True on a cache hit, False on a miss.
+        """
+        entry = self.cache_dir / key
+        metadata_file = entry / ENTRY_METADATA
+        if not metadata_file.exists():
+            self.misses += 1
+            self._log("miss", key)
+            return False
+
+        with metadata_file.open(encoding="utf8") as f:
+            metadata = json.load(f)
+        for fname in metadata["files"]:
+            _link_or_copy(entry / fname, Path(input_path) / fname)
+
+        # Update the access time, used for the least-recently-used eviction.
+        os.utime(metadata_file)
+        self.hits += 1
+        self._log("hit", key)
+        return True
+
+    def store(self, key: str, input_path: Path, files: list[str]) -> None:
+        """Add the forcing files in the input directory to the cache.
+
+        Cached files are made read-only, as they can be hardlinked into multiple input
+        directories.
+
+        Args:
+            key: Cache key, generated by `make_key`.
+            input_path: The model input directory containing the forcing files.
+            files: Names of the forcing files to be cached.
+        """
+        entry = self.cache_dir / key
+        if entry.exists():
+            return
+
+        tmp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        tmp_entry.mkdir(parents=True, exist_ok=True)
+        size = 0
+        for fname in files:
+            shutil.copy2(Path(input_path) / fname, tmp_entry / fname)
+            (tmp_entry / fname).chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            size += (tmp_entry / fname).stat().st_size
+        with (tmp_entry / ENTRY_METADATA).open("w", encoding="utf8") as f:
+            json.dump({"files": files, "size": size, "created": time.time()}, f)
+
+        try:
+            tmp_entry.rename(entry)
+        except OSError:  # Entry was created by another process in the meantime.
+            _remove_entry(tmp_entry)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits its max size."""
+        entries = []
+        for metadata_file in self.cache_dir.glob(f"*/{ENTRY_METADATA}"):
+            with metadata_file.open(encoding="utf8") as f:
+                size = json.load(f)["size"]
+            entries.append((metadata_file.stat().st_mtime, size, metadata_file.parent))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            logger.info("Evicting forcing cache entry %s", entry.name)
+            _remove_entry(entry)
+            total_size -= size
+
+    def _log(self, result: str, key: str) -> None:
+        logger.info(
+            "Forcing cache %s for key %s (hits: %d, misses: %d)",
+            result,
+            key[:12],
+            self.hits,
+            self.misses,
+        )
+
+
+_CACHES: dict[Path, ForcingCache] = {}
+
+
+def get_cache(config: dict) -> Optional[ForcingCache]:
+    """Get the forcing cache configured in the config, or None if it is not enabled.
+
+    The same cache object is returned for the same cache directory, so the hit and
+    miss counts accumulate within a process.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Returns:
+        The forcing cache, or None if `ForcingCachePath` is not set.
+    """
+    if not config.get("ForcingCachePath"):
+        return None
+
+    cache_dir = utils.to_absolute_path(config["ForcingCachePath"])
+    max_size = config.get("ForcingCacheMaxSize", DEFAULT_MAX_SIZE)
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = ForcingCache(cache_dir, max_size)
+    else:
+        _CACHES[cache_dir].max_size = parse_size(max_size)
+    return _CACHES[cache_dir]
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hardlink the source file to the destination, copy it if linking fails."""
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _remove_entry(entry: Path) -> None:
+    """Remove a cache entry, including its read-only files."""
+    for file in entry.iterdir():
+        file.chmod(stat.S_IRUSR | stat.S_IWUSR)
+    shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,255 @@
+"""Metadata index of the files in a forcing directory.
+
+Finding the forcing file of a site, and checking if it covers the time range of a
+model run, requires listing the forcing directory and opening the netCDF files. When
+thousands of config files are validated (e.g. before a batch run), this is slow.
+
+This module keeps an index of every forcing directory. Finding the file of a site
+only needs the names of the files, which are listed again only if the directory was
+modified. The site code, time range, timestep and coordinates of a file are read
+when they are requested, and kept together with the size and modification time of
+the file. They are read again only if the file was modified.
+
+By default the index is kept in memory, per process. If the optional config key
+`ForcingIndexPath` is set, the index is stored as a json file in that directory, so
+that it is shared between processes and sessions. This does not need write access
+to the forcing directory.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+from typing import Union
+import numpy as np
+import xarray as xr
+from PyStemmusScope import utils
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+_INDEXES: dict[tuple[Path, Optional[Path]], "ForcingIndex"] = {}
+
+
+def get_index_dir(config: dict) -> Optional[Path]:
+    """Get the directory in which the forcing indexes are stored from the config.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Returns:
+        The directory, or None if `ForcingIndexPath` is not set.
+    """
+    if not config.get("ForcingIndexPath"):
+        return None
+    return utils.to_absolute_path(config["ForcingIndexPath"])
+
+
+def read_file_metadata(forcing_file: Path) -> dict:
+    """Read the site code, time range, timestep and coordinates of a forcing file.
+
+    Args:
+        forcing_file: Path to a PLUMBER2 netCDF forcing file.
+
+    Returns:
+        Dictionary with the metadata of the file. The time range and coordinates are
+            None if the file is not a netCDF file with a time axis.
+    """
+    metadata = {
+        "site": forcing_file.name.split("_")[0],
+        "start": None,
+        "end": None,
+        "timestep": None,
+        "ntime": None,
+        "latitude": None,
+        "longitude": None,
+    }
+    if forcing_file.suffix != ".nc":
+        return metadata
+
+    try:
+        with xr.open_dataset(forcing_file, decode_times=False) as ds:
+            variables = [str(var) for var in ds.variables]
+        keep = {"time", "latitude", "longitude"}
+        with xr.open_dataset(
+            forcing_file, drop_variables=[var for var in variables if var not in keep]
+        ) as ds:
+            time_values = ds["time"].values
+            for coord in ("latitude", "longitude"):
+                if coord in ds:
+                    metadata[coord] = float(ds[coord].values.squeeze())
+    except (OSError, ValueError, KeyError) as err:
+        logger.debug("Could not read the time axis of %s: %s", forcing_file, err)
+        return metadata
+
+    metadata["start"] = str(np.datetime_as_string(time_values[0], unit="s"))
+    metadata["end"] = str(np.datetime_as_string(time_values[-1], unit="s"))
+    metadata["ntime"] = int(time_values.size)
+    if time_values.size > 1:
+        time_delta = (time_values[1] - time_values[0]) / np.timedelta64(1, "s")
+        metadata["timestep"] = float(time_delta)
+    return metadata
+
+
+class ForcingIndex:
+    """Index of the files in a forcing directory, refreshed incrementally."""
+
+    def __init__(
+        self,
+        forcing_path: Union[str, Path],
+        index_dir: Optional[Union[str, Path]] = None,
+    ):
+        """Index of the files in a forcing directory, refreshed incrementally.
+
+        The stored index is loaded if it exists. Call `refresh` to bring it up to date
+        with the directory.
+
+        Args:
+            forcing_path: The forcing directory, `ForcingPath` in the config file.
+            index_dir: Optional directory in which the index is stored. If None, the
+                index is only kept in memory.
+        """
+        self.forcing_path = Path(forcing_path).resolve()
+        self.index_file: Optional[Path] = None
+        if index_dir is not None:
+            key = hashlib.sha256(str(self.forcing_path).encode()).hexdigest()[:16]
+            self.index_file = Path(index_dir) / f"{key}.json"
+        self.files: dict[str, dict] = {}
+        self._dir_mtime: Optional[int] = None
+
+        if self.index_file is not None and self.index_file.exists():
+            try:
+                with self.index_file.open(encoding="utf8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            if stored.get("version") == INDEX_VERSION:
+                self.files = stored["files"]
+
+    def refresh(self) -> None:
+        """Update the index for files which were added or removed.
+
+        No files are opened: the metadata of a file is only read by `entry`. The
+        directory is listed again only if its modification time changed since the
+        last refresh.
+        """
+        dir_mtime = self.forcing_path.stat().st_mtime_ns
+        if dir_mtime == self._dir_mtime:
+            return
+
+        changed = False
+        names = set()
+        with os.scandir(self.forcing_path) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                names.add(entry.name)
+                if entry.name not in self.files:
+                    self.files[entry.name] = {}
+                    changed = True
+
+        for name in set(self.files) - names:
+            del self.files[name]
+            changed = True
+
+        self._dir_mtime = dir_mtime
+        if changed:
+            self.save()
+
+    def entry(self, fname: str) -> dict:
+        """Get the metadata of a file, reading it if it is new or the file changed.
+
+        Args:
+            fname: Name of the file in the forcing directory.
+
+        Returns:
+            Dictionary with the metadata of the file, see `read_file_metadata`.
+        """
+        if self._update_entry(fname, (self.forcing_path / fname).stat()):
+            self.save()
+        return self.files[fname]
+
+    def find_site(self, location: str) -> Path:
+        """Find the forcing file of a site, by the names of the files.
+
+        Args:
+            location: Site name, e.g. "DE-Kli".
+
+        Returns:
+            Path to the forcing file.
+        """
+        self.refresh()
+        forcing_file = [name for name in sorted(self.files) if location in name]
+        if not forcing_file:
+            raise ValueError(
+                f"Forcing file does not exist for the given site {location}."
+            )
+        if len(forcing_file) > 1:
+            raise ValueError(
+                f"Multiple forcing files exist for the given site {location}."
+                + "Please check your forcing files and remove the redundant files."
+            )
+        return self.forcing_path / forcing_file[0]
+
+    def save(self) -> None:
+        """Write the index to the index directory, if the index is stored.
+
+        If the index directory is not writable, the index is only kept in memory.
+        """
+        if self.index_file is None:
+            return
+        tmp_file = self.index_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open("w", encoding="utf8") as f:
+                json.dump(
+                    {
+                        "version": INDEX_VERSION,
+                        "forcing_path": str(self.forcing_path),
+                        "files": self.files,
+                    },
+                    f,
+                )
+            tmp_file.replace(self.index_file)
+        except OSError as err:
+            logger.debug("Could not write the forcing index %s: %s", tmp_file, err)
+
+    def _update_entry(self, fname: str, st: os.stat_result) -> bool:
+        """Read the metadata of a file if it was not read or is modified.
+
+        Returns if the metadata was read.
+        """
+        entry = self.files.get(fname, {})
+        if entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime_ns:
+            return False
+
+        metadata = read_file_metadata(self.forcing_path / fname)
+        self.files[fname] = {"size": st.st_size, "mtime": st.st_mtime_ns, **metadata}
+        return True
+
+
+def get_index(
+    forcing_path: Union[str, Path], index_dir: Optional[Union[str, Path]] = None
+) -> ForcingIndex:
+    """Get the (refreshed) index of a forcing directory.
+
+    The same index object is returned for the same directory within a process.
+
+    Args:
+        forcing_path: The forcing directory, `ForcingPath` in the config file.
+        index_dir: Optional directory in which the index is stored, see
+            `get_index_dir`. If None, the index is only kept in memory.
+
+    Returns:
+        The forcing index of the directory.
+    """
+    forcing_path = Path(forcing_path).resolve()
+    key = (forcing_path, None if index_dir is None else Path(index_dir))
+    if key not in _INDEXES:
+        _INDEXES[key] = ForcingIndex(forcing_path, index_dir)
+    index = _INDEXES[key]
+    index.refresh()
+    return index
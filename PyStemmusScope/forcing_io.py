@@ -1,15 +1,102 @@
 """Module for forcing data input and output operations."""
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
+from typing import Optional
+from typing import Union
 import dask
+import h5py
 import hdf5storage
+import netCDF4
 import numpy as np
+import pandas as pd
 import xarray as xr
+from PyStemmusScope import config_io
+from PyStemmusScope import dataset_pool
+from PyStemmusScope import forcing_cache
+from PyStemmusScope import forcing_index
 from PyStemmusScope import global_data
 from PyStemmusScope import utils
 from PyStemmusScope import variable_conversion as vc
 
 
-def _write_matlab_ascii(fname, data, ncols):
+logger = logging.getLogger(__name__)
+
+FORCING_FORMATS = ("ascii", "mat", "binary")
+
+# Columns of the binary forcing time series: variable name, model name and units.
+TIMESERIES_COLUMNS = [
+    ("doy_float", "t", "day of year"),
+    ("t_air_celcius", "Ta", "degC"),
+    ("rh", "RH", "%"),
+    ("wind_speed", "u", "m s-1"),
+    ("psurf_hpa", "p", "hPa"),
+    ("precip_conv", "Pre", "cm s-1"),
+    ("sw_down", "Rin", "W m-2"),
+    ("lw_down", "Rli", "W m-2"),
+    ("vpd", "VPD", "hPa"),
+    ("lai", "LAI", "m2 m-2"),
+    ("co2_conv", "CO2", "mg m-3"),
+    ("ea", "ea", "hPa"),
+    ("year", "year", "-"),
+]
+
+# Single-column ascii files: variable name and file name.
+DAT_FILES = {
+    "doy_float": "t_.dat",
+    "t_air_celcius": "Ta_.dat",
+    "sw_down": "Rin_.dat",
+    "lw_down": "Rli_.dat",
+    "psurf_hpa": "p_.dat",
+    "wind_speed": "u_.dat",
+    "co2_conv": "CO2_.dat",
+    "ea": "ea_.dat",
+    "year": "year_.dat",
+}
+
+# Forcing variables needed by `save.to_netcdf`, stored next to the forcing files so
+#  they do not have to be read from the forcing data again after the model run.
+POSTPROCESSING_FILE = "forcing_postprocessing.nc"
+POSTPROCESSING_VARIABLES = [
+    "rh",
+    "sw_down",
+    "lw_down",
+    "Qair",
+    "t_air_celcius",
+    "psurf_hpa",
+    "wind_speed",
+    "precip_conv",
+]
+# Fixed time encoding of the post-processing file, so that appended times are exact
+POSTPROCESSING_TIME_ENCODING = {
+    "units": "seconds since 1970-01-01",
+    "calendar": "proleptic_gregorian",
+    "dtype": "int64",
+}
+
+# Description of the prepared forcing files, used to extend them incrementally.
+FORCING_STATE_FILE = "forcing_state.json"
+_FORCING_STATE_KEYS = ("Location", "StartTime", "EndTime")
+
+DEFAULT_GLOBAL_TIMESTEP = "1800s"
+
+# Number of existing timesteps that `extend_forcing` compares with the forcing data
+EXTEND_OVERLAP_TIMESTEPS = 48
+
+MATLAB_ASCII_FMT = " %14.7e"
+_MANTISSA_DIGITS = 8  # Number of significant digits of the "%14.7e" format.
+
+
+def _write_matlab_ascii(fname, data, ncols, engine: str = "buffer", append=False):
     """Write data in the Matlab ascii format.
 
     Equivalent to `save([-], '-ascii')` in Matlab.
@@ -19,11 +106,160 @@ def _write_matlab_ascii(fname, data, ncols):
         data (np.array): Array with data to write to file
         ncols (int, optional): The number of data columns, required to correctly format
             the ascii file when writing multiple variables.
+        engine: Either "buffer" (default) or "savetxt". The "buffer" engine formats
+            all values with vectorized numpy operations and writes the file at once,
+            "savetxt" formats the file row by row with `np.savetxt`. Both engines
+            produce identical files.
+        append: If True, append the data to the file instead of overwriting it.
+    """
+    if engine not in ("buffer", "savetxt"):
+        raise ValueError(
+            f"Unknown engine '{engine}'. Choose either 'buffer' or 'savetxt'."
+        )
+
+    contents = _format_matlab_ascii(data, ncols) if engine == "buffer" else None
+    with Path(fname).open("ab" if append else "wb") as f:
+        if contents is not None:
+            f.write(contents)
+        else:
+            multi_fmt = [MATLAB_ASCII_FMT] * ncols
+            multi_fmt[0] = f" {multi_fmt[0]}"
+            np.savetxt(f, data, multi_fmt)
+
+
+def _format_matlab_ascii(data, ncols: int) -> Optional[np.ndarray]:
+    """Format data in the Matlab ascii format into a single byte buffer.
+
+    The result is byte-for-byte identical to the output of `np.savetxt` with the
+    `" %14.7e"` format, as used by `_write_matlab_ascii`. Every field consists of 16
+    characters (two spaces and the 14 character wide number), which are assembled
+    from four 4-byte words looked up from precomputed tables. This way a whole column
+    is formatted at once with a few numpy gathers.
+
+    Values for which the float arithmetic can not be trusted to round the same way
+    as printf (ties, nan and inf) are formatted by Python instead.
+
+    Args:
+        data: Array (1D for a single column, or 2D) with data to format.
+        ncols: The number of data columns.
+
+    Returns:
+        Array of bytes with the file contents, or None if the data can not be
+            represented in the fixed-width layout (exponents of three digits).
+    """
+    values = np.asarray(data, dtype=np.float64)
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+    if values.ndim != 2 or values.shape[1] != ncols:
+        raise ValueError(
+            f"Data with shape {np.shape(data)} does not have {ncols} column(s)."
+        )
+
+    nrows = values.shape[0]
+    words = np.empty((nrows, ncols, 4), dtype=np.uint32)
+    for col in range(ncols):
+        if not _format_scientific_column(values[:, col], words[:, col]):
+            return None
+
+    buffer = np.empty((nrows, ncols * 16 + 1), dtype=np.uint8)
+    buffer[:, :-1] = words.view(np.uint8).reshape(nrows, ncols * 16)
+    buffer[:, -1] = ord("\n")
+    return buffer
+
+
+@functools.lru_cache(maxsize=1)
+def _matlab_ascii_tables() -> dict[str, np.ndarray]:
+    """Lookup tables with the 4-character words that make up a formatted field.
+
+    A field "  -1.2345678e+01" is split up into the words "  -1", ".234", "5678" and
+    "e+01".
+    """
+
+    def as_words(strings):
+        return np.frombuffer("".join(strings).encode("ascii"), dtype=np.uint32)
+
+    return {
+        "lead": as_words(f"  {sign}{digit}" for sign in " -" for digit in range(10)),
+        "fraction": as_words(f".{i:03d}" for i in range(1000)),
+        "digits": as_words(f"{i:04d}" for i in range(10000)),
+        "exponent": as_words(f"e{i:+03d}" for i in range(-99, 100)),
+    }
+
+
+def _scale_to_mantissa(absval: np.ndarray, exponent: np.ndarray) -> np.ndarray:
+    """Scale values to have `_MANTISSA_DIGITS` digits before the decimal point.
+
+    Powers of ten up to 1e22 are exact in float64, so for the range of exponents that
+    fit the Matlab ascii layout the scaling only introduces a single rounding error.
+    """
+    shift = exponent - (_MANTISSA_DIGITS - 1)
+    with np.errstate(over="ignore"):
+        return np.where(
+            shift >= 0,
+            absval / 10.0 ** np.abs(shift),
+            absval * 10.0 ** np.abs(shift),
+        )
+
+
+def _is_near_tie(scaled: np.ndarray) -> np.ndarray:
+    """Check which scaled values are (almost) halfway between two mantissas.
+
+    The rounding of these values depends on the exact decimal value of the float,
+    which only printf-style formatting resolves correctly.
+    """
+    return np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+
+def _format_scientific_column(values: np.ndarray, out: np.ndarray) -> bool:
+    """Format a column of values as "  %14.7e" into the words array `out`.
+
+    Args:
+        values: 1D float64 array with the values to format.
+        out: uint32 array of shape (len(values), 4) to write the formatted fields to.
+
+    Returns:
+        False if a value can not be formatted with a two-digit exponent.
     """
-    matlab_fmt = " %14.7e"
-    multi_fmt = [matlab_fmt] * ncols
-    multi_fmt[0] = f" {multi_fmt[0]}"
-    np.savetxt(fname, data, multi_fmt)
+    finite = np.isfinite(values)
+    absval = np.abs(np.where(finite, values, 0.0))
+    nonzero = absval != 0.0
+
+    exponent = np.floor(np.log10(np.where(nonzero, absval, 1.0))).astype(np.int64)
+    if np.any(np.abs(exponent) > 100):
+        return False
+
+    # log10 can be off by one close to powers of ten; correct the exponent if the
+    # rounded mantissa ends up with too many or too few digits.
+    scaled = _scale_to_mantissa(absval, exponent)
+    mantissa = np.rint(scaled)
+    ambiguous = _is_near_tie(scaled)
+    too_large = mantissa >= 10**_MANTISSA_DIGITS
+    too_small = nonzero & (mantissa < 10 ** (_MANTISSA_DIGITS - 1))
+    if np.any(too_large | too_small):
+        exponent = exponent + too_large - too_small
+        scaled = _scale_to_mantissa(absval, exponent)
+        mantissa = np.rint(scaled)
+        ambiguous |= _is_near_tie(scaled)
+
+    if np.any(np.abs(exponent) > 99):
+        return False
+
+    tables = _matlab_ascii_tables()
+    high, low = np.divmod(mantissa.astype(np.int64), 10000)
+    lead, fraction = np.divmod(high, 1000)
+    out[:, 0] = tables["lead"][np.signbit(values) * 10 + lead]
+    out[:, 1] = tables["fraction"][fraction]
+    out[:, 2] = tables["digits"][low]
+    out[:, 3] = tables["exponent"][exponent + 99]
+
+    (fallback,) = np.nonzero(~finite | ambiguous)
+    for idx in fallback:
+        formatted = (MATLAB_ASCII_FMT % values[idx]).encode("ascii")
+        if len(formatted) != 15:
+            return False
+        out[idx] = np.frombuffer(b" " + formatted, dtype=np.uint32)
+
+    return True
 
 
 def read_forcing_data_plumber2(forcing_file: Path, start_time: str, end_time: str):
@@ -109,13 +345,187 @@ def read_forcing_data_plumber2(forcing_file: Path, start_time: str, end_time: st
     return data
 
 
+# Variables read from the PLUMBER2 forcing files.
+PLUMBER2_TIMESERIES_VARIABLES = [
+    "Tair",
+    "Psurf",
+    "CO2air",
+    "Precip",
+    "LWdown",
+    "SWdown",
+    "Wind",
+    "RH",
+    "VPD",
+    "LAI",
+    "Qair",
+]
+PLUMBER2_STATIC_VARIABLES = [
+    "latitude",
+    "longitude",
+    "elevation",
+    "IGBP_veg_long",
+    "reference_height",
+    "canopy_height",
+]
+
+
+@functools.lru_cache(maxsize=32)
+def _plumber2_file_info(
+    forcing_file: Path, mtime: int, size: int
+) -> tuple[list[str], np.ndarray]:
+    """Get the variable names and the decoded time axis of a PLUMBER2 file.
+
+    The result is cached per file; the modification time and size are part of the
+    cache key so that a changed file is read again.
+    """
+    with xr.open_dataset(forcing_file, decode_times=False) as ds:
+        variables = [str(var) for var in ds.variables]
+    with xr.open_dataset(
+        forcing_file, drop_variables=[var for var in variables if var != "time"]
+    ) as ds:
+        time_axis = ds["time"].values
+    time_axis.flags.writeable = False
+    return variables, time_axis
+
+
+def read_forcing_data_plumber2_lean(
+    forcing_file: Path, start_time: str, end_time: str
+) -> dict:
+    """Read the PLUMBER2 forcing data with minimal memory use.
+
+    Equivalent to `read_forcing_data_plumber2`, but only the required variables are
+    opened, the time range is selected by index (using a cached time axis) before any
+    data is read, and the time series are stored in preallocated arrays, one per
+    dtype. The time series and unit conversions keep the precision of the source
+    data, so the values and dtypes are identical to those of
+    `read_forcing_data_plumber2`.
+
+    Note that the time series are returned as numpy arrays instead of DataArrays,
+    except for "time".
+
+    Args:
+        forcing_file: Path to the netCDF file containing the forcing data
+        start_time: Start of time range in ISO format string, e.g. ,
+            'YYYY-MM-DDTHH:MM:SS'.
+        end_time: End of time range in ISO format string, e.g.,
+            'YYYY-MM-DDTHH:MM:SS'.
+
+    Returns:
+        dict: Dictionary containing the different variables required by STEMMUS_SCOPE
+            for the different forcing files.
+    """
+    forcing_file = Path(forcing_file)
+    st = forcing_file.stat()
+    variables, time_axis = _plumber2_file_info(forcing_file, st.st_mtime_ns, st.st_size)
+    time_slice = _time_slice(time_axis, start_time, end_time)
+    time_values = time_axis[time_slice]
+
+    keep_variables = PLUMBER2_TIMESERIES_VARIABLES + PLUMBER2_STATIC_VARIABLES
+    with xr.open_dataset(
+        forcing_file,
+        decode_times=False,
+        drop_variables=[var for var in variables if var not in keep_variables],
+    ) as ds_file:
+        ds_forcing = ds_file.isel(time=time_slice).squeeze(["x", "y"])
+
+        def read(var):
+            return ds_forcing[var].values
+
+        # The time series with the source variable that determines their dtype
+        source_variables = {
+            "t_air_celcius": "Tair",
+            "psurf_hpa": "Psurf",
+            "co2_conv": "CO2air",
+            "precip_conv": "Precip",
+            "lw_down": "LWdown",
+            "sw_down": "SWdown",
+            "wind_speed": "Wind",
+            "rh": "RH",
+            "vpd": "VPD",
+            "lai": "LAI",
+            "ea": "RH",
+            "Qair": "Qair",
+        }
+        dtypes = {"doy_float": np.dtype(np.float64), "year": np.dtype(np.float64)}
+        dtypes.update(
+            {key: ds_forcing[var].dtype for key, var in source_variables.items()}
+        )
+        blocks: dict = {}
+        for dtype in dict.fromkeys(dtypes.values()):
+            keys = [key for key, key_dtype in dtypes.items() if key_dtype == dtype]
+            block = np.empty((len(keys), time_values.size), dtype=dtype)
+            blocks.update(zip(keys, block))
+        data: dict = {key: blocks[key] for key in dtypes}
+
+        # Expected time format is days (as floating point) since Jan 1st 00:00.
+        time_index = pd.DatetimeIndex(time_values)
+        data["doy_float"][:] = (
+            time_index.dayofyear.values
+            - 1
+            + time_index.hour.values / 24
+            + time_index.minute.values / 60 / 24
+        )
+        data["year"][:] = time_index.year.values
+
+        data["t_air_celcius"][:] = read("Tair") - 273.15  # conversion from K to degC.
+        data["psurf_hpa"][:] = read("Psurf") / 100  # conversion from Pa to hPa
+        data["co2_conv"][:] = (
+            vc.co2_molar_fraction_to_kg_per_m3(
+                read("CO2air") * 1e-6  # ppm -> molar fraction
+            )
+            * 1e6
+        )  # kg/m3 -> mg/m3
+        data["precip_conv"][:] = read("Precip") / 10  # conversion from mm/s to cm/s
+        data["lw_down"][:] = read("LWdown")
+        data["sw_down"][:] = read("SWdown")
+        data["wind_speed"][:] = vc.mask_data(read("Wind"), min_value=0.05)
+        rh = read("RH")
+        data["rh"][:] = rh
+        data["vpd"][:] = read("VPD")
+        data["lai"][:] = vc.mask_data(read("LAI"), min_value=0.01)
+        data["Qair"][:] = read("Qair")
+
+        # calculate ea, conversion from kPa to hPa. Use the air temperature in the
+        # precision of the source data, to match `read_forcing_data_plumber2`.
+        t_air_celcius = data["t_air_celcius"].astype(rh.dtype)
+        data["ea"][:] = vc.calculate_ea(t_air_celcius, rh) * 10
+        del rh, t_air_celcius
+
+        # Load in non-timedependent variables
+        data["sitename"] = forcing_file.name.split("_")[0]
+
+        # Forcing data timestep size in seconds
+        time_delta = (time_axis[1] - time_axis[0]) / np.timedelta64(1, "s")
+        data["DELT"] = time_delta.astype(float)
+        data["total_timesteps"] = time_values.size
+
+        data["latitude"] = read("latitude")
+        data["longitude"] = read("longitude")
+        data["elevation"] = read("elevation")
+        data["IGBP_veg_long"] = np.repeat(read("IGBP_veg_long"), time_values.size).T
+        data["reference_height"] = read("reference_height")
+        data["canopy_height"] = read("canopy_height")
+
+    # needed by save.py
+    data["time"] = xr.DataArray(
+        time_values, coords={"time": time_values}, dims="time", name="time"
+    )
+
+    return data
+
+
 def read_forcing_data_global(  # noqa:PLR0913 (too many arguments)
     global_data_dir: Path,
     lat: float,
     lon: float,
     start_time: np.datetime64,
     end_time: np.datetime64,
-    timestep: str = "1800s",
+    timestep: str = DEFAULT_GLOBAL_TIMESTEP,
+    *,
+    workers: int = 1,
+    timeout: Union[None, float, dict[str, float]] = None,
+    cache: Optional[global_data.point_cache.PointCache] = None,
+    execution: Optional[global_data.dask_execution.DaskExecution] = None,
 ) -> dict:
     """Read forcing data for a certain location, based on global datasets.
 
@@ -127,6 +537,14 @@ def read_forcing_data_global(  # noqa:PLR0913 (too many arguments)
         end_time: End time of the model run.
         timestep: Desired timestep of the model, this is derived from the forcing data.
             In a pandas-timedelta compatible format. Defaults to "1800S" (half an hour).
+        workers: Maximum number of global datasets retrieved at the same time, see
+            `global_data.collect_datasets`.
+        timeout: Optional maximum time in seconds to wait for the datasets, for all
+            datasets or per dataset name, see `global_data.collect_datasets`.
+        cache: Optional cache of the extracted point series, see
+            `global_data.point_cache`.
+        execution: Optional dask execution of the global datasets, see
+            `global_data.dask_execution.get_execution`.
 
     Returns:
         Dictionary containing the forcing data.
@@ -138,33 +556,27 @@ def read_forcing_data_global(  # noqa:PLR0913 (too many arguments)
             latlon=(lat, lon),
             time_range=(start_time, end_time),
             timestep=timestep,
+            workers=workers,
+            timeout=timeout,
+            cache=cache,
+            execution=execution,
         )
 
 
-def write_dat_files(data: dict, input_dir: Path):
+def write_dat_files(data: dict, input_dir: Path, append: bool = False):
     """Fuction to write the single-data .dat files for the STEMMUS_SCOPE matlab model.
 
     Args:
         data: Data dictionary generated by read_forcing
         input_dir: Directory to which the different single-column .dat files should be
             written to.
+        append: If True, append the data to existing files.
     """
-    write_info = {
-        "doy_float": "t_.dat",
-        "t_air_celcius": "Ta_.dat",
-        "sw_down": "Rin_.dat",
-        "lw_down": "Rli_.dat",
-        "psurf_hpa": "p_.dat",
-        "wind_speed": "u_.dat",
-        "co2_conv": "CO2_.dat",
-        "ea": "ea_.dat",
-        "year": "year_.dat",
-    }
-    for var, fname in write_info.items():
-        _write_matlab_ascii(input_dir / fname, data[var], ncols=1)
+    for var, fname in DAT_FILES.items():
+        _write_matlab_ascii(input_dir / fname, data[var], ncols=1, append=append)
 
 
-def write_lai_file(data: dict, fpath: Path):
+def write_lai_file(data: dict, fpath: Path, append: bool = False):
     """Write the ascii LAI_.dat file for STEMMUS_SCOPE.
 
     Args:
@@ -172,12 +584,13 @@ def write_lai_file(data: dict, fpath: Path):
             function `read_forcing_data`.
         fpath: Full path, including filename, to which the file should be
             written to.
+        append: If True, append the data to an existing file.
     """
     lai_file_data = np.vstack([data["doy_float"], data["lai"]]).T
-    _write_matlab_ascii(fpath, lai_file_data, ncols=2)
+    _write_matlab_ascii(fpath, lai_file_data, ncols=2, append=append)
 
 
-def write_meteo_file(data: dict, fpath: Path):
+def write_meteo_file(data: dict, fpath: Path, append: bool = False):
     """Write the ascii Mdata.txt meteo file for STEMMUS_SCOPE.
 
     Args:
@@ -185,6 +598,7 @@ def write_meteo_file(data: dict, fpath: Path):
             function `read_forcing_data`.
         fpath: Full path, including filename, to which the file should be
             written to.
+        append: If True, append the data to an existing file.
     """
     meteo_data_vars = [
         "doy_float",
@@ -199,7 +613,96 @@ def write_meteo_file(data: dict, fpath: Path):
         "lai",
     ]
     meteo_file_data = np.vstack([data[var] for var in meteo_data_vars]).T
-    _write_matlab_ascii(fpath, meteo_file_data, ncols=len(meteo_data_vars))
+    _write_matlab_ascii(
+        fpath, meteo_file_data, ncols=len(meteo_data_vars), append=append
+    )
+
+
+def write_timeseries_file(
+    data: dict, input_path: Path, file_format: str, append: bool = False
+):
+    """Write all forcing time series to a single binary file for STEMMUS_SCOPE.
+
+    This is an alternative to the ascii files written by `write_dat_files`,
+    `write_lai_file` and `write_meteo_file`. The time series are stored as one
+    (time, column) float64 matrix, either in the Matlab binary file (v7.3)
+    'forcing_timeseries.mat' (format "mat"), or as raw little-endian float64 values in
+    row-major order in 'forcing_timeseries.bin' (format "binary"). In both cases a
+    manifest describing the column order is written to 'forcing_timeseries.json'.
+
+    Args:
+        data: Dictionary containing the required variables. Generated by the
+            function `read_forcing_data`.
+        input_path: Path to which the files should be written to.
+        file_format: Either "mat" or "binary".
+        append: If True, append the time series to the existing file.
+    """
+    if file_format not in ("mat", "binary"):
+        raise ValueError(
+            f"Unknown binary forcing format '{file_format}'. "
+            "Choose either 'mat' or 'binary'."
+        )
+
+    ncols = len(TIMESERIES_COLUMNS)
+    nrows = int(data["total_timesteps"])
+    timeseries = np.empty((nrows, ncols), dtype="<f8")
+    for col, (var, _, _) in enumerate(TIMESERIES_COLUMNS):
+        timeseries[:, col] = data[var]
+
+    manifest_file = input_path / "forcing_timeseries.json"
+    if append:
+        with manifest_file.open(encoding="utf8") as f:
+            total_rows = json.load(f)["shape"][0] + nrows
+    else:
+        total_rows = nrows
+
+    if file_format == "mat":
+        fname = "forcing_timeseries.mat"
+        if not append:
+            _create_timeseries_matfile(input_path / fname)
+        # Matlab matrices are column-major, so they are stored transposed in HDF5.
+        with h5py.File(input_path / fname, "a") as f:
+            dataset = f["forcing"]
+            dataset.resize(total_rows, axis=1)
+            dataset[:, total_rows - nrows :] = timeseries.T
+    else:
+        fname = "forcing_timeseries.bin"
+        with (input_path / fname).open("ab" if append else "wb") as f:
+            f.write(timeseries.tobytes(order="C"))
+
+    manifest = {
+        "format": file_format,
+        "file": fname,
+        "dtype": "float64",
+        "byteorder": "little",
+        "order": "C",
+        "shape": [total_rows, ncols],
+        "columns": [
+            {"index": col + 1, "name": name, "variable": var, "units": units}
+            for col, (var, name, units) in enumerate(TIMESERIES_COLUMNS)
+        ],
+    }
+    with manifest_file.open("w", encoding="utf8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _create_timeseries_matfile(fpath: Path) -> None:
+    """Create the Matlab v7.3 file with an empty, resizable 'forcing' matrix."""
+    hdf5storage.savemat(
+        fpath,
+        {"columns": [name for _, name, _ in TIMESERIES_COLUMNS]},
+        appendmat=False,
+    )
+    utils.remove_dates_from_header(fpath)
+    with h5py.File(fpath, "a") as f:
+        dataset = f.create_dataset(
+            "forcing",
+            shape=(len(TIMESERIES_COLUMNS), 0),
+            maxshape=(len(TIMESERIES_COLUMNS), None),
+            chunks=(len(TIMESERIES_COLUMNS), 8192),
+            dtype="<f8",
+        )
+        dataset.attrs["MATLAB_class"] = np.bytes_("double")
 
 
 def prepare_global_variables(data: dict, input_path: Path):
@@ -233,81 +736,771 @@ def prepare_global_variables(data: dict, input_path: Path):
     utils.remove_dates_from_header(input_path / "forcing_globals.mat")
 
 
-def prepare_forcing(config: dict) -> None:
-    """Prepare the forcing files required by STEMMUS_SCOPE.
+def _postprocessing_dataset(data: dict) -> xr.Dataset:
+    """Collect the forcing variables needed by `save.to_netcdf` in a dataset."""
+    return xr.Dataset(
+        {var: ("time", np.asarray(data[var])) for var in POSTPROCESSING_VARIABLES},
+        coords={"time": np.asarray(data["time"])},
+        attrs={
+            "latitude": np.asarray(data["latitude"])[()],
+            "longitude": np.asarray(data["longitude"])[()],
+        },
+    )
 
-    The input directory should be taken from the model configuration file.
-    A subset of forcing file will be generated if the time range is covered
-    by the time of existing forcing file.
+
+def write_postprocessing_file(
+    dataset: xr.Dataset, input_path: Path, append: bool = False
+) -> None:
+    """Write the forcing variables needed by `save.to_netcdf` to the input directory.
+
+    The time dimension of the file is unlimited, so that later timesteps can be
+    appended in place, without reading the existing data.
 
     Args:
-        config (dict): The PyStemmusScope configuration dictionary.
+        dataset: Dataset generated from the forcing data by `_postprocessing_dataset`.
+        input_path: The model input directory.
+        append: If True, append the timesteps to the existing file.
     """
-    input_path = Path(config["InputPath"])
+    fname = Path(input_path) / POSTPROCESSING_FILE
+    if append:
+        with netCDF4.Dataset(fname, "a") as nc:
+            if nc.dimensions["time"].isunlimited():
+                start = nc.dimensions["time"].size
+                end = start + dataset["time"].size
+                time_var = nc.variables["time"]
+                time_var[start:end] = netCDF4.date2num(
+                    pd.to_datetime(dataset["time"].values).to_pydatetime(),
+                    time_var.units,
+                    time_var.calendar,
+                )
+                for var in POSTPROCESSING_VARIABLES:
+                    nc.variables[var][start:end] = dataset[var].values
+                return
+
+        # Written by an older version of PyStemmusScope, rewrite it as a whole.
+        with xr.open_dataset(fname) as ds_file:
+            dataset = xr.concat([ds_file.load(), dataset], dim="time")
+
+    dataset.to_netcdf(
+        fname, unlimited_dims=["time"], encoding={"time": POSTPROCESSING_TIME_ENCODING}
+    )
+
 
+def read_postprocessing_file(input_path: Path) -> Optional[dict]:
+    """Read the forcing variables needed by `save.to_netcdf` from the input directory.
+
+    Args:
+        input_path: The model input directory.
+
+    Returns:
+        Dictionary with the time, latitude, longitude and the variables in
+            `POSTPROCESSING_VARIABLES`, or None if the file does not exist (e.g.
+            for input directories prepared by an older version of PyStemmusScope).
+    """
+    fname = Path(input_path) / POSTPROCESSING_FILE
+    if not fname.exists():
+        return None
+
+    with xr.open_dataset(fname) as ds_file:
+        ds = ds_file.load()
+    data = {var: ds[var] for var in POSTPROCESSING_VARIABLES}
+    data["time"] = ds["time"]
+    data["latitude"] = ds.attrs["latitude"]
+    data["longitude"] = ds.attrs["longitude"]
+    return data
+
+
+def get_forcing_format(config: dict) -> str:
+    """Get the forcing file format from the config, defaults to "ascii"."""
+    file_format = config.get("ForcingFormat", "ascii")
+    if file_format not in FORCING_FORMATS:
+        raise ValueError(
+            f"Invalid value '{file_format}' for `ForcingFormat` in the config file. "
+            f"Valid options are: {', '.join(FORCING_FORMATS)}."
+        )
+    return file_format
+
+
+def read_forcing(config: dict) -> dict:
+    """Read the forcing data for the location and time range in the config.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Returns:
+        Dictionary containing the different variables required by STEMMUS_SCOPE
+            for the different forcing files.
+    """
     loc, fmt = utils.check_location_fmt(config["Location"])
 
     if fmt == "site":
         forcing_file = utils.get_forcing_file(config)
-        data = read_forcing_data_plumber2(
+        return read_forcing_data_plumber2_lean(
             forcing_file=forcing_file,
             start_time=config["StartTime"],
             end_time=config["EndTime"],
         )
 
-    elif fmt == "latlon":
-        if config["StartTime"] == "NA" or config["EndTime"] == "NA":
-            raise ValueError(
-                "'NA' as start or end time is not supported in 'global' mode. Please "
-                "specify a start and end time."
-            )
-
-        data = read_forcing_data_global(
+    if fmt == "latlon":
+        _check_global_time_range(config)
+        return read_forcing_data_global(
             global_data_dir=Path(config["ForcingPath"]),
             lat=loc[0],  # type: ignore
             lon=loc[1],  # type: ignore
             start_time=np.datetime64(config["StartTime"]),
             end_time=np.datetime64(config["EndTime"]),
+            workers=int(config.get("GlobalDataWorkers", 1)),
+            timeout=(
+                float(config["GlobalDataTimeout"])
+                if config.get("GlobalDataTimeout")
+                else None
+            ),
+            cache=global_data.point_cache.get_point_cache(config),
+            execution=global_data.dask_execution.get_execution(config),
+        )
+
+    raise NotImplementedError
+
+
+def _forcing_write_tasks(
+    data: dict, input_path: Path, file_format: str
+) -> tuple[dict[str, Callable], dict[str, Callable]]:
+    """Split writing the forcing files into one task per file.
+
+    Returns:
+        The tasks writing plain files, which can run concurrently, and the tasks
+            writing HDF5 files (.mat and .nc), which have to run one after another.
+    """
+    if file_format == "ascii":
+        plain_tasks = {
+            fname: functools.partial(
+                _write_matlab_ascii, input_path / fname, data[var], ncols=1
+            )
+            for var, fname in DAT_FILES.items()
+        }
+        plain_tasks["LAI_.dat"] = functools.partial(
+            write_lai_file, data, input_path / "LAI_.dat"
+        )
+        plain_tasks["Mdata.txt"] = functools.partial(
+            write_meteo_file, data, input_path / "Mdata.txt"
         )
+        hdf5_tasks: dict[str, Callable] = {}
     else:
-        raise NotImplementedError
+        fname = forcing_file_names(file_format)[0]
+        timeseries_task = functools.partial(
+            write_timeseries_file, data, input_path, file_format
+        )
+        plain_tasks = {fname: timeseries_task} if file_format == "binary" else {}
+        hdf5_tasks = {fname: timeseries_task} if file_format == "mat" else {}
+
+    hdf5_tasks["forcing_globals.mat"] = functools.partial(
+        prepare_global_variables, data, input_path
+    )
+    hdf5_tasks[POSTPROCESSING_FILE] = functools.partial(
+        write_postprocessing_file, _postprocessing_dataset(data), input_path
+    )
+    return plain_tasks, hdf5_tasks
+
+
+def _timed(name: str, task: Callable) -> tuple[str, float]:
+    """Run a task, and return its name and the duration in seconds."""
+    start = time.perf_counter()
+    task()
+    return name, time.perf_counter() - start
+
+
+def write_forcing_concurrent(
+    data: dict, input_path: Path, file_format: str = "ascii", workers: int = 4
+) -> dict[str, float]:
+    """Write the forcing files concurrently, equivalent to `write_forcing`.
+
+    The plain files (the ascii files, or the raw binary time series) are formatted
+    and written by a pool of threads. The HDF5 based files are written in the
+    meantime by the calling thread, one after another, as HDF5 is not thread safe.
+    Once all files are written, they are flushed to disk with a single round of
+    fsync calls.
+
+    Args:
+        data: Dictionary containing the required variables. Generated by the
+            function `read_forcing`.
+        input_path: The model input directory.
+        file_format: The format of the time series files, see `FORCING_FORMATS`.
+        workers: Number of threads writing the plain files.
+
+    Returns:
+        The duration (in seconds) of writing each file, by file name.
+    """
+    if workers < 1:
+        raise ValueError("The number of workers should be at least 1.")
+
+    plain_tasks, hdf5_tasks = _forcing_write_tasks(data, input_path, file_format)
+    timings = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_timed, name, task) for name, task in plain_tasks.items()
+        ]
+        timings.update(_timed(name, task) for name, task in hdf5_tasks.items())
+        for future in futures:
+            name, duration = future.result()
+            timings[name] = duration
+
+    for fname in forcing_file_names(file_format):
+        if fname in timings or fname == "forcing_timeseries.json":
+            with (input_path / fname).open("rb+") as f:
+                os.fsync(f.fileno())
 
-    # Write the single-column ascii '.dat' files to the input directory
-    write_dat_files(data, input_path)
+    for name, duration in sorted(timings.items(), key=lambda item: -item[1]):
+        logger.info("Wrote %s in %.3f s", name, duration)
+    return timings
 
-    # Write the two-column LAI_.dat file to the input directory.
-    write_lai_file(data, input_path / "LAI_.dat")
 
-    # Write the multi-column Mdata.txt ascii file to the input directory
-    write_meteo_file(data, input_path / "Mdata.txt")
+def _check_global_time_range(config: dict) -> None:
+    """Check that the start and end time are given, as required in 'global' mode."""
+    if config["StartTime"] == "NA" or config["EndTime"] == "NA":
+        raise ValueError(
+            "'NA' as start or end time is not supported in 'global' mode. Please "
+            "specify a start and end time."
+        )
+
+
+def write_forcing(data: dict, input_path: Path, file_format: str = "ascii") -> None:
+    """Write the forcing data to the files read by STEMMUS_SCOPE.
+
+    Args:
+        data: Dictionary containing the required variables. Generated by the
+            function `read_forcing`.
+        input_path: The model input directory.
+        file_format: The format of the time series files, see `FORCING_FORMATS`.
+    """
+    write_forcing_timeseries(data, input_path, file_format)
 
     # Write the remaining variables (without time dependency) to the matlab v7.3
     #  file 'forcing_globals.mat'
     prepare_global_variables(data, input_path)
 
+    # Store the variables required for post-processing the model output
+    write_postprocessing_file(_postprocessing_dataset(data), input_path)
 
-def _slice_forcing_file(
-    ds_forcing: xr.Dataset, start_time: str, end_time: str
-) -> xr.Dataset:
-    """Get the subset of forcing file based on time range in config.
 
-    Also check if the desired time range is covered by forcing file.
+def write_forcing_timeseries(
+    data: dict, input_path: Path, file_format: str = "ascii", append: bool = False
+) -> None:
+    """Write (or append) the forcing time series to the files read by STEMMUS_SCOPE.
 
     Args:
-        ds_forcing: Dataset of forcing file.
+        data: Dictionary containing the required variables. Generated by the
+            function `read_forcing`.
+        input_path: The model input directory.
+        file_format: The format of the time series files, see `FORCING_FORMATS`.
+        append: If True, append the data to the existing files.
+    """
+    if file_format == "ascii":
+        # Write the single-column ascii '.dat' files to the input directory
+        write_dat_files(data, input_path, append=append)
+
+        # Write the two-column LAI_.dat file to the input directory.
+        write_lai_file(data, input_path / "LAI_.dat", append=append)
+
+        # Write the multi-column Mdata.txt ascii file to the input directory
+        write_meteo_file(data, input_path / "Mdata.txt", append=append)
+    else:
+        # Write all time series to a single binary file, with a column manifest
+        write_timeseries_file(data, input_path, file_format, append=append)
+
+
+def forcing_chunks(config: dict, chunk_size: str) -> list[tuple[str, str]]:
+    """Split the time range of the model run into chunks.
+
+    Chunk boundaries are aligned to the pandas frequency `chunk_size` (e.g. "MS" for
+    the start of every month). Boundaries are skipped where they would result in a
+    chunk of less than two timesteps.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+        chunk_size: Pandas frequency string, e.g. "MS" or "7D".
+
+    Returns:
+        List of (start time, end time) strings of the chunks, both inclusive.
+    """
+    _, fmt = utils.check_location_fmt(config["Location"])
+    if fmt == "site":
+        forcing_file = utils.get_forcing_file(config)
+        st = forcing_file.stat()
+        _, time_axis = _plumber2_file_info(forcing_file, st.st_mtime_ns, st.st_size)
+        time_values = time_axis[
+            _time_slice(time_axis, config["StartTime"], config["EndTime"])
+        ]
+    else:
+        _check_global_time_range(config)
+        time_values = pd.date_range(
+            config["StartTime"], config["EndTime"], freq=DEFAULT_GLOBAL_TIMESTEP
+        ).values
+
+    boundaries = pd.date_range(time_values[0], time_values[-1], freq=chunk_size)
+    starts = [0]
+    for index in np.searchsorted(time_values, boundaries.values):
+        if index - starts[-1] >= 2 and time_values.size - index >= 2:
+            starts.append(index)
+    ends = starts[1:] + [time_values.size]
+
+    def as_string(index):
+        return str(np.datetime_as_string(time_values[index], unit="m"))
+
+    return [(as_string(start), as_string(end - 1)) for start, end in zip(starts, ends)]
+
+
+def _prepare_forcing_chunked(
+    config: dict, input_path: Path, file_format: str, chunk_size: str
+) -> None:
+    """Prepare the forcing files chunk by chunk, to limit the memory use.
+
+    The time series of every chunk are appended to the forcing files and to the
+    post-processing file. The variables in 'forcing_globals.mat' are written once,
+    after the last chunk.
+    """
+    landcover = []
+    total_timesteps = 0
+    for i, (start_time, end_time) in enumerate(forcing_chunks(config, chunk_size)):
+        data = read_forcing({**config, "StartTime": start_time, "EndTime": end_time})
+        write_forcing_timeseries(data, input_path, file_format, append=i > 0)
+        write_postprocessing_file(
+            _postprocessing_dataset(data), input_path, append=i > 0
+        )
+        landcover.append(data["IGBP_veg_long"])
+        total_timesteps += data["total_timesteps"]
+
+    data["IGBP_veg_long"] = np.concatenate(landcover)
+    data["total_timesteps"] = total_timesteps
+    prepare_global_variables(data, input_path)
+
+
+def forcing_file_names(file_format: str = "ascii") -> list[str]:
+    """Get the names of the files written by `write_forcing` for a file format."""
+    if file_format == "ascii":
+        names = [*DAT_FILES.values(), "LAI_.dat", "Mdata.txt"]
+    else:
+        extension = "mat" if file_format == "mat" else "bin"
+        names = [f"forcing_timeseries.{extension}", "forcing_timeseries.json"]
+    return [*names, "forcing_globals.mat", POSTPROCESSING_FILE, FORCING_STATE_FILE]
+
+
+def prepare_forcing(config: dict) -> None:
+    """Prepare the forcing files required by STEMMUS_SCOPE.
+
+    The input directory should be taken from the model configuration file.
+    A subset of forcing file will be generated if the time range is covered
+    by the time of existing forcing file.
+
+    By default the time series are written to ascii files. If the optional config key
+    `ForcingFormat` is set to "mat" or "binary", they are written to a single binary
+    file instead (see `write_timeseries_file`).
+
+    If the optional config key `ForcingChunkSize` is set (e.g. "MS" for monthly
+    chunks), the time range is processed in chunks which are appended to the forcing
+    files one after another. This limits the memory use for long model runs.
+
+    If the optional config key `ForcingCachePath` is set, the forcing files are
+    restored from the cache when they were prepared before for the same forcing data,
+    location and time range (see `PyStemmusScope.forcing_cache`).
+
+    If the optional config key `ForcingWriteWorkers` is set to a number of threads,
+    the forcing files are written concurrently (see `write_forcing_concurrent`). This
+    does not apply to chunked preparation, or when the files are extended.
+
+    If the optional config key `ForcingIncremental` is set to "True" and the input
+    directory holds forcing files for the same location and start time but an
+    earlier end time, only the new timesteps are appended (see `extend_forcing`).
+
+    The global datasets are kept open between runs in the same process, see
+    `PyStemmusScope.dataset_pool`. The optional config key `DatasetPoolMaxFiles`
+    sets the maximum number of files kept open. The manifests of the global dataset
+    folders are stored in the directory of the optional config key
+    `GlobalDataManifestPath`, see `global_data.manifest`.
+
+    For a bounding box ("bbox") location, the forcing files of all grid cells are
+    prepared at once, see `_prepare_forcing_bbox`. The cache, chunking, concurrent
+    writing and incremental options do not apply to this mode.
+
+    Args:
+        config (dict): The PyStemmusScope configuration dictionary.
+    """
+    input_path = Path(config["InputPath"])
+    file_format = get_forcing_format(config)
+    dataset_pool.configure_pool(config)
+    global_data.manifest.configure_manifest(config)
+
+    if utils.check_location_fmt(config["Location"])[1] == "bbox":
+        _prepare_forcing_bbox(config, file_format)
+        return
+
+    cache = forcing_cache.get_cache(config)
+    if cache is not None:
+        cache_key = cache.make_key(config, DEFAULT_GLOBAL_TIMESTEP, file_format)
+        if cache.restore(cache_key, input_path):
+            return
+
+    chunk_size = config.get("ForcingChunkSize")
+    incremental = str(config.get("ForcingIncremental", "False")).lower() == "true"
+    if not (incremental and extend_forcing(config)):
+        _remove_forcing_files(input_path, file_format)
+        write_workers = int(config.get("ForcingWriteWorkers", 0))
+        if chunk_size:
+            _prepare_forcing_chunked(config, input_path, file_format, chunk_size)
+        elif write_workers > 0:
+            data = read_forcing(config)
+            write_forcing_concurrent(data, input_path, file_format, write_workers)
+        else:
+            data = read_forcing(config)
+            write_forcing(data, input_path, file_format)
+    _write_forcing_state(config, input_path, file_format)
+
+    if cache is not None:
+        cache.store(cache_key, input_path, forcing_file_names(file_format))
+
+
+def _prepare_forcing_bbox(config: dict, file_format: str) -> None:
+    """Prepare the forcing files of every grid cell in a bounding box.
+
+    Every global dataset is opened once, and all grid cells are extracted with a
+    single pointwise selection (see `global_data.collect_datasets_batch`). The forcing
+    files of a cell are written to its own input directory (see
+    `config_io.bbox_cell_configs`).
+    """
+    _check_global_time_range(config)
+    cell_configs = config_io.bbox_cell_configs(config)
+    latlons = [utils.check_location_fmt(cell["Location"])[0] for cell in cell_configs]
+
+    cell_data = global_data.collect_datasets_batch(
+        global_data_dir=Path(config["ForcingPath"]),
+        latlons=latlons,  # type: ignore
+        time_range=(
+            np.datetime64(config["StartTime"]),
+            np.datetime64(config["EndTime"]),
+        ),
+        timestep=DEFAULT_GLOBAL_TIMESTEP,
+        execution=global_data.dask_execution.get_execution(config),
+    )
+
+    for cell_config, data in zip(cell_configs, cell_data):
+        input_path = Path(cell_config["InputPath"])
+        write_forcing(data, input_path, file_format)
+        _write_forcing_state(cell_config, input_path, file_format)
+    logger.info("Prepared forcing for %d grid cells", len(cell_configs))
+
+
+def _write_forcing_state(config: dict, input_path: Path, file_format: str) -> None:
+    """Describe the prepared forcing files, see `FORCING_STATE_FILE`."""
+    state = {key: config[key] for key in _FORCING_STATE_KEYS}
+    state["ForcingFormat"] = file_format
+    with (input_path / FORCING_STATE_FILE).open("w", encoding="utf8") as f:
+        json.dump(state, f, indent=2)
+
+
+def _read_forcing_state(input_path: Path) -> Optional[dict]:
+    """Read the description of the prepared forcing files, None if there is none."""
+    state_file = input_path / FORCING_STATE_FILE
+    if not state_file.exists():
+        return None
+    with state_file.open(encoding="utf8") as f:
+        return json.load(f)
+
+
+def _make_writable(fname: Path) -> None:
+    """Replace a hardlinked or read-only file (e.g. from the cache) by a copy."""
+    st = fname.stat()
+    if st.st_nlink == 1 and os.access(fname, os.W_OK):
+        return
+    tmp_file = fname.with_name(f".{fname.name}.tmp")
+    shutil.copyfile(fname, tmp_file)
+    tmp_file.replace(fname)
+
+
+def _remove_forcing_files(input_path: Path, file_format: str) -> None:
+    """Remove the existing forcing files before they are written again.
+
+    The files can be hardlinked to the forcing cache (or to other input directories),
+    so writing them in place would change the cached files as well.
+    """
+    for fname in forcing_file_names(file_format):
+        (input_path / fname).unlink(missing_ok=True)
+
+
+def _slice_timesteps(data: dict, index: slice) -> dict:
+    """Select the timesteps of all time series in the forcing data."""
+    ntime = data["total_timesteps"]
+    new_data = {
+        key: value[index] if np.ndim(value) > 0 and len(value) == ntime else value
+        for key, value in data.items()
+    }
+    new_data["total_timesteps"] = len(range(ntime)[index])
+    return new_data
+
+
+def _timeseries_files_end_with(data: dict, input_path: Path, file_format: str) -> bool:
+    """Check if the time series files in the input directory end with the data.
+
+    The data is written to a temporary directory in the same format, and compared
+    with the end of every existing time series file, so all written columns are
+    compared as they are stored.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        write_forcing_timeseries(data, tmp_path, file_format)
+        for fname in forcing_file_names(file_format):
+            expected_file = tmp_path / fname
+            if fname == "forcing_timeseries.json" or not expected_file.exists():
+                continue
+            if fname == "forcing_timeseries.mat":
+                with h5py.File(expected_file, "r") as f:
+                    expected = f["forcing"][()]
+                with h5py.File(input_path / fname, "r") as f:
+                    ntime = f["forcing"].shape[1]
+                    actual = f["forcing"][:, max(0, ntime - expected.shape[1]) :]
+                if not np.array_equal(actual, expected, equal_nan=True):
+                    return False
+                continue
+
+            expected_bytes = expected_file.read_bytes()
+            with (input_path / fname).open("rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - len(expected_bytes)))
+                if f.read() != expected_bytes:
+                    return False
+    return True
+
+
+def extend_forcing(config: dict) -> bool:
+    """Append the timesteps after the end of the existing forcing files.
+
+    The existing forcing files in the input directory should have been prepared for
+    the same location, start time and file format, with an earlier end time. The
+    last `EXTEND_OVERLAP_TIMESTEPS` existing timesteps are read again from the
+    forcing data, and all written time series (and the post-processing variables)
+    are compared with the existing files, to check that the forcing data did not
+    change in the meantime. The new timesteps are appended to the time series files, and
+    'forcing_globals.mat' is updated with the new number of timesteps (`Dur_tot`).
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Returns:
+        True if the forcing files were extended (or already up to date), False if
+            they have to be prepared again for the whole time range.
+    """
+    input_path = Path(config["InputPath"])
+    file_format = get_forcing_format(config)
+    state = _read_forcing_state(input_path)
+    existing = read_postprocessing_file(input_path)
+    if (
+        state is None
+        or existing is None
+        or state["ForcingFormat"] != file_format
+        or any(state[key] != config[key] for key in ("Location", "StartTime"))
+    ):
+        return False
+
+    last_time = existing["time"].values[-1]
+    if config["EndTime"] != "NA" and np.datetime64(config["EndTime"]) <= last_time:
+        # The existing files cover the time range; they can only be reused as is.
+        return np.datetime64(config["EndTime"]) == last_time
+
+    overlap_times = existing["time"].values[-EXTEND_OVERLAP_TIMESTEPS:]
+    start_time = str(np.datetime_as_string(overlap_times[0], unit="m"))
+    data = read_forcing({**config, "StartTime": start_time})
+    noverlap = overlap_times.size
+    overlap = _slice_timesteps(data, slice(None, noverlap))
+    if not (
+        np.array_equal(np.asarray(overlap["time"]), overlap_times)
+        and all(
+            np.array_equal(
+                np.asarray(overlap[var]),
+                existing[var].values[-noverlap:],
+                equal_nan=True,
+            )
+            for var in POSTPROCESSING_VARIABLES
+        )
+        and _timeseries_files_end_with(overlap, input_path, file_format)
+    ):
+        logger.warning(
+            "The forcing data of %s from %s differs from the existing forcing files "
+            "in %s. The forcing files are prepared again.",
+            config["Location"],
+            start_time,
+            input_path,
+        )
+        return False
+
+    new_data = _slice_timesteps(data, slice(noverlap, None))
+    new_timesteps = new_data["total_timesteps"]
+    if new_timesteps == 0:
+        return True
+
+    for fname in forcing_file_names(file_format):
+        if (input_path / fname).exists():
+            _make_writable(input_path / fname)
+    write_forcing_timeseries(new_data, input_path, file_format, append=True)
+
+    existing_globals = hdf5storage.loadmat(str(input_path / "forcing_globals.mat"))
+    new_data["IGBP_veg_long"] = np.concatenate(
+        [existing_globals["IGBP_veg_long"], new_data["IGBP_veg_long"]]
+    )
+    new_data["total_timesteps"] += existing["time"].size
+    prepare_global_variables(new_data, input_path)
+
+    write_postprocessing_file(
+        _postprocessing_dataset(new_data), input_path, append=True
+    )
+    logger.info(
+        "Extended the forcing files in %s with %d timesteps",
+        input_path,
+        new_timesteps,
+    )
+    return True
+
+
+def check_forcing_coverage(config: dict) -> None:
+    """Check that the forcing data covers the location and time range of a config.
+
+    For sites, the forcing file and its time range are looked up in the forcing
+    directory index (see `forcing_index`), so the netCDF files are only opened if
+    they are new or modified.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Raises:
+        ValueError: If there is no (unique) forcing file for the site, or if the time
+            range is not covered by the forcing data.
+    """
+    _, fmt = utils.check_location_fmt(config["Location"])
+    if fmt == "site":
+        forcing_file = utils.get_forcing_file(config)
+        index = forcing_index.get_index(
+            forcing_file.parent, forcing_index.get_index_dir(config)
+        )
+        entry = index.entry(forcing_file.name)
+        if entry["start"] is None:
+            raise ValueError(f"Could not read the time axis of {forcing_file}.")
+        time_range = np.array([entry["start"], entry["end"]], dtype="datetime64[ns]")
+        _check_time_coverage(time_range, config["StartTime"], config["EndTime"])
+    else:
+        _check_global_time_range(config)
+
+
+def _failed_result(config: dict, err: Exception, duration: float) -> dict:
+    """Create the result of a config for which the forcing could not be prepared."""
+    return {
+        "Location": config.get("Location"),
+        "InputPath": config.get("InputPath"),
+        "success": False,
+        "duration": duration,
+        "error": f"{type(err).__name__}: {err}",
+    }
+
+
+def _prepare_forcing_timed(config: dict) -> dict:
+    """Run `prepare_forcing` for one config, and report the duration and any error."""
+    start = time.perf_counter()
+    result = {"Location": config.get("Location"), "InputPath": config.get("InputPath")}
+    try:
+        prepare_forcing(config)
+    except Exception as err:  # noqa: BLE001 (failures are reported, not raised)
+        result["error"] = f"{type(err).__name__}: {err}"
+        result["traceback"] = traceback.format_exc()
+    result["success"] = "error" not in result
+    result["duration"] = time.perf_counter() - start
+    return result
+
+
+def _validate_configs(configs: list[dict]) -> list[dict]:
+    """Check all configs, returns a failed result or an empty dict for each config."""
+    results = []
+    for config in configs:
+        start = time.perf_counter()
+        try:
+            check_forcing_coverage(config)
+        except Exception as err:  # noqa: BLE001 (failures are reported, not raised)
+            results.append(_failed_result(config, err, time.perf_counter() - start))
+        else:
+            results.append({})
+    return results
+
+
+def prepare_forcing_batch(configs: list[dict], workers: int = 1) -> list[dict]:
+    """Prepare the forcing files for many model runs, using a pool of processes.
+
+    Every config is processed with `prepare_forcing`, so the output is identical to
+    preparing each run separately. A failure for one config does not stop the others.
+    All configs are first validated with `check_forcing_coverage`; configs that fail
+    this check are not submitted to the pool.
+
+    Args:
+        configs: PyStemmusScope configuration dictionaries, each with its own
+            `Location` and `InputPath`.
+        workers: Number of worker processes. If 1, the configs are processed
+            sequentially in the current process.
+
+    Returns:
+        One result dictionary per config (in the same order), with the keys
+            "Location", "InputPath", "success", "duration" (in seconds) and, on
+            failure, "error" and "traceback".
+    """
+    if workers < 1:
+        raise ValueError("The number of workers should be at least 1.")
+
+    results = _validate_configs(configs)
+    valid = [i for i, result in enumerate(results) if not result]
+
+    if workers == 1:
+        for i in valid:
+            results[i] = _prepare_forcing_timed(configs[i])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                i: executor.submit(_prepare_forcing_timed, configs[i]) for i in valid
+            }
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as err:  # noqa: BLE001 (e.g. a crashed worker)
+                    results[i] = _failed_result(configs[i], err, float("nan"))
+
+    for result in results:
+        if result["success"]:
+            logger.info(
+                "Prepared forcing for %s in %.2f s",
+                result["Location"],
+                result["duration"],
+            )
+        else:
+            logger.error(
+                "Preparing forcing for %s failed: %s",
+                result["Location"],
+                result["error"],
+            )
+    return results
+
+
+def _check_time_coverage(
+    time_values: np.ndarray, start_time: str, end_time: str
+) -> tuple[Optional[np.datetime64], Optional[np.datetime64]]:
+    """Check if the desired time range is covered by the forcing time axis.
+
+    Args:
+        time_values: Time axis of the forcing file.
         start_time: Start of time range in ISO format string e.g. 'YYYY-MM-DDTHH:MM:SS'.
             If "NA", start time will be the first timestamp of the forcing input data.
         end_time: End of time range in ISO format string e.g. 'YYYY-MM-DDTHH:MM:SS'.
             If "NA", end time will be the last timestamp of the forcing input data.
 
     Returns:
-        Forcing dataset, sliced with the start and end time.
+        The start and end time as datetime64, None if "NA".
     """
     start_dtime = None if start_time == "NA" else np.datetime64(start_time)
     end_dtime = None if end_time == "NA" else np.datetime64(end_time)
 
-    start_time_forcing = ds_forcing.coords["time"].values[0]
-    end_time_forcing = ds_forcing.coords["time"].values[-1]
+    start_time_forcing = time_values[0]
+    end_time_forcing = time_values[-1]
 
     start_time_valid = start_dtime >= start_time_forcing if start_dtime else True
     end_time_valid = end_dtime <= end_time_forcing if end_dtime else True
@@ -317,5 +1510,41 @@ def _slice_forcing_file(
             f"the time range of forcing file (from {start_time_forcing} to "
             f"{end_time_forcing})."
         )
+    return start_dtime, end_dtime
+
 
+def _time_slice(time_values: np.ndarray, start_time: str, end_time: str) -> slice:
+    """Get the index slice of the time range, equivalent to `_slice_forcing_file`."""
+    start_dtime, end_dtime = _check_time_coverage(time_values, start_time, end_time)
+    start_idx = (
+        None if start_dtime is None else np.searchsorted(time_values, start_dtime)
+    )
+    end_idx = (
+        None
+        if end_dtime is None
+        else np.searchsorted(time_values, end_dtime, side="right")
+    )
+    return slice(start_idx, end_idx)
+
+
+def _slice_forcing_file(
+    ds_forcing: xr.Dataset, start_time: str, end_time: str
+) -> xr.Dataset:
+    """Get the subset of forcing file based on time range in config.
+
+    Also check if the desired time range is covered by forcing file.
+
+    Args:
+        ds_forcing: Dataset of forcing file.
+        start_time: Start of time range in ISO format string e.g. 'YYYY-MM-DDTHH:MM:SS'.
+            If "NA", start time will be the first timestamp of the forcing input data.
+        end_time: End of time range in ISO format string e.g. 'YYYY-MM-DDTHH:MM:SS'.
+            If "NA", end time will be the last timestamp of the forcing input data.
+
+    Returns:
+        Forcing dataset, sliced with the start and end time.
+    """
+    start_dtime, end_dtime = _check_time_coverage(
+        ds_forcing.coords["time"].values, start_time, end_time
+    )
     return ds_forcing.sel(time=slice(start_dtime, end_dtime))
@@ -2,20 +2,30 @@
 from PyStemmusScope.global_data import cams_co2
 from PyStemmusScope.global_data import cci_landcover
 from PyStemmusScope.global_data import copernicus_lai
+from PyStemmusScope.global_data import dask_execution
 from PyStemmusScope.global_data import era5
 from PyStemmusScope.global_data import eth_canopy_height
+from PyStemmusScope.global_data import manifest
+from PyStemmusScope.global_data import point_cache
 from PyStemmusScope.global_data import prism_dem
+from PyStemmusScope.global_data import tile_index
 from PyStemmusScope.global_data import utils
 from PyStemmusScope.global_data.global_data_selection import collect_datasets
+from PyStemmusScope.global_data.global_data_selection import collect_datasets_batch
 
 
 __all__ = [
     "collect_datasets",
+    "collect_datasets_batch",
     "utils",
     "era5",
     "eth_canopy_height",
+    "manifest",
+    "point_cache",
     "prism_dem",
+    "tile_index",
     "cams_co2",
     "copernicus_lai",
     "cci_landcover",
+    "dask_execution",
 ]
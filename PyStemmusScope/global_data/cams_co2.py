@@ -1,19 +1,28 @@
 """Module for loading and validating the CAMS CO2 dataset."""
+import functools
 from pathlib import Path
+from typing import Optional
 from typing import Union
 import numpy as np
 import xarray as xr
+from PyStemmusScope import dataset_pool
+from PyStemmusScope.global_data import dask_execution
+from PyStemmusScope.global_data import manifest
+from PyStemmusScope.global_data import point_cache
 from PyStemmusScope.global_data import utils
 
 
 RESOLUTION_CAMS = 0.75  # Resolution of the dataset in degrees
 
 
-def retrieve_co2_data(
+def retrieve_co2_data(  # noqa:PLR0913 (too many arguments)
     global_data_dir: Path,
     latlon: Union[tuple[int, int], tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    execution: Optional[dask_execution.DaskExecution] = None,
 ) -> np.ndarray:
     """Check for availability and retrieve the CAMS CO2 data.
 
@@ -23,70 +32,127 @@ def retrieve_co2_data(
         time_range: Start and end time of the model run.
         timestep: Desired timestep of the model, this is derived from the forcing data.
             In a pandas-timedelta compatible format. For example: "1800s"
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        execution: Optional dask execution, see `dask_execution.get_execution`.
 
     Returns:
         DataArray containing the CO2 at the specified site for the given time range.
     """
-    files = list((global_data_dir / "co2").glob("*.nc"))
+    selection = select_co2_data(
+        global_data_dir,
+        latlon,
+        time_range,
+        cache,
+        chunk_sizes=execution.chunk_sizes if execution else None,
+    )
+    point_cache.compute_point_series([selection], execution)
+    return co2_data_from_selection(selection.series, time_range, timestep)[0]
 
-    if len(files) == 0:
-        raise FileNotFoundError(
-            f"No netCDF files found in the folder '{global_data_dir / 'co2'}'"
-        )
 
-    return extract_cams_data(
-        files_cams=files,
+def select_co2_data(
+    global_data_dir: Path,
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> point_cache.PointSelection:
+    """Get the CAMS CO2 data of a site from the cache, or select it (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlon: Latitude and longitude of the site.
+        time_range: Start and end time of the model run.
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The data of the site, with the dimensions "time" and "site". It is computed
+            (and cached) with `point_cache.compute_point_series`.
+    """
+    dataset_manifest = manifest.get_manifest(global_data_dir / "co2")
+    return point_cache.select_point_series(
+        cache,
+        "CAMS",
+        dataset_manifest=dataset_manifest,
         latlon=latlon,
+        resolution=RESOLUTION_CAMS,
         time_range=time_range,
-        timestep=timestep,
+        select=functools.partial(
+            _select_co2_data, dataset_manifest, [latlon], time_range, chunk_sizes
+        ),
     )
 
 
-def extract_cams_data(
-    files_cams: list[Path],
-    latlon: Union[tuple[int, int], tuple[float, float]],
+def select_co2_data_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> xr.Dataset:
+    """Validate the CAMS CO2 dataset, and select many sites at once (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+        time_range: Start and end time of the model run.
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The (not yet computed) data of the sites, with the dimensions "time" and
+            "site".
+    """
+    return _select_co2_data(
+        manifest.get_manifest(global_data_dir / "co2"),
+        latlons,
+        time_range,
+        chunk_sizes,
+    )
+
+
+def co2_data_from_selection(
+    selection: xr.Dataset,
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
-) -> np.ndarray:
-    """Extract and convert the required variables from the CAMS CO2 dataset.
+) -> list[np.ndarray]:
+    """Resample the computed selection of `select_co2_data_batch` to the model time.
 
     Args:
-        files_cams: List of CAMS files.
-        latlon: Latitude and longitude of the site.
+        selection: The computed data of the sites.
         time_range: Start and end time of the model run.
-        timestep: Desired timestep of the model, this is derived from the forcing data.
-            In a pandas-timedelta compatible format. For example: "1800s"
+        timestep: Desired timestep of the model, in a pandas-timedelta compatible
+            format.
 
     Returns:
-        DataArray containing the CO2 concentration.
+        For every site, the CO2 for the given time range.
     """
-    ds = xr.open_mfdataset(files_cams, chunks="auto")
+    ds = utils.resample_point(selection, time_range, timestep)
+    return [ds["co2"].isel(site=i).values for i in range(ds.sizes["site"])]
 
-    check_cams_dataset(cams_data=ds, latlon=latlon, time_range=time_range)
 
-    try:
-        ds = ds.sel(
-            latitude=latlon[0],
-            longitude=latlon[1],
-            method="nearest",
-            tolerance=RESOLUTION_CAMS,
-        )
-    except KeyError as err:
-        if "not all values found" in str(err):
-            raise utils.MissingDataError(
-                f"\nNo data point was found within {RESOLUTION_CAMS} degrees"
-                f"\nof the specified location {latlon}."
-                f"\nPlease check the netCDF files or select a different location"
-            ) from err
-        else:
-            raise err
-
-    ds = ds.drop_vars(["latitude", "longitude"])
-    ds = ds.compute()
-    ds = ds.resample(time=timestep).interpolate("linear")
-    ds = ds.sel(time=slice(time_range[0], time_range[1]))
-
-    return ds["co2"].values
+def _select_co2_data(
+    dataset_manifest: manifest.DatasetManifest,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]],
+) -> xr.Dataset:
+    """Open the CAMS CO2 files needed for the sites, validate and select them."""
+    ds = dataset_pool.open_mfdataset(
+        dataset_manifest.select_files(time_range, latlons, RESOLUTION_CAMS),
+        chunks=dask_execution.dataset_chunks(chunk_sizes, "latitude", "longitude"),
+    )
+
+    for latlon in latlons:
+        check_cams_dataset(cams_data=ds, latlon=latlon, time_range=time_range)
+
+    ds = utils.select_points(
+        ds, latlons, RESOLUTION_CAMS, xdim="longitude", ydim="latitude"
+    )
+    return ds.drop_vars(["latitude", "longitude"])
 
 
 def check_cams_dataset(
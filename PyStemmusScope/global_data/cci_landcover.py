@@ -1,9 +1,16 @@
 """Module for loading and validating the ESA CCI land cover dataset."""
+import functools
 from pathlib import Path
+from typing import Callable
+from typing import Optional
 from typing import Union
 import numpy as np
 import pandas as pd
 import xarray as xr
+from PyStemmusScope import dataset_pool
+from PyStemmusScope.global_data import dask_execution
+from PyStemmusScope.global_data import manifest
+from PyStemmusScope.global_data import point_cache
 from PyStemmusScope.global_data import utils
 
 
@@ -11,11 +18,14 @@ RESOLUTION_CCI = 1 / 360  # Resolution of the dataset in degrees
 FILEPATH_LANDCOVER_TABLE = Path(__file__).parent / "assets" / "lccs_to_igbp_table.csv"
 
 
-def retrieve_landcover_data(
+def retrieve_landcover_data(  # noqa:PLR0913 (too many arguments)
     global_data_dir: Path,
     latlon: Union[tuple[int, int], tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    execution: Optional[dask_execution.DaskExecution] = None,
 ) -> dict[str, np.ndarray]:
     """Get the land cover data from the CCI netCDF files.
 
@@ -25,89 +35,287 @@ def retrieve_landcover_data(
         time_range: Start and end time of the model run.
         timestep: Desired timestep of the model, this is derived from the forcing data.
             In a pandas-timedelta compatible format. For example: "1800s"
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        execution: Optional dask execution, see `dask_execution.get_execution`.
 
     Returns:
         Dictionary containing IGBP and LCCS land cover classes.
     """
-    files_cci = list((global_data_dir / "landcover").glob("*.nc"))
+    selection = select_landcover_data(
+        global_data_dir,
+        latlon,
+        time_range,
+        cache,
+        chunk_sizes=execution.chunk_sizes if execution else None,
+    )
+    point_cache.compute_point_series([selection], execution)
+    return landcover_data_from_selection(selection.series, time_range, timestep)[0]
 
-    if len(files_cci) == 0:
-        raise FileNotFoundError(
-            f"No netCDF files found in the folder '{global_data_dir / 'landcover'}'"
-        )
 
-    return extract_landcover_data(
-        files_cci=files_cci,
+def select_landcover_data(
+    global_data_dir: Path,
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> point_cache.PointSelection:
+    """Get the land cover class of a site from the cache, or select it (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlon: Latitude and longitude of the site.
+        time_range: Start and end time of the model run.
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The yearly land cover class of the site, with the dimensions "time" and
+            "site" and the flag attributes of the dataset. It is computed (and
+            cached) with `point_cache.compute_point_series`.
+    """
+    dataset_manifest = manifest.get_manifest(global_data_dir / "landcover")
+    return point_cache.select_point_series(
+        cache,
+        "CCI",
+        dataset_manifest=dataset_manifest,
         latlon=latlon,
+        resolution=RESOLUTION_CCI,
         time_range=time_range,
-        timestep=timestep,
+        select=functools.partial(
+            _select_landcover_data,
+            dataset_manifest,
+            [latlon],
+            time_range,
+            chunk_sizes,
+        ),
     )
 
 
-def extract_landcover_data(
-    files_cci: list[Path],
-    latlon: Union[tuple[int, int], tuple[float, float]],
+def select_landcover_data_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> xr.Dataset:
+    """Validate the CCI dataset, and select the land cover of many sites (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+        time_range: Start and end time of the model run.
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The (not yet computed) yearly land cover class of the sites, with the
+            dimensions "time" and "site" and the flag attributes of the dataset.
+    """
+    return _select_landcover_data(
+        manifest.get_manifest(global_data_dir / "landcover"),
+        latlons,
+        time_range,
+        chunk_sizes,
+    )
+
+
+def landcover_data_from_selection(
+    selection: xr.Dataset,
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
-) -> dict[str, np.ndarray]:
-    """Extract the land cover data from the CCI netCDF files.
+) -> list[dict[str, np.ndarray]]:
+    """Get the land cover classes from the computed `select_landcover_data_batch`.
 
     Args:
-        files_cci: List of CCI land cover files.
-        latlon: Latitude and longitude of the site.
+        selection: The computed land cover class of the sites.
         time_range: Start and end time of the model run.
-        timestep: Desired timestep of the model, this is derived from the forcing data.
-            In a pandas-timedelta compatible format. For example: "1800s"
+        timestep: Desired timestep of the model, in a pandas-timedelta compatible
+            format.
 
     Returns:
-        Dictionary containing IGBP and LCCS land cover classes.
+        For every site, a dictionary containing IGBP and LCCS land cover classes.
     """
-    cci_dataset = xr.open_mfdataset(files_cci, chunks="auto")
+    lccs_id = _interpolate_landcover(selection["lccs_class"], time_range, timestep)
+    return [
+        _lookup_landcover_classes(selection, lccs_id.isel(site=i).to_numpy())
+        for i in range(selection.sizes["site"])
+    ]
 
-    check_cci_dataset(cci_dataset, latlon, time_range)  # Assert spatial/temporal bounds
 
-    lat_bounds = cci_dataset["lat_bounds"].load()  # Load so that they are not
-    lon_bounds = cci_dataset["lon_bounds"].load()  #  dask arrays
-    lat_idx = np.logical_and(  # type: ignore
-        lat_bounds.isel(bounds=0) >= latlon[0], lat_bounds.isel(bounds=1) < latlon[0]
-    ).argmax(dim="lat")
-    lon_idx = np.logical_and(  # type: ignore
-        lon_bounds.isel(bounds=0) <= latlon[1], lon_bounds.isel(bounds=1) > latlon[1]
-    ).argmax(dim="lon")
+def _select_landcover_data(
+    dataset_manifest: manifest.DatasetManifest,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]],
+) -> xr.Dataset:
+    """Open the CCI land cover files needed for the sites, validate and select them."""
+    cci_dataset = dataset_pool.open_mfdataset(
+        dataset_manifest.select_files(time_range, latlons, RESOLUTION_CCI),
+        chunks=dask_execution.dataset_chunks(chunk_sizes, "lat", "lon"),
+    )
 
-    lccs_id = cci_dataset.isel(lat=lat_idx, lon=lon_idx)["lccs_class"]
+    for latlon in latlons:
+        check_cci_dataset(cci_dataset, latlon, time_range)
+
+    lat_idx, lon_idx = _get_grid_indices(cci_dataset, latlons)
+    selection = cci_dataset[["lccs_class"]].isel(
+        lat=xr.DataArray(lat_idx, dims="site"), lon=xr.DataArray(lon_idx, dims="site")
+    )
+    return selection.drop_vars(["lat", "lon"])
 
+
+def _get_grid_indices(
+    cci_dataset: xr.Dataset,
+    latlons: list[tuple[float, float]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the indices of the grid cells containing the locations.
+
+    The index is computed from the first grid cell and the resolution of the dataset,
+    and validated against the bounds of only that cell (and its neighbours), so the
+    bounds do not have to be loaded in full.
+    """
+    lats = np.array([latlon[0] for latlon in latlons], dtype=float)
+    lons = np.array([latlon[1] for latlon in latlons], dtype=float)
+    lat_idx = _get_cell_indices(
+        cci_dataset["lat"],
+        cci_dataset["lat_bounds"],
+        lats,
+        lambda bounds, lat: (bounds[..., 0] >= lat) & (bounds[..., 1] < lat),
+    )
+    lon_idx = _get_cell_indices(
+        cci_dataset["lon"],
+        cci_dataset["lon_bounds"],
+        lons,
+        lambda bounds, lon: (bounds[..., 0] <= lon) & (bounds[..., 1] > lon),
+    )
+    return lat_idx, lon_idx
+
+
+def _get_cell_indices(
+    coord: xr.DataArray,
+    bounds: xr.DataArray,
+    values: np.ndarray,
+    contains: Callable[[np.ndarray, np.ndarray], np.ndarray],
+) -> np.ndarray:
+    """Get the indices along a (regular) coordinate of the cells containing values."""
+    dim = coord.dims[0]
+    if "time" in bounds.dims:  # the bounds are the same for every year
+        bounds = bounds.isel(time=0)
+
+    coord_values = coord.to_numpy()
+    step = RESOLUTION_CCI
+    if coord_values.size > 1 and coord_values[1] < coord_values[0]:
+        step = -RESOLUTION_CCI
+    index = np.floor((values - (coord_values[0] - step / 2)) / step).astype(int)
+
+    # The index can be off by one due to rounding, so the neighbours are checked too.
+    candidates = np.clip(index[:, None] + np.array([-1, 0, 1]), 0, coord.size - 1)
+    cell_bounds = bounds.isel({dim: xr.DataArray(candidates.ravel(), dims="cell")})
+    cell_bounds = cell_bounds.transpose("cell", ...).to_numpy()
+    valid = contains(cell_bounds.reshape(candidates.shape + (2,)), values[:, None])
+
+    indices = candidates[np.arange(values.size), valid.argmax(axis=1)]
+    missing = ~valid.any(axis=1)
+    if np.any(missing):  # not a regular grid, search all the cells
+        all_bounds = bounds.transpose(dim, ...).to_numpy()
+        indices[missing] = contains(
+            all_bounds[None, :, :], values[missing, None]
+        ).argmax(axis=1)
+    return indices
+
+
+def _interpolate_landcover(
+    lccs_id: xr.DataArray,
+    time_range: tuple[np.datetime64, np.datetime64],
+    timestep: str,
+) -> xr.DataArray:
+    """Interpolate the (yearly) land cover classes to the model time (nearest)."""
     # If time is size 1, interp fails. Adding an extra datapoint prevents this.
     if lccs_id["time"].size == 1:
         data_copy = lccs_id.copy()
         data_copy["time"] = lccs_id["time"] + np.timedelta64(1, "D")
         lccs_id = xr.concat((lccs_id, data_copy), dim="time")
 
-    lccs_id = lccs_id.interp(
+    return lccs_id.interp(
         time=pd.date_range(time_range[0], time_range[1], freq=timestep),
         method="nearest",
         kwargs={"fill_value": "extrapolate", "bounds_error": False},
     )
 
-    landcover_lookup_table = get_landcover_table(cci_dataset)
-    igbp_lookup_table = get_lccs_to_igbp_table()
 
+def _lookup_landcover_classes(
+    cci_dataset: xr.Dataset, lccs_ids: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Convert the land cover flag values to the LCCS and IGBP class names."""
+    index_table, lccs_names, igbp_names = _get_landcover_lookup(
+        tuple(int(value) for value in cci_dataset["lccs_class"].attrs["flag_values"]),
+        tuple(cci_dataset["lccs_class"].attrs["flag_meanings"].split(" ")),
+    )
+    category = _category_index(index_table, lccs_ids)
     return {
-        "LCCS_landcover": np.array(
-            [landcover_lookup_table[_id] for _id in lccs_id.to_numpy()]
-        ),
-        "IGBP_veg_long": np.array(
-            [igbp_lookup_table[_id] for _id in lccs_id.to_numpy()]
-        ),
+        "LCCS_landcover": _gather_names(lccs_names, category),
+        "IGBP_veg_long": _gather_names(igbp_names, category),
     }
 
 
-def get_lccs_to_igbp_table() -> dict[int, str]:
-    """Read the land cover translation table, and turn it into a lookup dictionary."""
+@functools.lru_cache(maxsize=8)
+def _get_landcover_lookup(
+    flag_values: tuple[int, ...], flag_meanings: tuple[str, ...]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the array based lookup table of the land cover classes.
+
+    Returns:
+        An index table from the flag value to the category (-1 if it is not a valid
+            flag value), and the LCCS and IGBP names of every category. The IGBP
+            name is None if the class is not in the translation table.
+    """
+    igbp_lookup_table = _read_lccs_to_igbp_table()
+    index_table = np.full(max(flag_values, default=0) + 1, -1, dtype=int)
+    index_table[list(flag_values)] = np.arange(len(flag_values))
+    lccs_names = np.array(flag_meanings, dtype=object)
+    igbp_names = np.array(
+        [igbp_lookup_table.get(value) for value in flag_values], dtype=object
+    )
+    return index_table, lccs_names, igbp_names
+
+
+def _category_index(index_table: np.ndarray, lccs_ids: np.ndarray) -> np.ndarray:
+    """Translate the flag values to the category index, in one vectorized gather."""
+    lccs_ids = np.asarray(lccs_ids)
+    valid = (lccs_ids >= 0) & (lccs_ids < index_table.size) & (lccs_ids % 1 == 0)
+    category = np.full(lccs_ids.shape, -1, dtype=int)
+    category[valid] = index_table[lccs_ids[valid].astype(int)]
+    if np.any(category < 0):
+        raise KeyError(lccs_ids[category < 0][0])
+    return category
+
+
+def _gather_names(names: np.ndarray, category: np.ndarray) -> np.ndarray:
+    """Get the names of the categories, as an array of strings."""
+    used = np.flatnonzero(np.bincount(category, minlength=names.size))
+    if None in names[used].tolist():
+        raise KeyError("Land cover class is missing from the IGBP translation table")
+    # Only the names which occur determine the string length, like np.array(list).
+    position = np.zeros(names.size, dtype=int)
+    position[used] = np.arange(used.size)
+    return np.array(names[used].tolist())[position[category]]
+
+
+@functools.lru_cache(maxsize=1)
+def _read_lccs_to_igbp_table() -> dict[int, str]:
+    """Read the land cover translation table once per process."""
     df = pd.read_csv(FILEPATH_LANDCOVER_TABLE, index_col="lccs_class")
     return df.to_dict()["IGBP_STEMMUS_SCOPE"]
 
 
+def get_lccs_to_igbp_table() -> dict[int, str]:
+    """Read the land cover translation table, and turn it into a lookup dictionary."""
+    return dict(_read_lccs_to_igbp_table())
+
+
 def get_landcover_table(cci_dataset: xr.Dataset) -> dict[int, str]:
     """Get the lookup table to convert the flag values to a land cover name.
 
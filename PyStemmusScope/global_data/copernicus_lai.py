@@ -1,19 +1,28 @@
 """Module for loading and validating the Copernicus LAI dataset."""
+import functools
 from pathlib import Path
+from typing import Optional
 from typing import Union
 import numpy as np
 import xarray as xr
+from PyStemmusScope import dataset_pool
+from PyStemmusScope.global_data import dask_execution
+from PyStemmusScope.global_data import manifest
+from PyStemmusScope.global_data import point_cache
 from PyStemmusScope.global_data import utils
 
 
 RESOLUTION_LAI = 1 / 112  # Resolution of the LAI dataset in degrees
 
 
-def retrieve_lai_data(
+def retrieve_lai_data(  # noqa:PLR0913 (too many arguments)
     global_data_dir: Path,
     latlon: Union[tuple[int, int], tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    execution: Optional[dask_execution.DaskExecution] = None,
 ) -> np.ndarray:
     """Check for availability and retrieve the Copernicus LAI data.
 
@@ -23,72 +32,126 @@ def retrieve_lai_data(
         time_range: Start and end time of the model run.
         timestep: Desired timestep of the model, this is derived from the forcing data.
             In a pandas-timedelta compatible format. For example: "1800s"
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        execution: Optional dask execution, see `dask_execution.get_execution`.
 
     Returns:
         DataArray containing the LAI of the specified site for the given time range.
     """
-    files = list((global_data_dir / "lai").glob("*.nc"))
+    selection = select_lai_data(
+        global_data_dir,
+        latlon,
+        time_range,
+        cache,
+        chunk_sizes=execution.chunk_sizes if execution else None,
+    )
+    point_cache.compute_point_series([selection], execution)
+    return lai_data_from_selection(selection.series, time_range, timestep)[0]
 
-    if len(files) == 0:
-        raise FileNotFoundError(
-            f"No netCDF files found in the folder '{global_data_dir / 'lai'}'"
-        )
 
-    return extract_lai_data(
-        files_lai=files,
+def select_lai_data(
+    global_data_dir: Path,
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> point_cache.PointSelection:
+    """Get the LAI data of a site from the cache, or select it (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlon: Latitude and longitude of the site.
+        time_range: Start and end time of the model run.
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The data of the site, with the dimensions "time" and "site". It is computed
+            (and cached) with `point_cache.compute_point_series`.
+    """
+    dataset_manifest = manifest.get_manifest(global_data_dir / "lai")
+    return point_cache.select_point_series(
+        cache,
+        "LAI",
+        dataset_manifest=dataset_manifest,
         latlon=latlon,
+        resolution=RESOLUTION_LAI,
         time_range=time_range,
-        timestep=timestep,
+        select=functools.partial(
+            _select_lai_data, dataset_manifest, [latlon], time_range, chunk_sizes
+        ),
     )
 
 
-def extract_lai_data(
-    files_lai: list[Path],
-    latlon: Union[tuple[int, int], tuple[float, float]],
+def select_lai_data_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> xr.Dataset:
+    """Validate the LAI dataset, and select many sites at once (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+        time_range: Start and end time of the model run.
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The (not yet computed) data of the sites, with the dimensions "time" and
+            "site".
+    """
+    return _select_lai_data(
+        manifest.get_manifest(global_data_dir / "lai"),
+        latlons,
+        time_range,
+        chunk_sizes,
+    )
+
+
+def lai_data_from_selection(
+    selection: xr.Dataset,
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
-) -> np.ndarray:
-    """Generate LAI values, until a dataset is chosen.
+) -> list[np.ndarray]:
+    """Resample the computed selection of `select_lai_data_batch` to the model time.
 
     Args:
-        files_lai: List of paths to the *.nc files.
-        latlon: Latitude and longitude of the site.
+        selection: The computed data of the sites.
         time_range: Start and end time of the model run.
-        timestep: Desired timestep of the model, this is derived from the forcing data.
-            In a pandas-timedelta compatible format. For example: "1800s"
+        timestep: Desired timestep of the model, in a pandas-timedelta compatible
+            format.
 
     Returns:
-        DataArray containing the LAI of the specified site for the given time range.
+        For every site, the LAI for the given time range.
     """
-    ds = xr.open_mfdataset(files_lai, chunks="auto")
+    ds = utils.resample_point(selection, time_range, timestep)
+    return [ds["LAI"].isel(site=i).values for i in range(ds.sizes["site"])]
 
-    check_lai_dataset(ds, latlon, time_range)
 
-    ds = ds.drop_vars(["crs", "LAI_ERR", "retrieval_flag"])
+def _select_lai_data(
+    dataset_manifest: manifest.DatasetManifest,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]],
+) -> xr.Dataset:
+    """Open the Copernicus LAI files needed for the sites, validate and select them."""
+    ds = dataset_pool.open_mfdataset(
+        dataset_manifest.select_files(time_range, latlons, RESOLUTION_LAI),
+        chunks=dask_execution.dataset_chunks(chunk_sizes, "lat", "lon"),
+    )
 
-    try:
-        ds = ds.sel(
-            lat=latlon[0],
-            lon=latlon[1],
-            method="nearest",
-            tolerance=RESOLUTION_LAI,
-        )
-    except KeyError as err:
-        if "not all values found" in str(err):
-            raise utils.MissingDataError(
-                f"\nNo data point was found within {RESOLUTION_LAI} degrees"
-                f"\nof the specified location {latlon}."
-                f"\nPlease check the netCDF files or select a different location"
-            ) from err
-        else:
-            raise err
-
-    ds = ds.drop_vars(["lat", "lon"])
-    ds = ds.compute()  # Load into memory before resampling
-    ds = ds.resample(time=timestep).interpolate("linear")
-    ds = ds.sel(time=slice(time_range[0], time_range[1]))
-
-    return ds["LAI"].values
+    for latlon in latlons:
+        check_lai_dataset(ds, latlon, time_range)
+
+    ds = ds.drop_vars(["crs", "LAI_ERR", "retrieval_flag"])
+    ds = utils.select_points(ds, latlons, RESOLUTION_LAI, xdim="lon", ydim="lat")
+    return ds.drop_vars(["lat", "lon"])
 
 
 def check_lai_dataset(
@@ -0,0 +1,194 @@
+"""Configuration of the dask execution of the global data extraction.
+
+The ERA5, CAMS, LAI and land cover datasets are opened lazily with dask. By default
+the chunks of the opened datasets are chosen by dask ("auto"), and the data is
+computed with the default (threaded) scheduler. This can be configured with the
+optional config keys:
+
+- `DaskScheduler`: "threads", "processes", "synchronous" or "distributed". The
+    latter starts a local distributed cluster (once per process), which requires
+    the `distributed` package.
+- `DaskWorkers`: the number of worker threads or processes.
+- `DaskMemoryLimit`: the memory limit per worker of the local distributed cluster,
+    e.g. "4GB".
+- `DaskChunkTime`, `DaskChunkLat` and `DaskChunkLon`: the chunk sizes along time,
+    latitude and longitude with which the datasets are opened.
+
+`get_execution` reads these keys into a `DaskExecution`, which is passed to the
+retrieval functions. The datasets are opened with its chunk sizes (see
+`dataset_chunks`), and the data of many datasets is computed with a single
+`dask.compute` call with its scheduler (see `compute_datasets`). The global dask
+configuration is not changed, as other threads may compute with dask meanwhile.
+"""
+import logging
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Optional
+from typing import Union
+import dask
+import xarray as xr
+
+
+logger = logging.getLogger(__name__)
+
+SCHEDULERS = ("threads", "processes", "synchronous", "distributed")
+
+# Config key of the chunk size along the time, latitude and longitude dimension
+CHUNK_KEYS = {"time": "DaskChunkTime", "lat": "DaskChunkLat", "lon": "DaskChunkLon"}
+
+_CLIENTS: dict[tuple[Optional[int], str], Any] = {}
+
+DatasetOrTuple = Union[xr.Dataset, tuple[xr.Dataset, ...]]
+
+
+@dataclass(frozen=True)
+class DaskExecution:
+    """How the global datasets are opened and computed with dask."""
+
+    scheduler: Optional[str] = None
+    workers: Optional[int] = None
+    memory_limit: str = "auto"
+    chunk_sizes: dict[str, int] = field(default_factory=dict)
+
+    def compute_kwargs(self) -> dict[str, Any]:
+        """Get the keyword arguments of `dask.compute` for the scheduler.
+
+        For the "distributed" scheduler, the local cluster is started if it is not
+        running yet.
+        """
+        if self.scheduler == "distributed":
+            return {"scheduler": _get_client(self.workers, self.memory_limit)}
+        kwargs: dict[str, Any] = {}
+        if self.scheduler is not None:
+            kwargs["scheduler"] = self.scheduler
+        if self.workers is not None:
+            kwargs["num_workers"] = self.workers
+        return kwargs
+
+
+def get_chunk_sizes(config: dict) -> dict[str, int]:
+    """Get the configured chunk sizes along time, latitude and longitude.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Returns:
+        The chunk size by dimension ("time", "lat" or "lon"), only for the dimensions
+            of which the chunk size is set in the config.
+    """
+    return {dim: int(config[key]) for dim, key in CHUNK_KEYS.items() if config.get(key)}
+
+
+def get_execution(config: dict) -> DaskExecution:
+    """Get the dask execution of the global data extraction from the config.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary, with the optional config
+            keys described in the module documentation.
+
+    Returns:
+        The configured scheduler, number of workers, memory limit and chunk sizes.
+    """
+    scheduler = config.get("DaskScheduler") or None
+    if scheduler is not None and scheduler not in SCHEDULERS:
+        raise ValueError(
+            f"Invalid value '{scheduler}' for `DaskScheduler` in the config file. "
+            f"Valid options are: {', '.join(SCHEDULERS)}."
+        )
+    if config.get("DaskMemoryLimit") and scheduler != "distributed":
+        logger.warning("`DaskMemoryLimit` is only used by the distributed scheduler.")
+
+    return DaskExecution(
+        scheduler=scheduler,
+        workers=int(config["DaskWorkers"]) if config.get("DaskWorkers") else None,
+        memory_limit=config.get("DaskMemoryLimit") or "auto",
+        chunk_sizes=get_chunk_sizes(config),
+    )
+
+
+def dataset_chunks(
+    chunk_sizes: Optional[dict[str, int]], lat_dim: str, lon_dim: str
+) -> Union[str, dict[str, Union[int, str]]]:
+    """Get the chunks with which a global dataset is opened.
+
+    Args:
+        chunk_sizes: The chunk size by dimension, see `get_chunk_sizes`.
+        lat_dim: Name of the latitude dimension of the dataset.
+        lon_dim: Name of the longitude dimension of the dataset.
+
+    Returns:
+        "auto" if no chunk sizes are configured, otherwise the chunk size of every
+            dimension ("auto" for the dimensions without a configured size).
+    """
+    if not chunk_sizes:
+        return "auto"
+    return {
+        "time": chunk_sizes.get("time", "auto"),
+        lat_dim: chunk_sizes.get("lat", "auto"),
+        lon_dim: chunk_sizes.get("lon", "auto"),
+    }
+
+
+def compute_datasets(
+    datasets: dict[str, DatasetOrTuple], execution: Optional[DaskExecution] = None
+) -> dict[str, DatasetOrTuple]:
+    """Compute the lazy data of many datasets with a single `dask.compute` call.
+
+    The graphs of all datasets are computed together, so that they run concurrently
+    on the configured scheduler and tasks shared between them run only once. Like
+    `xr.Dataset.compute`, only the dask arrays of the variables are passed to dask.
+
+    Args:
+        datasets: The (lazy) datasets, or tuples of datasets, by name.
+        execution: Optional dask execution, see `get_execution`. By default, the
+            data is computed with the default scheduler.
+
+    Returns:
+        Copies of the datasets, with the computed data.
+    """
+    computed = {
+        name: (
+            tuple(ds.copy(deep=False) for ds in value)
+            if isinstance(value, tuple)
+            else value.copy(deep=False)
+        )
+        for name, value in datasets.items()
+    }
+    lazy_variables = [
+        var
+        for value in computed.values()
+        for ds in (value if isinstance(value, tuple) else (value,))
+        for var in ds.variables.values()
+        if var.chunks is not None
+    ]
+    if not lazy_variables:
+        return computed
+
+    compute_kwargs = {} if execution is None else execution.compute_kwargs()
+    data = dask.compute(*(var.data for var in lazy_variables), **compute_kwargs)
+    for var, var_data in zip(lazy_variables, data):
+        var.data = var_data
+    return computed
+
+
+def _get_client(workers: Optional[int], memory_limit: str) -> Any:
+    """Get the client of a local distributed cluster, started once per process."""
+    try:
+        from dask.distributed import Client
+        from dask.distributed import LocalCluster
+    except ImportError as err:
+        msg = (
+            "The dask distributed package is not available. Please install it"
+            " (`pip install dask[distributed]`) to use the 'distributed' scheduler."
+        )
+        raise ImportError(msg) from err
+
+    key = (workers, memory_limit)
+    if key not in _CLIENTS:
+        cluster = LocalCluster(n_workers=workers, memory_limit=memory_limit)
+        _CLIENTS[key] = Client(cluster, set_as_default=False)
+        logger.info(
+            "Started a local dask cluster, dashboard at %s", cluster.dashboard_link
+        )
+    return _CLIENTS[key]
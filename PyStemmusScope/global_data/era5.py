@@ -1,10 +1,17 @@
 """ERA5 data module, for data validation and data loading."""
+import functools
+import logging
 from pathlib import Path
 from typing import Literal
+from typing import Optional
 from typing import Union
 import numpy as np
 import PyStemmusScope.variable_conversion as vc
 import xarray as xr
+from PyStemmusScope import dataset_pool
+from PyStemmusScope.global_data import dask_execution
+from PyStemmusScope.global_data import manifest
+from PyStemmusScope.global_data import point_cache
 from PyStemmusScope.global_data import utils
 
 
@@ -13,12 +20,21 @@ ERA5LAND_VARIABLES = ["t2m", "d2m"]
 RESOLUTION_ERA5 = 0.25  # Resolution in degrees, to find nearest gridpoint.
 RESOLUTION_ERA5LAND = 0.10
 
+POINT_STORE_DIR = "era5_point_store"  # Folder in the global data directory.
+POINT_STORE_TIME_CHUNK = 8784  # One (leap) year of hourly data.
+POINT_STORE_SPACE_CHUNK = 4
 
-def retrieve_era5_data(
+logger = logging.getLogger(__name__)
+
+
+def retrieve_era5_data(  # noqa:PLR0913 (too many arguments)
     global_data_dir: Path,
     latlon: Union[tuple[int, int], tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    execution: Optional[dask_execution.DaskExecution] = None,
 ) -> dict:
     """Check for availability and retrieve the ERA5 and ERA5-land data.
 
@@ -28,64 +44,268 @@ def retrieve_era5_data(
         time_range: Start and end time of the model run.
         timestep: Desired timestep of the model, this is derived from the forcing data.
             In a pandas-timedelta compatible format. For example: "1800s"
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        execution: Optional dask execution, see `dask_execution.get_execution`.
 
     Returns:
         Dictionary containing the variables extracted from ERA5.
     """
-    files_era5 = list((global_data_dir / "era5").glob("*.nc"))
-    files_era5_land = list((global_data_dir / "era5-land").glob("*.nc"))
-
-    if len(files_era5) == 0:
-        raise FileNotFoundError(
-            f"No netCDF files found in the folder '{global_data_dir / 'era5'}'"
-        )
-    if len(files_era5_land) == 0:
-        raise FileNotFoundError(
-            f"No netCDF files found in the folder '{global_data_dir / 'era5-land'}'"
-        )
-
-    return load_era5_data(
-        files_era5,
-        files_era5_land,
+    selections = select_era5_data(
+        global_data_dir,
         latlon,
         time_range,
-        timestep,
+        cache,
+        chunk_sizes=execution.chunk_sizes if execution else None,
     )
+    point_cache.compute_point_series(selections, execution)
+    return era5_data_from_selection(
+        (selections[0].series, selections[1].series), time_range, timestep
+    )[0]
 
 
-def load_era5_data(
-    files_era5: list[Path],
-    files_era5_land: list[Path],
+def select_era5_data(
+    global_data_dir: Path,
     latlon: Union[tuple[int, int], tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
-    timestep: str,
-) -> dict:
-    """Extract and convert the required variables from the ERA5 data.
+    cache: Optional[point_cache.PointCache] = None,
+    *,
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> tuple[point_cache.PointSelection, point_cache.PointSelection]:
+    """Get the ERA5 and ERA5-land data of a site from the cache, or select it (lazily).
 
     Args:
-        files_era5: List of ERA5 files.
-        files_era5_land: List of ERA5-land files.
+        global_data_dir: Path to the directory containing the global datasets.
         latlon: Latitude and longitude of the site.
         time_range: Start and end time of the model run.
-        timestep: Desired timestep of the model, this is derived from the forcing data.
-            In a pandas-timedelta compatible format. For example: "1800s"
+        cache: Optional cache of the extracted point series, see
+            `point_cache.PointCache`.
+        chunk_sizes: Optional chunk sizes with which the datasets are opened, see
+            `dask_execution.get_chunk_sizes`.
 
     Returns:
-        Dictionary containing the variables extracted from ERA5.
+        The ERA5 and ERA5-land data of the site, with the dimensions "time" and
+            "site". They are computed (and cached) with
+            `point_cache.compute_point_series`.
     """
-    ds = xr.merge(
-        [
-            get_era5_dataset(
-                files=files,
-                name=name,  # type: ignore
+    manifests = _get_era5_manifests(global_data_dir)
+    files_era5, files_era5_land = _get_era5_files(
+        global_data_dir, manifests, [latlon], time_range
+    )
+
+    selections = []
+    for name, folder, files in [
+        ("ERA5", "era5", files_era5),
+        ("ERA5-land", "era5-land", files_era5_land),
+    ]:
+        selections.append(
+            point_cache.select_point_series(
+                cache,
+                name,
+                dataset_manifest=manifests[folder],
                 latlon=latlon,
+                resolution=RESOLUTION_ERA5 if name == "ERA5" else RESOLUTION_ERA5LAND,
                 time_range=time_range,
-                timestep=timestep,
+                select=functools.partial(
+                    select_era5_dataset_batch,
+                    files,
+                    name,  # type: ignore
+                    [latlon],
+                    time_range,
+                    chunk_sizes,
+                ),
             )
-            for (name, files) in [("ERA5", files_era5), ("ERA5-land", files_era5_land)]
-        ]
+        )
+    return selections[0], selections[1]
+
+
+def select_era5_data_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> tuple[xr.Dataset, xr.Dataset]:
+    """Validate the ERA5 and ERA5-land datasets, and select many sites (lazily).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+        time_range: Start and end time of the model run.
+        chunk_sizes: Optional chunk sizes with which the datasets are opened, see
+            `dask_execution.get_chunk_sizes`.
+
+    Returns:
+        The (not yet computed) ERA5 and ERA5-land data of the sites, with the
+            dimensions "time" and "site".
+    """
+    files_era5, files_era5_land = _get_era5_files(
+        global_data_dir, _get_era5_manifests(global_data_dir), latlons, time_range
+    )
+    return (
+        select_era5_dataset_batch(files_era5, "ERA5", latlons, time_range, chunk_sizes),
+        select_era5_dataset_batch(
+            files_era5_land, "ERA5-land", latlons, time_range, chunk_sizes
+        ),
     )
 
+
+def era5_data_from_selection(
+    selection: tuple[xr.Dataset, xr.Dataset],
+    time_range: tuple[np.datetime64, np.datetime64],
+    timestep: str,
+) -> list[dict]:
+    """Convert the computed selection of `select_era5_data_batch` per site.
+
+    Args:
+        selection: The computed ERA5 and ERA5-land data of the sites.
+        time_range: Start and end time of the model run.
+        timestep: Desired timestep of the model, in a pandas-timedelta compatible
+            format.
+
+    Returns:
+        For every site, a dictionary containing the variables extracted from ERA5.
+    """
+    ds = xr.merge([utils.resample_point(ds, time_range, timestep) for ds in selection])
+    data = convert_era5_variables(ds)
+    return [
+        {var: value.isel(site=i, drop=True) for var, value in data.items()}
+        for i in range(ds.sizes["site"])
+    ]
+
+
+def _get_era5_manifests(global_data_dir: Path) -> dict[str, manifest.DatasetManifest]:
+    """Get the (refreshed) manifests of the ERA5 and ERA5-land folders."""
+    return {
+        folder: manifest.get_manifest(global_data_dir / folder)
+        for folder in ("era5", "era5-land")
+    }
+
+
+def _get_era5_files(
+    global_data_dir: Path,
+    manifests: dict[str, manifest.DatasetManifest],
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+) -> tuple[list[Path], list[Path]]:
+    """Get the ERA5 and ERA5-land files needed for the sites and time range.
+
+    If an up-to-date point store exists (see `build_point_store`), it is used instead
+    of the original files. Otherwise, the files are selected with the manifest of the
+    folder, see `manifest.DatasetManifest.select_files`. A FileNotFoundError is
+    raised if a folder is empty.
+    """
+    files = []
+    for folder, resolution in [
+        ("era5", RESOLUTION_ERA5),
+        ("era5-land", RESOLUTION_ERA5LAND),
+    ]:
+        store = get_point_store(global_data_dir, folder, manifests[folder])
+        if store is not None:
+            files.append([store])
+        else:
+            files.append(
+                manifests[folder].select_files(time_range, latlons, resolution)
+            )
+    return files[0], files[1]
+
+
+def get_point_store(
+    global_data_dir: Path,
+    folder: Literal["era5", "era5-land"],
+    dataset_manifest: manifest.DatasetManifest,
+) -> Optional[Path]:
+    """Get the point store of the ERA5 or ERA5-land folder, if it is up to date.
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        folder: Either "era5" or "era5-land".
+        dataset_manifest: The (refreshed) manifest of the folder.
+
+    Returns:
+        Path to the point store, or None if it does not exist or if the files in the
+            folder were added, modified or removed after the store was built.
+    """
+    store = global_data_dir / POINT_STORE_DIR / f"{folder}.nc"
+    if not store.exists():
+        return None
+
+    with dataset_pool.NETCDF_LOCK, xr.open_dataset(store) as ds:
+        source_fingerprint = ds.attrs.get("source_fingerprint")
+    if source_fingerprint != dataset_manifest.fingerprint():
+        logger.warning(
+            "The point store %s is out of date and is not used. Please run "
+            "build_point_store again.",
+            store,
+        )
+        return None
+    return store
+
+
+def build_point_store(
+    global_data_dir: Path,
+    time_chunk: int = POINT_STORE_TIME_CHUNK,
+    space_chunk: int = POINT_STORE_SPACE_CHUNK,
+) -> list[Path]:
+    """Rechunk the ERA5 and ERA5-land data into a store optimized for point access.
+
+    The ERA5 files are chunked for map access (one or a few time steps per chunk),
+    so extracting the time series of a single site reads (and decompresses) the
+    whole map of every time step. The store is a netCDF file per dataset, with long
+    chunks along time and small chunks along latitude and longitude, so that a
+    site is read with a few contiguous reads. The values and encoding of the
+    variables are not changed.
+
+    The store is written to the `era5_point_store` folder in the global data
+    directory, and is used by `retrieve_era5_data` for as long as the original
+    files are not modified.
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        time_chunk: Length of the chunks along time. Defaults to a year of hourly
+            data.
+        space_chunk: Length of the chunks along latitude and longitude.
+
+    Returns:
+        Paths to the ERA5 and ERA5-land store files.
+    """
+    store_dir = global_data_dir / POINT_STORE_DIR
+    store_dir.mkdir(exist_ok=True)
+
+    stores = []
+    for folder, dataset_manifest in _get_era5_manifests(global_data_dir).items():
+        files = dataset_manifest.select_files(time_range=None, latlons=None)
+        store = store_dir / f"{folder}.nc"
+        tmp_store = store.with_suffix(".nc.tmp")
+        with xr.open_mfdataset(files, chunks="auto") as ds:
+            encoding = {}
+            for var in ds.data_vars:
+                var_encoding = {
+                    key: value
+                    for key, value in ds[var].encoding.items()
+                    if key in ("dtype", "scale_factor", "add_offset", "_FillValue")
+                }
+                var_encoding["chunksizes"] = tuple(
+                    min(time_chunk if dim == "time" else space_chunk, size)
+                    for dim, size in zip(ds[var].dims, ds[var].shape)
+                )
+                encoding[var] = var_encoding
+            ds.attrs["source_fingerprint"] = dataset_manifest.fingerprint()
+            ds.to_netcdf(tmp_store, encoding=encoding)
+        tmp_store.replace(store)
+        logger.info("Built the %s point store %s", folder, store)
+        stores.append(store)
+    return stores
+
+
+def convert_era5_variables(ds: xr.Dataset) -> dict:
+    """Convert the ERA5 and ERA5-land variables to the forcing variables.
+
+    Args:
+        ds: Merged ERA5 and ERA5-land dataset, for one or more sites.
+
+    Returns:
+        Dictionary containing the variables extracted from ERA5.
+    """
     data = {}
     data["wind_speed"] = (ds["u10"] ** 2 + ds["v10"] ** 2) ** 0.5
     data["t_air_celcius"] = ds["t2m"] - 273.15  # K -> degC
@@ -102,53 +322,38 @@ def load_era5_data(
     return data
 
 
-def get_era5_dataset(
+def select_era5_dataset_batch(
     files: list[Path],
     name: Literal["ERA5", "ERA5-land"],
-    latlon: Union[tuple[int, int], tuple[float, float]],
+    latlons: list[tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
-    timestep: str,
+    chunk_sizes: Optional[dict[str, int]] = None,
 ) -> xr.Dataset:
-    """Load the ERA5/ERA5-land multifile dataset, and select the location before merge.
+    """Validate the ERA5/ERA5-land multifile dataset, and select many sites (lazily).
 
     Args:
         files: The ERA5 or ERA5-land files.
-        latlon: Latitude and longitude of the site.
         name: Either "ERA5" or "ERA5-land".
+        latlons: Latitude and longitude of every site.
         time_range: Start and end time of the model run.
-        timestep: Desired timestep of the model, this is derived from the forcing data.
-            In a pandas-timedelta compatible format. For example: "1800s"
+        chunk_sizes: Optional chunk sizes with which the dataset is opened, see
+            `dask_execution.get_chunk_sizes`.
 
     Returns:
-        The ERA5 or ERA5-land dataset.
+        The (not yet computed) dataset, with the dimensions "time" and "site".
     """
     tol = RESOLUTION_ERA5 if name == "ERA5" else RESOLUTION_ERA5LAND
 
-    ds = xr.open_mfdataset(files, chunks="auto")
-
-    check_era5_dataset(ds, name, latlon, time_range)
+    ds = dataset_pool.open_mfdataset(
+        files,
+        chunks=dask_execution.dataset_chunks(chunk_sizes, "latitude", "longitude"),
+    )
 
-    try:
-        ds = ds.sel(
-            latitude=latlon[0],
-            longitude=latlon[1],
-            method="nearest",
-            tolerance=tol,
-        )
-    except KeyError as err:
-        if "not all values found" in str(err):
-            raise utils.MissingDataError(
-                f"No data point was found within {tol} degrees of the specified "
-                f"location {latlon}. Please check the netCDF files or select a "
-                "different location."
-            ) from err
-        else:
-            raise err
+    for latlon in latlons:
+        check_era5_dataset(ds, name, latlon, time_range)
 
-    ds = ds.drop_vars(["latitude", "longitude"])
-    ds = ds.compute()
-    ds = ds.resample(time=timestep).interpolate("linear")
-    return ds.sel(time=slice(time_range[0], time_range[1]))
+    ds = utils.select_points(ds, latlons, tol, xdim="longitude", ydim="latitude")
+    return ds.drop_vars(["latitude", "longitude"])
 
 
 def check_era5_dataset(
@@ -1,8 +1,9 @@
 """Module to load and check the ETH Canopy Height (2020) dataset."""
-import gzip
 from pathlib import Path
 from typing import Union
+import numpy as np
 import xarray as xr
+from PyStemmusScope.global_data import tile_index
 from PyStemmusScope.global_data import utils
 
 
@@ -24,8 +25,45 @@ def retrieve_canopy_height_data(
     Returns:
         Canopy height at the location.
     """
+    filename = _get_canopy_height_file(global_data_dir, lat, lon)
+    return extract_canopy_height_data(filename, lat, lon)
+
+
+def retrieve_canopy_height_data_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+) -> list[float]:
+    """Retrieve the canopy height for many sites at once.
+
+    Every canopy height tile is opened once, for all sites within that tile.
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+
+    Returns:
+        The canopy height of every site, equal to the output of
+            `retrieve_canopy_height_data`.
+    """
+    sites_per_file: dict[Path, list[int]] = {}
+    for i, (lat, lon) in enumerate(latlons):
+        filename = _get_canopy_height_file(global_data_dir, lat, lon)
+        sites_per_file.setdefault(filename, []).append(i)
+
+    canopy_heights = [0.0] * len(latlons)
+    for filename, sites in sites_per_file.items():
+        with xr.open_dataarray(filename, engine="rasterio") as da:
+            for i in sites:
+                canopy_heights[i] = _find_canopy_height(da, *latlons[i])
+    return canopy_heights
+
+
+def _get_canopy_height_file(
+    global_data_dir: Path, lat: Union[int, float], lon: Union[int, float]
+) -> Path:
+    """Get the canopy height file of the location, and check that it exists."""
     filename = global_data_dir / "canopy_height" / get_filename_canopy_height(lat, lon)
-    assert_tile_existance(filename.name)
+    assert_tile_existance(lat, lon)
 
     if not filename.exists():
         raise FileNotFoundError(
@@ -35,7 +73,7 @@ def retrieve_canopy_height_data(
             f"\nPlease download the file, or change the global data"
             f"\ndirectory to point to the right location."
         )
-    return extract_canopy_height_data(filename, lat, lon)
+    return filename
 
 
 def extract_canopy_height_data(
@@ -53,15 +91,20 @@ def extract_canopy_height_data(
     Returns:
         Canopy height at the location.
     """
-    da = xr.open_dataarray(file_canopy_height, engine="rasterio")
-    da = da.sortby(["x", "y"])
+    with xr.open_dataarray(file_canopy_height, engine="rasterio") as da:
+        return _find_canopy_height(da, lat, lon)
 
-    pad = 0.05  # Add padding around the data before trying to find nearest non-nan
-    da = da.sel(y=slice(lat - pad, lat + pad), x=slice(lon - pad, lon + pad))
 
+def _find_canopy_height(
+    da: xr.DataArray, lat: Union[int, float], lon: Union[int, float]
+) -> float:
+    """Find the canopy height of the nearest valid data point in the tile.
+
+    Only the pixels within MAX_DISTANCE of the location are read from the tile.
+    """
     try:
-        canopy_height = utils.find_nearest_non_nan(
-            da.compute(),
+        canopy_height = utils.find_nearest_non_nan_window(
+            da,
             x=lon,
             y=lat,
             max_distance=MAX_DISTANCE,
@@ -97,17 +140,22 @@ def get_filename_canopy_height(lat: Union[int, float], lon: Union[int, float]) -
     return f"ETH_GlobalCanopyHeight_10m_2020_{latstr}{lonstr}_Map.tif"
 
 
-def assert_tile_existance(filename: str) -> None:
-    """Assert that a canopy height tile exists with the specified filename."""
-    valid_name_file = (
-        Path(__file__).parent / "assets" / "h_canopy_filenames_compressed.txt.gz"
-    )
-
-    with gzip.open(valid_name_file, "rb") as f:
-        valid_filenames = f.read().decode("utf-8")
-
-    if filename not in valid_filenames:
+def assert_tile_existance(lat: Union[int, float], lon: Union[int, float]) -> None:
+    """Assert that a canopy height tile exists for the specified location."""
+    if not tile_index.get_tile_index("canopy_height").exists(lat, lon):
         raise utils.InvalidLocationError(
             "\nNo canopy height data tile exists for the specified location."
             "\nPlease select a different location."
         )
+
+
+def tiles_exist(latlons: list[tuple[float, float]]) -> np.ndarray:
+    """Check for many locations at once if a canopy height tile exists.
+
+    Args:
+        latlons: Latitude and longitude of every location.
+
+    Returns:
+        Boolean array, True for the locations of which the tile exists.
+    """
+    return tile_index.get_tile_index("canopy_height").exists_many(latlons)
@@ -1,28 +1,319 @@
 """Module containing the full global dataset collection."""
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from pathlib import Path
 from typing import Any
+from typing import Callable
+from typing import Optional
 from typing import Union
 import numpy as np
 import pandas as pd
 import xarray as xr
 from PyStemmusScope import global_data as gd
 from PyStemmusScope import variable_conversion as vc
+from PyStemmusScope.global_data.point_cache import PointCache
 
 
-def collect_datasets(
+logger = logging.getLogger(__name__)
+
+
+def _retrieval_tasks(  # noqa:PLR0913 (too many arguments)
+    global_data_dir: Path,
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    cache: Optional[PointCache] = None,
+    *,
+    chunk_sizes: Optional[dict[str, int]] = None,
+) -> dict[str, Callable[[], Any]]:
+    """Get the retrieval function of every global dataset, by dataset name.
+
+    The ERA5, CAMS, LAI and land cover functions return the (not yet computed) point
+    selections of the site, see `point_cache.select_point_series`.
+    """
+    return {
+        "era5": functools.partial(
+            gd.era5.select_era5_data,
+            global_data_dir,
+            latlon,
+            time_range,
+            cache,
+            chunk_sizes=chunk_sizes,
+        ),
+        "cams_co2": functools.partial(
+            gd.cams_co2.select_co2_data,
+            global_data_dir,
+            latlon,
+            time_range,
+            cache,
+            chunk_sizes=chunk_sizes,
+        ),
+        "copernicus_lai": functools.partial(
+            gd.copernicus_lai.select_lai_data,
+            global_data_dir,
+            latlon,
+            time_range,
+            cache,
+            chunk_sizes=chunk_sizes,
+        ),
+        "prism_dem": functools.partial(
+            gd.prism_dem.retrieve_dem_data, global_data_dir, latlon[0], latlon[1]
+        ),
+        "eth_canopy_height": functools.partial(
+            gd.eth_canopy_height.retrieve_canopy_height_data,
+            global_data_dir,
+            latlon[0],
+            latlon[1],
+        ),
+        "cci_landcover": functools.partial(
+            gd.cci_landcover.select_landcover_data,
+            global_data_dir,
+            latlon,
+            time_range,
+            cache,
+            chunk_sizes=chunk_sizes,
+        ),
+    }
+
+
+def _timed_retrieval(name: str, task: Callable[[], Any]) -> Any:
+    """Retrieve a dataset, and log the time it took."""
+    start = time.perf_counter()
+    result = task()
+    logger.info("Retrieved %s data in %.2f s", name, time.perf_counter() - start)
+    return result
+
+
+def _retrieve_datasets(
+    tasks: dict[str, Callable[[], Any]],
+    workers: int,
+    timeout: Union[None, float, dict[str, float]],
+) -> dict[str, Any]:
+    """Run the retrieval tasks, concurrently if more than one worker is used.
+
+    Args:
+        tasks: Retrieval function of every dataset, by dataset name.
+        workers: Maximum number of datasets retrieved at the same time.
+        timeout: Maximum time in seconds (counted from the start of the retrieval) to
+            wait for a dataset, either for all datasets or per dataset name. Only
+            used if more than one worker is used.
+
+    Returns:
+        The result of every retrieval function, by dataset name.
+    """
+    if workers < 1:
+        raise ValueError("The number of workers should be at least 1.")
+    if workers == 1:
+        return {name: _timed_retrieval(name, task) for name, task in tasks.items()}
+
+    timeouts = timeout if isinstance(timeout, dict) else dict.fromkeys(tasks, timeout)
+    start = time.perf_counter()
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            name: executor.submit(_timed_retrieval, name, task)
+            for name, task in tasks.items()
+        }
+        for name, future in futures.items():
+            dataset_timeout = timeouts.get(name)
+            remaining = (
+                None
+                if dataset_timeout is None
+                else max(0.0, start + dataset_timeout - time.perf_counter())
+            )
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FuturesTimeoutError as err:
+                raise TimeoutError(
+                    f"Retrieving the {name} data took longer than {dataset_timeout} s."
+                ) from err
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def collect_datasets(  # noqa:PLR0913 (too many arguments)
     global_data_dir: Path,
     latlon: Union[tuple[int, int], tuple[float, float]],
     time_range: tuple[np.datetime64, np.datetime64],
     timestep: str,
+    *,
+    workers: int = 1,
+    timeout: Union[None, float, dict[str, float]] = None,
+    cache: Optional[PointCache] = None,
+    execution: Optional[gd.dask_execution.DaskExecution] = None,
 ) -> dict:
     """Collect and merge all the global datasets into one.
 
+    The datasets are independent of each other. With more than one worker, they are
+    opened and validated concurrently by a pool of threads, so this takes about as
+    long as the slowest dataset instead of the sum of all of them. The (uncached)
+    point series of the ERA5, CAMS, LAI and land cover datasets are then computed
+    with a single `dask.compute` call, on the configured scheduler.
+
     Args:
         global_data_dir: Path to the directory containing the global datasets.
         latlon: Latitude and longitude of the site.
         time_range: Start and end time of the model run.
         timestep: Desired timestep of the model, this is derived from the forcing data.
             In a pandas-timedelta compatible format. For example: "1800s"
+        workers: Maximum number of datasets opened at the same time. Defaults to 1
+            (one after another).
+        timeout: Optional maximum time in seconds to wait for the datasets to be
+            opened (and for the DEM and canopy height to be retrieved), counted
+            from the start of the retrieval. Either a single value for all datasets,
+            or a dictionary by dataset name ("era5", "cams_co2", "copernicus_lai",
+            "prism_dem", "eth_canopy_height", "cci_landcover"). Only used if more
+            than one worker is used. A TimeoutError is raised when it is exceeded.
+        cache: Optional cache of the extracted point series of the ERA5, CAMS, LAI
+            and land cover data, see `point_cache.PointCache`.
+        execution: Optional dask execution of the ERA5, CAMS, LAI and land cover
+            data, see `dask_execution.get_execution`.
+
+    Returns:
+        Dictionary containing the variables extracted from the global datasets.
+    """
+    retrieved = _retrieve_datasets(
+        _retrieval_tasks(
+            global_data_dir,
+            latlon,
+            time_range,
+            cache,
+            chunk_sizes=execution.chunk_sizes if execution else None,
+        ),
+        workers,
+        timeout,
+    )
+
+    era5_selections = retrieved["era5"]
+    selections = {
+        "cams_co2": retrieved["cams_co2"],
+        "copernicus_lai": retrieved["copernicus_lai"],
+        "cci_landcover": retrieved["cci_landcover"],
+    }
+    start = time.perf_counter()
+    gd.point_cache.compute_point_series(
+        [*era5_selections, *selections.values()], execution
+    )
+    logger.info(
+        "Computed the era5, %s data in %.2f s",
+        ", ".join(selections),
+        time.perf_counter() - start,
+    )
+
+    retrieved["era5"] = gd.era5.era5_data_from_selection(
+        (era5_selections[0].series, era5_selections[1].series), time_range, timestep
+    )[0]
+    conversions = {
+        "cams_co2": gd.cams_co2.co2_data_from_selection,
+        "copernicus_lai": gd.copernicus_lai.lai_data_from_selection,
+        "cci_landcover": gd.cci_landcover.landcover_data_from_selection,
+    }
+    for name, convert in conversions.items():
+        retrieved[name] = convert(selections[name].series, time_range, timestep)[0]
+    return _merge_datasets(retrieved, latlon, time_range, timestep)
+
+
+def collect_datasets_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    timestep: str,
+    execution: Optional[gd.dask_execution.DaskExecution] = None,
+) -> list[dict]:
+    """Collect and merge all the global datasets for many sites at once.
+
+    Every (multi-file) dataset is opened once. All sites are selected with a single
+    pointwise selection along a "site" dimension, instead of opening and scanning all
+    files again for every site. The selections of the ERA5, CAMS, LAI and land cover
+    datasets are computed with a single `dask.compute` call, so that they run
+    concurrently on the configured scheduler (see `dask_execution`).
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+        time_range: Start and end time of the model run.
+        timestep: Desired timestep of the model, this is derived from the forcing data.
+            In a pandas-timedelta compatible format. For example: "1800s"
+        execution: Optional dask execution of the ERA5, CAMS, LAI and land cover
+            data, see `dask_execution.get_execution`.
+
+    Returns:
+        For every site (in the same order), a dictionary containing the variables
+            extracted from the global datasets, equal to the output of
+            `collect_datasets`.
+    """
+    selection_tasks = {
+        "era5": gd.era5.select_era5_data_batch,
+        "cams_co2": gd.cams_co2.select_co2_data_batch,
+        "copernicus_lai": gd.copernicus_lai.select_lai_data_batch,
+        "cci_landcover": gd.cci_landcover.select_landcover_data_batch,
+    }
+    chunk_sizes = execution.chunk_sizes if execution else None
+    selections = {
+        name: task(global_data_dir, latlons, time_range, chunk_sizes)
+        for name, task in selection_tasks.items()
+    }
+    start = time.perf_counter()
+    computed = gd.dask_execution.compute_datasets(selections, execution)
+    logger.info(
+        "Computed the %s data in %.2f s",
+        ", ".join(selections),
+        time.perf_counter() - start,
+    )
+
+    conversions = {
+        "era5": gd.era5.era5_data_from_selection,
+        "cams_co2": gd.cams_co2.co2_data_from_selection,
+        "copernicus_lai": gd.copernicus_lai.lai_data_from_selection,
+        "cci_landcover": gd.cci_landcover.landcover_data_from_selection,
+    }
+    retrieved = {
+        name: convert(computed[name], time_range, timestep)
+        for name, convert in conversions.items()
+    }
+    retrieved["prism_dem"] = _timed_retrieval(
+        "prism_dem",
+        functools.partial(
+            gd.prism_dem.retrieve_dem_data_batch, global_data_dir, latlons
+        ),
+    )
+    retrieved["eth_canopy_height"] = _timed_retrieval(
+        "eth_canopy_height",
+        functools.partial(
+            gd.eth_canopy_height.retrieve_canopy_height_data_batch,
+            global_data_dir,
+            latlons,
+        ),
+    )
+
+    return [
+        _merge_datasets(
+            {name: values[i] for name, values in retrieved.items()},
+            latlon,
+            time_range,
+            timestep,
+        )
+        for i, latlon in enumerate(latlons)
+    ]
+
+
+def _merge_datasets(
+    retrieved: dict[str, Any],
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    time_range: tuple[np.datetime64, np.datetime64],
+    timestep: str,
+) -> dict:
+    """Merge the data retrieved from the global datasets for one site into one dict.
+
+    Args:
+        retrieved: The data retrieved for the site, by dataset name.
+        latlon: Latitude and longitude of the site.
+        time_range: Start and end time of the model run.
+        timestep: Desired timestep of the model.
 
     Returns:
         Dictionary containing the variables extracted from the global datasets.
@@ -34,48 +325,20 @@ def collect_datasets(
             )
         )
     }
-    era5_data = gd.era5.retrieve_era5_data(
-        global_data_dir,
-        latlon,
-        time_range,
-        timestep,
-    )
 
-    data = {**data, **era5_data}
+    data = {**data, **retrieved["era5"]}
 
     data["wind_speed"] = vc.mask_data(data["wind_speed"], min_value=0.05)
 
     data["co2_conv"] = (
-        vc.co2_mass_fraction_to_kg_per_m3(
-            gd.cams_co2.retrieve_co2_data(
-                global_data_dir,
-                latlon,
-                time_range,
-                timestep,
-            )
-        )
-        * 1e6
+        vc.co2_mass_fraction_to_kg_per_m3(retrieved["cams_co2"]) * 1e6
     )  # kg/m3 -> mg/m3
 
-    data["lai"] = vc.mask_data(
-        gd.copernicus_lai.retrieve_lai_data(
-            global_data_dir,
-            latlon,
-            time_range,
-            timestep,
-        ),
-        min_value=0.01,
-    )
+    data["lai"] = vc.mask_data(retrieved["copernicus_lai"], min_value=0.01)
 
-    data["elevation"] = gd.prism_dem.retrieve_dem_data(
-        global_data_dir, latlon[0], latlon[1]
-    )
+    data["elevation"] = retrieved["prism_dem"]
 
-    data["canopy_height"] = gd.eth_canopy_height.retrieve_canopy_height_data(
-        global_data_dir,
-        latlon[0],
-        latlon[1],
-    )
+    data["canopy_height"] = retrieved["eth_canopy_height"]
 
     # Height of measurement. Data has no actual equivalent. Set to a temporary value.
     # See issue #145.
@@ -100,12 +363,7 @@ def collect_datasets(
     data["latitude"] = latlon[0]
     data["longitude"] = latlon[1]
 
-    landcover_data = gd.cci_landcover.retrieve_landcover_data(
-        global_data_dir,
-        latlon,
-        time_range,
-        timestep,
-    )
+    landcover_data = retrieved["cci_landcover"]
     data["IGBP_veg_long"] = landcover_data["IGBP_veg_long"]
     data["LCCS_landcover"] = landcover_data["LCCS_landcover"]
 
@@ -0,0 +1,384 @@
+"""Manifest of the netCDF files in a global dataset folder.
+
+The global datasets (ERA5, CAMS, LAI and land cover) are split over many netCDF
+files, e.g. per variable and per year or per time step. Opening all of them with
+`xr.open_mfdataset` for a model run of a few days is slow, as every file is opened
+and the coordinates of every file are read and combined.
+
+This module keeps a manifest of every dataset folder, with per file the size and
+modification time, and the time bounds, latitude and longitude bounds and the
+variables. The metadata of a file is read when it is needed, and read again only if
+the file was modified. It is used to select the files which are needed for a time
+range and location, before the dataset is opened.
+
+The files are only selected if the optional config key `GlobalDataManifestPath` is
+set (see `configure_manifest`). The manifests are then stored as json files in that
+directory, so that they are shared between processes and sessions. Otherwise, the
+manifests are kept in memory and all files are opened: building the manifest would
+open every file in each process, only to open the selected files again.
+
+A retrieval gets the (refreshed) manifest of a folder once with `get_manifest`, and
+passes it on to the file selection, the point store and the point cache.
+"""
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from typing import Optional
+from typing import Union
+import numpy as np
+import pandas as pd
+import xarray as xr
+from PyStemmusScope import dataset_pool
+from PyStemmusScope import utils
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+LATITUDE_NAMES = ("latitude", "lat")
+LONGITUDE_NAMES = ("longitude", "lon")
+
+_MANIFESTS: dict[tuple[Path, Optional[Path]], "DatasetManifest"] = {}
+
+# Directory in which the manifests are stored, set with `configure_manifest`
+_SETTINGS: dict[str, Optional[Path]] = {"manifest_dir": None}
+
+
+def manifest_dir() -> Optional[Path]:
+    """Directory in which the manifests are stored, None if they are kept in memory."""
+    return _SETTINGS["manifest_dir"]
+
+
+def configure_manifest(config: dict) -> None:
+    """Set the directory in which the manifests are stored from the config.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary. If it contains the key
+            `GlobalDataManifestPath`, the manifests are stored in that directory.
+    """
+    if config.get("GlobalDataManifestPath"):
+        _SETTINGS["manifest_dir"] = utils.to_absolute_path(
+            config["GlobalDataManifestPath"]
+        )
+
+
+def _coordinate_bounds(ds: xr.Dataset, names: tuple[str, ...]) -> Optional[list[float]]:
+    """Get the minimum and maximum of the first coordinate of the dataset in names."""
+    for name in names:
+        if name in ds.coords and ds[name].size > 0:
+            values = ds[name].values
+            return [float(values.min()), float(values.max())]
+    return None
+
+
+def read_file_metadata(dataset_file: Path) -> dict[str, Any]:
+    """Read the time bounds, latitude and longitude bounds and variables of a file.
+
+    Args:
+        dataset_file: Path to a netCDF file of a global dataset.
+
+    Returns:
+        Dictionary with the metadata of the file. A bound is None if the file does
+            not have that coordinate, and all values are None if the file could not
+            be read.
+    """
+    metadata: dict[str, Any] = {
+        "start": None,
+        "end": None,
+        "latitude": None,
+        "longitude": None,
+        "variables": None,
+    }
+    try:
+        with dataset_pool.NETCDF_LOCK, xr.open_dataset(dataset_file) as ds:
+            if "time" in ds.coords and ds["time"].size > 0:
+                time_values = ds["time"].values
+                metadata["start"] = str(
+                    np.datetime_as_string(time_values.min(), unit="s")
+                )
+                metadata["end"] = str(
+                    np.datetime_as_string(time_values.max(), unit="s")
+                )
+            metadata["latitude"] = _coordinate_bounds(ds, LATITUDE_NAMES)
+            metadata["longitude"] = _coordinate_bounds(ds, LONGITUDE_NAMES)
+            metadata["variables"] = sorted(str(var) for var in ds.data_vars)
+    except (OSError, ValueError, TypeError) as err:
+        logger.debug("Could not read the metadata of %s: %s", dataset_file, err)
+    return metadata
+
+
+def _covers_location(
+    entry: dict,
+    latlons: list[tuple[float, float]],
+    tolerance: float,
+) -> bool:
+    """Check if the file of a manifest entry covers any of the locations."""
+    lat_bounds, lon_bounds = entry["latitude"], entry["longitude"]
+    for lat, lon in latlons:
+        if lat_bounds is not None and not (
+            lat_bounds[0] - tolerance <= lat <= lat_bounds[1] + tolerance
+        ):
+            continue
+        if lon_bounds is not None and not (
+            lon_bounds[0] - tolerance <= lon <= lon_bounds[1] + tolerance
+        ):
+            continue
+        return True
+    return False
+
+
+def _select_time(
+    entries: dict[str, dict], start: pd.Timestamp, end: pd.Timestamp
+) -> list[str]:
+    """Select the files which overlap with the time range.
+
+    The closest file before the start, and after the end, are selected as well if
+    the overlapping files do not contain the start or end time itself, as they are
+    needed to interpolate the data to the model time.
+    """
+    selected = []
+    overlapping: dict[str, tuple[pd.Timestamp, pd.Timestamp]] = {}
+    before: dict[str, pd.Timestamp] = {}
+    after: dict[str, pd.Timestamp] = {}
+    for name, entry in entries.items():
+        if entry["start"] is None:
+            selected.append(name)
+            continue
+        file_start, file_end = pd.Timestamp(entry["start"]), pd.Timestamp(entry["end"])
+        if file_end < start:
+            before[name] = file_end
+        elif file_start > end:
+            after[name] = file_start
+        else:
+            overlapping[name] = (file_start, file_end)
+    selected += list(overlapping)
+
+    if before and not any(bounds[0] <= start for bounds in overlapping.values()):
+        closest = max(before.values())
+        selected += [name for name, file_end in before.items() if file_end == closest]
+    if after and not any(bounds[1] >= end for bounds in overlapping.values()):
+        closest = min(after.values())
+        selected += [
+            name for name, file_start in after.items() if file_start == closest
+        ]
+    return selected
+
+
+class DatasetManifest:
+    """Manifest of the netCDF files in a global dataset folder."""
+
+    def __init__(
+        self,
+        folder: Union[str, Path],
+        manifest_dir: Optional[Union[str, Path]] = None,
+    ):
+        """Manifest of the netCDF files in a global dataset folder.
+
+        The stored manifest is loaded if it exists. Call `refresh` to bring it up to
+        date with the folder.
+
+        Args:
+            folder: The dataset folder, e.g. `global_data_dir / "era5"`.
+            manifest_dir: Optional directory in which the manifest is stored. If
+                None, the manifest is only kept in memory.
+        """
+        self.folder = Path(folder).resolve()
+        self.manifest_file: Optional[Path] = None
+        if manifest_dir is not None:
+            key = hashlib.sha256(str(self.folder).encode()).hexdigest()[:16]
+            self.manifest_file = Path(manifest_dir) / f"{key}.json"
+        self.files: dict[str, dict] = {}
+
+        if self.manifest_file is not None and self.manifest_file.exists():
+            try:
+                with self.manifest_file.open(encoding="utf8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            if stored.get("version") == MANIFEST_VERSION:
+                self.files = stored["files"]
+
+    @property
+    def stored(self) -> bool:
+        """If the manifest is stored, and therefore used to select the files."""
+        return self.manifest_file is not None
+
+    def refresh(self) -> None:
+        """Update the manifest for files which were added, modified or removed.
+
+        No files are opened. The metadata of the new and modified files (by size and
+        modification time) is read when it is needed.
+        """
+        changed = False
+        names = set()
+        if self.folder.is_dir():
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".nc") or not entry.is_file():
+                        continue
+                    names.add(entry.name)
+                    changed |= self._update_entry(entry.name, entry.stat())
+
+        for name in set(self.files) - names:
+            del self.files[name]
+            changed = True
+
+        if changed:
+            self.save()
+
+    def select_files(
+        self,
+        time_range: Optional[tuple[np.datetime64, np.datetime64]] = None,
+        latlons: Optional[list[tuple[float, float]]] = None,
+        tolerance: float = 0.0,
+    ) -> list[Path]:
+        """Select the files needed for a time range and (one or more) locations.
+
+        If the manifest is not stored, all files are returned without reading their
+        metadata. Files of which the time or location could not be read are always
+        selected. If no file matches, all files are returned, so that the
+        validation of the opened dataset reports what is missing.
+
+        Args:
+            time_range: Start and end time of the model run. If None, the files are
+                not selected by time.
+            latlons: Latitude and longitude of every site. If None, the files are not
+                selected by location.
+            tolerance: Distance in degrees which a site may be outside of the bounds
+                of a file, usually the resolution of the dataset.
+
+        Returns:
+            Sorted paths to the selected files. A FileNotFoundError is raised if the
+                folder does not contain any netCDF files.
+        """
+        if not self.files:
+            raise FileNotFoundError(
+                f"No netCDF files found in the folder '{self.folder}'"
+            )
+        if not self.stored:
+            return [self.folder / name for name in sorted(self.files)]
+
+        entries = self._read_metadata(self.files)
+        if latlons is not None:
+            entries = {
+                name: entry
+                for name, entry in entries.items()
+                if _covers_location(entry, latlons, tolerance)
+            }
+
+        if time_range is not None:
+            start, end = pd.Timestamp(time_range[0]), pd.Timestamp(time_range[1])
+            # select per group of variables, e.g. if each variable has its own files
+            groups: dict[tuple, dict[str, dict]] = {}
+            for name, entry in entries.items():
+                groups.setdefault(tuple(entry["variables"] or ()), {})[name] = entry
+            selected = [
+                name
+                for group in groups.values()
+                for name in _select_time(group, start, end)
+            ]
+        else:
+            selected = list(entries)
+
+        if not selected:
+            selected = list(self.files)
+        return [self.folder / name for name in sorted(selected)]
+
+    def grid_origin(self) -> tuple[float, float]:
+        """Get the first latitude and longitude of the grid of the dataset.
+
+        The files of a dataset share the same (regular) grid, so the metadata of only
+        one file is read.
+
+        Returns:
+            The minimum latitude and longitude of the first file which has them, or
+                (0, 0) if none of the files has them.
+        """
+        for name in sorted(self.files):
+            entry = self._read_metadata([name])[name]
+            if entry["latitude"] and entry["longitude"]:
+                return entry["latitude"][0], entry["longitude"][0]
+        return 0.0, 0.0
+
+    def fingerprint(self) -> str:
+        """Hash of the name, size and modification time of every file in the folder.
+
+        The fingerprint changes when files are added, modified or removed.
+        """
+        files = {
+            name: [entry["size"], entry["mtime"]]
+            for name, entry in sorted(self.files.items())
+        }
+        return hashlib.sha256(json.dumps(files).encode()).hexdigest()
+
+    def save(self) -> None:
+        """Write the manifest to the manifest directory, if the manifest is stored.
+
+        If the manifest directory is not writable, the manifest is only kept in memory.
+        """
+        if self.manifest_file is None:
+            return
+        tmp_file = self.manifest_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open("w", encoding="utf8") as f:
+                json.dump(
+                    {
+                        "version": MANIFEST_VERSION,
+                        "folder": str(self.folder),
+                        "files": self.files,
+                    },
+                    f,
+                )
+            tmp_file.replace(self.manifest_file)
+        except OSError as err:
+            logger.debug("Could not write the dataset manifest %s: %s", tmp_file, err)
+
+    def _update_entry(self, fname: str, st: os.stat_result) -> bool:
+        """Reset the entry of a file if it is new or modified. Returns if it was."""
+        entry = self.files.get(fname)
+        if (
+            entry is not None
+            and entry["size"] == st.st_size
+            and entry["mtime"] == st.st_mtime_ns
+        ):
+            return False
+
+        self.files[fname] = {"size": st.st_size, "mtime": st.st_mtime_ns}
+        return True
+
+    def _read_metadata(self, names: Iterable[str]) -> dict[str, dict]:
+        """Get the entries of the files, reading the metadata of those without it."""
+        entries = {name: self.files[name] for name in names}
+        unread = [name for name, entry in entries.items() if "variables" not in entry]
+        for name in unread:
+            entries[name].update(read_file_metadata(self.folder / name))
+        if unread:
+            self.save()
+        return entries
+
+
+def get_manifest(folder: Union[str, Path]) -> DatasetManifest:
+    """Get the (refreshed) manifest of a global dataset folder.
+
+    The same manifest object is returned for the same folder within a process. It is
+    stored in the directory set with `configure_manifest`, if any.
+
+    Args:
+        folder: The dataset folder, e.g. `global_data_dir / "era5"`.
+
+    Returns:
+        The manifest of the folder.
+    """
+    folder = Path(folder).resolve()
+    key = (folder, manifest_dir())
+    if key not in _MANIFESTS:
+        _MANIFESTS[key] = DatasetManifest(folder, manifest_dir())
+    manifest = _MANIFESTS[key]
+    manifest.refresh()
+    return manifest
@@ -0,0 +1,338 @@
+"""Disk cache of the point series extracted from the global datasets.
+
+In global mode, the ERA5, ERA5-land, CAMS, LAI and land cover data of a site is
+extracted from the global datasets for every model run, even if the same site was
+run before. This module stores the extracted series of a site at the native
+resolution of the dataset (before resampling to the model timestep), so that a
+later run at the same grid cell can use it for any time range which it covers.
+
+A cache entry is keyed by the dataset, the grid cell of the site (snapped with the
+resolution of the dataset) and the fingerprint of the dataset folder (see
+`manifest.DatasetManifest.fingerprint`), so entries are not used anymore once the
+files of the dataset change. An entry records the dataset files from which its
+series was extracted. When a run needs other files of the same grid cell (e.g. for
+another time window), the newly extracted series is merged into the entry.
+
+The cache is enabled by setting `GlobalDataCachePath` in the config file. The
+maximum total size can be set with `GlobalDataCacheMaxSize` (e.g. "500MB"), and the
+maximum age (in days since the entry was last used) with `GlobalDataCacheMaxAge`.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Callable
+from typing import Optional
+from typing import Union
+import numpy as np
+import xarray as xr
+from PyStemmusScope import dataset_pool
+from PyStemmusScope import forcing_cache
+from PyStemmusScope import utils
+from PyStemmusScope.global_data import dask_execution
+from PyStemmusScope.global_data import manifest
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = "1GB"
+CACHE_VERSION = 3
+
+# Attribute of a cache entry with the names of the files it was extracted from
+SOURCE_FILES_ATTR = "source_files"
+
+
+def snap_to_grid(
+    dataset_manifest: manifest.DatasetManifest,
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    resolution: float,
+) -> tuple[int, int]:
+    """Get the grid cell of a location, counted from a grid point of the dataset.
+
+    Args:
+        dataset_manifest: The manifest of the dataset folder.
+        latlon: Latitude and longitude of the site.
+        resolution: Resolution of the dataset in degrees.
+
+    Returns:
+        The (latitude, longitude) index of the grid cell.
+    """
+    lat0, lon0 = dataset_manifest.grid_origin()
+    return (
+        round((latlon[0] - lat0) / resolution),
+        round((latlon[1] - lon0) / resolution),
+    )
+
+
+class PointCache:
+    """Cache of extracted point series with LRU eviction by total size and age."""
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_size: Union[str, int],
+        max_age: Optional[float] = None,
+    ):
+        """Cache of extracted point series with LRU eviction by total size and age.
+
+        Args:
+            cache_dir: Directory in which the cache entries are stored.
+            max_size: Maximum total size of the cache, in bytes or as a size string
+                (e.g. "1GB").
+            max_age: Optional maximum time in days since an entry was last used.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = forcing_cache.parse_size(max_size)
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(
+        self,
+        dataset: str,
+        dataset_manifest: manifest.DatasetManifest,
+        latlon: Union[tuple[int, int], tuple[float, float]],
+        resolution: float,
+    ) -> str:
+        """Create the cache key of the point series of a site.
+
+        Args:
+            dataset: Name of the dataset, e.g. "ERA5".
+            dataset_manifest: The (refreshed) manifest of the dataset folder.
+            latlon: Latitude and longitude of the site.
+            resolution: Resolution of the dataset in degrees.
+
+        Returns:
+            Hexadecimal hash of the dataset name, grid cell and folder fingerprint.
+        """
+        key_data = {
+            "dataset": dataset,
+            "cell": snap_to_grid(dataset_manifest, latlon, resolution),
+            "fingerprint": dataset_manifest.fingerprint(),
+            "version": CACHE_VERSION,
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str, files: Iterable[Path]) -> Optional[xr.Dataset]:
+        """Get the cached point series, if it was extracted from all the files.
+
+        Args:
+            key: Cache key, generated by `make_key`.
+            files: The dataset files that the series should contain, e.g. the files
+                selected for the time range of the model run.
+
+        Returns:
+            The point series, or None if it is not cached or does not contain the
+                data of all the files.
+        """
+        series = self._read(key)
+        if series is None:
+            return None
+        if not {file.name for file in files} <= _source_files(series):
+            return None
+
+        # Update the access time, used for the least-recently-used eviction.
+        os.utime(self.cache_dir / f"{key}.nc")
+        del series.attrs[SOURCE_FILES_ATTR]
+        return series
+
+    def store(self, key: str, series: xr.Dataset, files: Iterable[Path]) -> None:
+        """Add a point series to the cache, merged with the existing entry of the key.
+
+        The series is merged along time with the series of the existing entry, so
+        the entry contains the data of the files of both. At times in both, the
+        data of the new series is kept.
+
+        Args:
+            key: Cache key, generated by `make_key`.
+            series: The extracted (computed) point series.
+            files: The dataset files from which the series was extracted.
+        """
+        source_files = {file.name for file in files}
+        existing = self._read(key)
+        if existing is not None:
+            source_files |= _source_files(existing)
+            series = xr.concat(
+                [series, existing],
+                dim="time",
+                data_vars="minimal",
+                coords="minimal",
+                compat="override",
+                combine_attrs="override",
+            )
+            # sorted by time, keeping the first (new) data of duplicate times
+            _, index = np.unique(series["time"], return_index=True)
+            series = series.isel(time=index)
+        series = series.drop_encoding()
+        series.attrs[SOURCE_FILES_ATTR] = json.dumps(sorted(source_files))
+
+        entry = self.cache_dir / f"{key}.nc"
+        tmp_entry = self.cache_dir / f".{key}.{os.getpid()}.tmp"
+        with dataset_pool.NETCDF_LOCK:
+            series.to_netcdf(tmp_entry)
+        tmp_entry.replace(entry)
+        self.evict()
+
+    def _read(self, key: str) -> Optional[xr.Dataset]:
+        """Read the (whole) entry of the key, or None if it does not exist."""
+        entry = self.cache_dir / f"{key}.nc"
+        if not entry.exists():
+            return None
+        with dataset_pool.NETCDF_LOCK, xr.open_dataset(entry) as ds:
+            return ds.load()
+
+    def evict(self) -> None:
+        """Remove expired entries, and the least recently used ones beyond max size."""
+        entries = sorted(
+            (file.stat().st_mtime, file.stat().st_size, file)
+            for file in self.cache_dir.glob("*.nc")
+        )
+        total_size = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, entry in entries:
+            expired = (
+                self.max_age is not None and now - mtime > self.max_age * 24 * 3600
+            )
+            if total_size <= self.max_size and not expired:
+                continue
+            logger.info("Evicting global data cache entry %s", entry.stem)
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+    def _log(self, result: str, dataset: str, key: str) -> None:
+        logger.info(
+            "Global data cache %s for %s, key %s (hits: %d, misses: %d)",
+            result,
+            dataset,
+            key[:12],
+            self.hits,
+            self.misses,
+        )
+
+
+def _source_files(series: xr.Dataset) -> set[str]:
+    """Get the names of the files from which a cached series was extracted."""
+    return set(json.loads(series.attrs.get(SOURCE_FILES_ATTR, "[]")))
+
+
+@dataclass
+class PointSelection:
+    """The point series of a site: either from the cache, or (lazily) selected."""
+
+    series: xr.Dataset
+    # The cache and key under which the series is stored once it is computed, and
+    # the files from which it is extracted
+    cache: Optional[PointCache] = None
+    key: Optional[str] = None
+    files: list[Path] = field(default_factory=list)
+
+
+def select_point_series(  # noqa:PLR0913 (too many arguments)
+    cache: Optional[PointCache],
+    dataset: str,
+    *,
+    dataset_manifest: manifest.DatasetManifest,
+    latlon: Union[tuple[int, int], tuple[float, float]],
+    resolution: float,
+    time_range: tuple[np.datetime64, np.datetime64],
+    select: Callable[[], xr.Dataset],
+) -> PointSelection:
+    """Get the point series of a site from the cache, or select it from the dataset.
+
+    A selected series is not computed yet, so that the series of all datasets can be
+    computed together with `compute_point_series`, which also caches them.
+
+    Args:
+        cache: The point cache, or None if caching is not enabled.
+        dataset: Name of the dataset, e.g. "ERA5".
+        dataset_manifest: The (refreshed) manifest of the dataset folder.
+        latlon: Latitude and longitude of the site.
+        resolution: Resolution of the dataset in degrees.
+        time_range: Start and end time of the model run.
+        select: Function selecting the (lazy) point series from the dataset, with
+            the dimensions "time" and "site".
+
+    Returns:
+        The point series, at the native time resolution of the dataset.
+    """
+    if cache is None:
+        return PointSelection(select())
+
+    # The series should contain all the files that the time range needs, e.g. the
+    # (yearly) data before and after the time range for interpolation. If the
+    # manifest is not stored, these are all files of the dataset.
+    files = dataset_manifest.select_files(time_range, [latlon], resolution)
+
+    key = cache.make_key(dataset, dataset_manifest, latlon, resolution)
+    series = cache.get(key, files)
+    if series is not None:
+        cache.hits += 1
+        cache._log("hit", dataset, key)
+        return PointSelection(series)
+
+    cache.misses += 1
+    cache._log("miss", dataset, key)
+    return PointSelection(select(), cache, key, files)
+
+
+def compute_point_series(
+    selections: Iterable[PointSelection],
+    execution: Optional[dask_execution.DaskExecution] = None,
+) -> None:
+    """Compute the point series of the selections together, and cache them.
+
+    The series are computed with a single `dask.compute` call (see
+    `dask_execution.compute_datasets`), and replaced by the computed series.
+
+    Args:
+        selections: The point series, e.g. of all global datasets for a site.
+        execution: Optional dask execution, see `dask_execution.get_execution`.
+    """
+    selections = list(selections)
+    computed = dask_execution.compute_datasets(
+        {str(i): selection.series for i, selection in enumerate(selections)},
+        execution,
+    )
+    for i, selection in enumerate(selections):
+        selection.series = computed[str(i)]  # type: ignore
+        if selection.cache is not None and selection.key is not None:
+            selection.cache.store(selection.key, selection.series, selection.files)
+
+
+_CACHES: dict[Path, PointCache] = {}
+
+
+def get_point_cache(config: dict) -> Optional[PointCache]:
+    """Get the point cache configured in the config, or None if it is not enabled.
+
+    The same cache object is returned for the same cache directory, so the hit and
+    miss counts accumulate within a process.
+
+    Args:
+        config: The PyStemmusScope configuration dictionary.
+
+    Returns:
+        The point cache, or None if `GlobalDataCachePath` is not set.
+    """
+    if not config.get("GlobalDataCachePath"):
+        return None
+
+    cache_dir = utils.to_absolute_path(config["GlobalDataCachePath"])
+    max_size = config.get("GlobalDataCacheMaxSize", DEFAULT_MAX_SIZE)
+    max_age = (
+        float(config["GlobalDataCacheMaxAge"])
+        if config.get("GlobalDataCacheMaxAge")
+        else None
+    )
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = PointCache(cache_dir, max_size, max_age)
+    else:
+        _CACHES[cache_dir].max_size = forcing_cache.parse_size(max_size)
+        _CACHES[cache_dir].max_age = max_age
+    return _CACHES[cache_dir]
@@ -1,8 +1,9 @@
 """Module load and check the Prism DEM (Digital Elevation Model) dataset."""
-import gzip
 from pathlib import Path
 from typing import Union
+import numpy as np
 import xarray as xr
+from PyStemmusScope.global_data import tile_index
 from PyStemmusScope.global_data import utils
 
 
@@ -24,9 +25,55 @@ def retrieve_dem_data(
     Returns:
         Surface elevation at the location.
     """
+    filename = _get_dem_file(global_data_dir, lat, lon)
+    return extract_prism_dem_data(filename, lat, lon)
+
+
+def retrieve_dem_data_batch(
+    global_data_dir: Path,
+    latlons: list[tuple[float, float]],
+) -> list[float]:
+    """Retrieve the surface elevation for many sites at once.
+
+    Every DEM tile is opened once, and the window around all sites within that tile
+    is read at once.
+
+    Args:
+        global_data_dir: Path to the directory containing the global datasets.
+        latlons: Latitude and longitude of every site.
+
+    Returns:
+        The surface elevation of every site, equal to the output of
+            `retrieve_dem_data`.
+    """
+    sites_per_file: dict[Path, list[int]] = {}
+    for i, (lat, lon) in enumerate(latlons):
+        filename = _get_dem_file(global_data_dir, lat, lon)
+        sites_per_file.setdefault(filename, []).append(i)
+
+    elevations = [0.0] * len(latlons)
+    for filename, sites in sites_per_file.items():
+        lats = [latlons[i][0] for i in sites]
+        lons = [latlons[i][1] for i in sites]
+        with xr.open_dataarray(filename, engine="rasterio") as da:
+            window = da.isel(utils.raster_window(da, lons, lats, MAX_DISTANCE))
+            nearest = utils.find_nearest_non_nan_batch(
+                window.compute(), lons, lats, max_distance=MAX_DISTANCE
+            )
+        for i, lat, lon, elevation in zip(sites, lats, lons, nearest):
+            if elevation is None:
+                raise _missing_dem_error(lat, lon)
+            elevations[i] = elevation.values[0]
+    return elevations
+
+
+def _get_dem_file(
+    global_data_dir: Path, lat: Union[int, float], lon: Union[int, float]
+) -> Path:
+    """Get the DEM file of the location, and check that it exists."""
     filename = global_data_dir / "dem" / get_filename_dem(lat, lon)
 
-    assert_tile_existance(filename.name.replace("_DEM.tif", ".tar"))
+    assert_tile_existance(lat, lon)
 
     if not filename.exists():
         raise FileNotFoundError(
@@ -36,7 +83,7 @@ def retrieve_dem_data(
             f"\nPlease download the file, or change the global data"
             f"\ndirectory to point to the right location."
         )
-    return extract_prism_dem_data(filename, lat, lon)
+    return filename
 
 
 def extract_prism_dem_data(
@@ -54,26 +101,41 @@ def extract_prism_dem_data(
     Returns:
         Elevation of the location.
     """
-    da = xr.open_dataarray(file_dem, engine="rasterio")
-    elevation = da.sel(x=lon, y=lat, method="nearest")
+    with xr.open_dataarray(file_dem, engine="rasterio") as da:
+        return _find_elevation(da, lat, lon)
+
+
+def _find_elevation(
+    da: xr.DataArray, lat: Union[int, float], lon: Union[int, float]
+) -> float:
+    """Find the elevation of the nearest valid data point in the DEM tile.
 
+    Only the pixels within MAX_DISTANCE of the location are read from the tile.
+    """
     try:
-        elevation = utils.find_nearest_non_nan(
-            da.compute(),
+        elevation = utils.find_nearest_non_nan_window(
+            da,
             x=lon,
             y=lat,
             max_distance=MAX_DISTANCE,
         )
     except utils.MissingDataError as err:
-        raise utils.MissingDataError(
-            f"\nNo valid DEM data found within {MAX_DISTANCE} degrees"
-            f"\nof the selected location ({lat:.3f}, {lon:.3f})."
-            "\nPlease select a different (nearby) location."
-        ) from err
+        raise _missing_dem_error(lat, lon) from err
 
     return elevation.values[0]
 
 
+def _missing_dem_error(
+    lat: Union[int, float], lon: Union[int, float]
+) -> utils.MissingDataError:
+    """Error raised if there is no valid DEM data near the location."""
+    return utils.MissingDataError(
+        f"\nNo valid DEM data found within {MAX_DISTANCE} degrees"
+        f"\nof the selected location ({lat:.3f}, {lon:.3f})."
+        "\nPlease select a different (nearby) location."
+    )
+
+
 def get_filename_dem(lat: Union[int, float], lon: Union[int, float]) -> str:
     """Get the right filename for the Copernicus prism DEM dataset.
 
@@ -95,17 +157,22 @@ def get_filename_dem(lat: Union[int, float], lon: Union[int, float]) -> str:
     return f"Copernicus_DSM_30_{latstr}_00_{lonstr}_00_DEM.tif"
 
 
-def assert_tile_existance(filename: str) -> None:
-    """Assert that a DEM tile exists with the specified filename."""
-    valid_name_file = (
-        Path(__file__).parent / "assets" / "dem_filenames_compressed.txt.gz"
-    )
-
-    with gzip.open(valid_name_file, "rb") as f:
-        valid_filenames = f.read().decode("utf-8")
-
-    if filename not in valid_filenames:
+def assert_tile_existance(lat: Union[int, float], lon: Union[int, float]) -> None:
+    """Assert that a DEM tile exists for the specified location."""
+    if not tile_index.get_tile_index("dem").exists(lat, lon):
         raise utils.InvalidLocationError(
             "\nNo DEM data tile exists for the specified location.\n"
             "Please select a different location."
         )
+
+
+def tiles_exist(latlons: list[tuple[float, float]]) -> np.ndarray:
+    """Check for many locations at once if a DEM tile exists.
+
+    Args:
+        latlons: Latitude and longitude of every location.
+
+    Returns:
+        Boolean array, True for the locations of which the tile exists.
+    """
+    return tile_index.get_tile_index("dem").exists_many(latlons)
@@ -0,0 +1,100 @@
+"""Index of the existing tiles of the tiled global datasets (DEM and canopy height).
+
+The PRISM DEM and ETH canopy height datasets are split into tiles of 1 and 3 degrees,
+and there are no tiles for areas which are only ocean. The names of the existing
+tiles are stored in (gzipped) text files in the assets folder.
+
+This module parses those files once per process into a bitmap of the tiles, keyed by
+the integer latitude and longitude of the (south west) corner of the tile, so that
+checking if the tile of a location exists does not require reading the file again.
+Many locations can be checked at once with `TileIndex.exists_many`.
+"""
+import gzip
+import re
+from pathlib import Path
+from typing import Union
+import numpy as np
+
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+# Asset file and tile size (in degrees) of every tiled dataset.
+TILE_ASSETS = {
+    "dem": ("dem_filenames_compressed.txt.gz", 1),
+    "canopy_height": ("h_canopy_filenames_compressed.txt.gz", 3),
+}
+
+_TILE_PATTERN = re.compile(r"_([NS])(\d{2})(?:_00_|)([EW])(\d{3})[_.]")
+
+_TILE_INDEXES: dict[str, "TileIndex"] = {}
+
+
+class TileIndex:
+    """Bitmap of the existing tiles of a dataset, keyed by the corner of the tile."""
+
+    def __init__(self, asset_file: Path, step: int):
+        """Bitmap of the existing tiles of a dataset, keyed by the corner of the tile.
+
+        Args:
+            asset_file: Gzipped text file with the name of every existing tile.
+            step: Size of the tiles in degrees.
+        """
+        self.step = step
+        self.bitmap = np.zeros((180 // step + 1, 360 // step + 1), dtype=bool)
+
+        with gzip.open(asset_file, "rt", encoding="utf-8") as f:
+            for line in f:
+                match = _TILE_PATTERN.search(line)
+                if match is None:
+                    continue
+                lat = int(match[2]) * (1 if match[1] == "N" else -1)
+                lon = int(match[4]) * (1 if match[3] == "E" else -1)
+                self.bitmap[(lat + 90) // step, (lon + 180) // step] = True
+
+    def exists(self, lat: Union[int, float], lon: Union[int, float]) -> bool:
+        """Check if the tile containing the location exists.
+
+        Args:
+            lat: Latitude between -90 and 90.
+            lon: Longitude between -180 and 180.
+
+        Returns:
+            True if the tile exists.
+        """
+        return bool(self.exists_many([(lat, lon)])[0])
+
+    def exists_many(
+        self, latlons: Union[list[tuple[float, float]], np.ndarray]
+    ) -> np.ndarray:
+        """Check for many locations at once if the tile containing it exists.
+
+        Args:
+            latlons: Latitude and longitude of every location.
+
+        Returns:
+            Boolean array, True for the locations of which the tile exists.
+        """
+        lats, lons = np.asarray(latlons, dtype=float).reshape(-1, 2).T
+        if np.any((lats > 90) | (lats < -90)):
+            raise ValueError("Latitude out of bounds (-90, 90)")
+        if np.any((lons > 180) | (lons < -180)):
+            raise ValueError("Longitude out of bounds (-180, 180)")
+
+        rows = (lats // self.step).astype(int) + 90 // self.step
+        cols = (lons // self.step).astype(int) + 180 // self.step
+        return self.bitmap[rows, cols]
+
+
+def get_tile_index(dataset: str) -> TileIndex:
+    """Get the tile index of a dataset, which is loaded once per process.
+
+    Args:
+        dataset: Name of the tiled dataset, "dem" or "canopy_height".
+
+    Returns:
+        The tile index of the dataset.
+    """
+    if dataset not in _TILE_INDEXES:
+        asset_name, step = TILE_ASSETS[dataset]
+        _TILE_INDEXES[dataset] = TileIndex(ASSETS_DIR / asset_name, step)
+    return _TILE_INDEXES[dataset]
@@ -1,6 +1,7 @@
 """Utility funtions for the global data IO."""
 from typing import Union
 import numpy as np
+import pandas as pd
 import xarray as xr
 
 
@@ -75,6 +76,258 @@ def assert_time_within_bounds(
         )
 
 
+def select_points(
+    data: Union[xr.DataArray, xr.Dataset],
+    latlons: list[tuple[float, float]],
+    tolerance: float,
+    xdim: str = "x",
+    ydim: str = "y",
+) -> Union[xr.DataArray, xr.Dataset]:
+    """Select the nearest data points of many locations at once.
+
+    The locations are selected with a single (vectorized) pointwise selection, which
+    replaces the x and y dimensions by a new dimension "site".
+
+    Args:
+        data: Dataset or DataArray containing the xdim and ydim as dimensions.
+        latlons: Latitude and longitude of every location.
+        tolerance: Maximum distance between a location and the nearest data point,
+            along each of the dimensions (same units as the x and y coordinates).
+        xdim: optional, to be used if the x-dimension is named "lon" or "longitude".
+        ydim: optional, to be used if the y-dimension is named "lat" or "latitude".
+
+    Returns:
+        The input data reduced to the nearest data points, along the "site" dimension.
+    """
+    lats = xr.DataArray([lat for lat, _ in latlons], dims="site")
+    lons = xr.DataArray([lon for _, lon in latlons], dims="site")
+    selected = data.sel({ydim: lats, xdim: lons}, method="nearest")
+
+    too_far = (np.abs(selected[ydim] - lats) > tolerance) | (
+        np.abs(selected[xdim] - lons) > tolerance
+    )
+    if too_far.any():
+        latlon = latlons[int(too_far.argmax())]
+        raise MissingDataError(
+            f"No data point was found within {tolerance} degrees of the specified "
+            f"location {latlon}. Please check the netCDF files or select a "
+            "different location."
+        )
+    return selected
+
+
+def resample_point(
+    ds: xr.Dataset,
+    time_range: tuple[np.datetime64, np.datetime64],
+    timestep: str,
+) -> xr.Dataset:
+    """Linearly interpolate the (computed) data of one or more sites to the model time.
+
+    The model time axis is the time range with the given timestep. For every model
+    time only the data before and after it is read, and all variables are
+    interpolated in one vectorized step. This gives the same values as
+    `ds.resample(time=timestep).interpolate("linear")` (followed by a selection of the
+    time range), without creating the upsampled data of the whole dataset.
+
+    Args:
+        ds: Dataset with a (sorted) time dimension, at the native time resolution.
+        time_range: Start and end time of the model run.
+        timestep: Desired timestep of the model, this is derived from the forcing data.
+            In a pandas-timedelta compatible format. For example: "1800s"
+
+    Returns:
+        The dataset at the model timestep, within the time range. Model times before
+            the first time of the data are NaN.
+    """
+    times = ds["time"].to_numpy()
+    target = pd.date_range(time_range[0], time_range[1], freq=timestep).to_numpy()
+    target = target[
+        (target > times[0] - pd.Timedelta(timestep)) & (target <= times[-1])
+    ]
+
+    # Same arithmetic as scipy's linear interp1d, which xarray uses, with the times
+    # as float nanoseconds since the first time of the data. Like interp1d, numpy's
+    # interp is used for one-dimensional float64 or integer data.
+    x = (times - times[0]) / np.timedelta64(1, "ns")
+    x_new = (target - times[0]) / np.timedelta64(1, "ns")
+    hi = np.searchsorted(x, x_new).clip(1, x.size - 1)
+    lo = hi - 1
+    out_of_bounds = (x_new < x[0]) | (x_new > x[-1])
+
+    resampled = ds.isel(time=lo).assign_coords(time=target)
+    for name, var in ds.data_vars.items():
+        if "time" not in var.dims:
+            continue
+        y = var.transpose("time", ...).to_numpy()
+        if y.ndim == 1 and y.dtype in (np.dtype(np.float64), np.dtype(int)):
+            values = np.interp(x_new, x, y)
+        else:
+            shape = (-1,) + (1,) * (y.ndim - 1)
+            slope = (y[hi] - y[lo]) / (x[hi] - x[lo]).reshape(shape)
+            values = slope * (x_new - x[lo]).reshape(shape) + y[lo]
+        values[out_of_bounds] = np.nan
+        resampled[name] = (
+            xr.DataArray(values, dims=("time",) + var.transpose("time", ...).dims[1:])
+            .transpose(*var.dims)
+            .assign_attrs(var.attrs)
+        )
+    return resampled
+
+
+def _axis_distance(coords: np.ndarray, index: int, offset: int, value: float) -> float:
+    """Smallest distance to value of the coordinates at index +/- offset."""
+    distances = [
+        abs(coords[i] - value)
+        for i in (index - offset, index + offset)
+        if 0 <= i < coords.size
+    ]
+    return min(distances, default=np.inf)
+
+
+def _ring_indices(
+    index: tuple[int, int], offset: int, shape: tuple[int, int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the (clipped) y and x indices of the ring at offset around the index."""
+    iy, ix = index
+    rows = np.arange(max(iy - offset, 0), min(iy + offset, shape[0] - 1) + 1)
+    cols = np.arange(max(ix - offset, 0), min(ix + offset, shape[1] - 1) + 1)
+    if offset == 0:
+        return rows, cols
+    edge_rows = [i for i in (iy - offset, iy + offset) if 0 <= i < shape[0]]
+    edge_cols = [j for j in (ix - offset, ix + offset) if 0 <= j < shape[1]]
+    inner_rows = rows[np.abs(rows - iy) < offset]
+    y_indices = np.concatenate(
+        [np.repeat(edge_rows, cols.size), np.repeat(inner_rows, len(edge_cols))]
+    )
+    x_indices = np.concatenate(
+        [np.tile(cols, len(edge_rows)), np.tile(edge_cols, inner_rows.size)]
+    )
+    return y_indices.astype(int), x_indices.astype(int)
+
+
+def _ring_search(  # noqa:PLR0913 (too many arguments)
+    values: np.ndarray,
+    xs: np.ndarray,
+    ys: np.ndarray,
+    x: float,
+    y: float,
+    *,
+    max_distance: Union[float, None],
+) -> Union[tuple[int, int], None]:
+    """Find the (y, x) index of the nearest non-nan value of a 2-d (y, x) array.
+
+    The search starts at the pixel nearest to the location, and expands in rings
+    around it. It stops once the pixels of the next ring can not be nearer than the
+    nearest non-nan value found so far, or than max_distance. Of equally near
+    values, the one with the lowest x index (and then y index) is returned, like
+    `argmin` over the x and y dimensions does.
+
+    Returns:
+        The index of the nearest non-nan value, or None if there is none (within
+            max_distance).
+    """
+    if values.size == 0:
+        return None
+    center = (int(np.abs(ys - y).argmin()), int(np.abs(xs - x).argmin()))
+    best: Union[tuple[float, int, int], None] = None
+    for offset in range(max(values.shape)):
+        bound = min(
+            _axis_distance(ys, center[0], offset, y),
+            _axis_distance(xs, center[1], offset, x),
+        )
+        if (
+            bound == np.inf
+            or (best is not None and bound > best[0])
+            or (max_distance is not None and bound >= max_distance)
+        ):
+            break
+
+        y_indices, x_indices = _ring_indices(center, offset, values.shape)  # type: ignore
+        valid = ~np.isnan(values[y_indices, x_indices])
+        y_indices, x_indices = y_indices[valid], x_indices[valid]
+        distance = ((xs[x_indices] - x) ** 2 + (ys[y_indices] - y) ** 2) ** 0.5
+        for d, j, i in zip(distance, x_indices, y_indices):
+            if best is None or (d, j, i) < best:
+                best = (d, int(j), int(i))
+
+    if best is None or (max_distance is not None and not best[0] < max_distance):
+        return None
+    return best[2], best[1]
+
+
+def find_nearest_non_nan_batch(  # noqa:PLR0913 (too many arguments)
+    da: xr.DataArray,
+    xs: list[float],
+    ys: list[float],
+    *,
+    xdim: str = "x",
+    ydim: str = "y",
+    max_distance: Union[float, None] = None,
+) -> list[Union[xr.DataArray, None]]:
+    """Extract the (Cartesian) nearest non-nan values of many locations.
+
+    Every location is searched in rings around its nearest pixel, so only the pixels
+    up to the nearest non-nan value are visited. The data is loaded only once for
+    all locations. The x and y coordinates should be monotonic, like those of a
+    raster or regular grid.
+
+    Args:
+        da: DataArray containing the data, and the xdim and ydim as dimensions
+        xs: x-coordinate of every location
+        ys: y-coordinate of every location
+        xdim: optional, to be used if the x-dimension is named "lon" or "longitude".
+        ydim: optional, to be used if the y-dimension is named "lat" or "latitude".
+        max_distance: Maximum distance between the specified location and the nearest
+            non-nan location (same units as x and y coordinates).
+
+    Returns:
+        For every location, the input dataarray reduced to only that location, or
+            None if no non-nan data could be found (within max_distance). The
+            results are the same as those of `find_nearest_non_nan`.
+    """
+    other_dims = [dim for dim in da.dims if dim not in (xdim, ydim)]
+    values = da.transpose(*other_dims, ydim, xdim).to_numpy()
+    x_coords = da[xdim].to_numpy()
+    y_coords = da[ydim].to_numpy()
+
+    results: list[Union[xr.DataArray, None]] = []
+    for x, y in zip(xs, ys):
+        # Every other (e.g. band) index has its own nearest non-nan value. Only one
+        # of them has to be within max_distance.
+        found = {
+            other_index: _ring_search(
+                values[other_index], x_coords, y_coords, x, y, max_distance=max_distance
+            )
+            for other_index in np.ndindex(values.shape[:-2])
+        }
+        if any(index is not None for index in found.values()):
+            found = {
+                other_index: index
+                or _ring_search(
+                    values[other_index], x_coords, y_coords, x, y, max_distance=None
+                )
+                for other_index, index in found.items()
+            }
+        if any(index is None for index in found.values()):
+            results.append(None)
+            continue
+
+        indices = np.zeros(values.shape[:-2] + (2,), dtype=int)
+        for other_index, index in found.items():
+            indices[other_index] = index
+
+        coords = {dim: da[dim] for dim in other_dims if dim in da.coords}
+        results.append(
+            da.isel(
+                {
+                    ydim: xr.DataArray(indices[..., 0], dims=other_dims, coords=coords),
+                    xdim: xr.DataArray(indices[..., 1], dims=other_dims, coords=coords),
+                }
+            )
+        )
+    return results
+
+
 def find_nearest_non_nan(  # noqa:PLR0913 (too many arguments)
     da: xr.DataArray,
     x: float,
@@ -85,6 +338,10 @@ def find_nearest_non_nan(  # noqa:PLR0913 (too many arguments)
 ) -> xr.DataArray:
     """Extract the (Cartesian) nearest non-nan value from a DataArray.
 
+    The search expands in rings around the pixel nearest to the location, and stops
+    at the nearest non-nan value (or at max_distance), see
+    `find_nearest_non_nan_batch`.
+
     Args:
         da: DataArray containing the data, and the xdim and ydim as dimensions
         x: x-coordinate of interest
@@ -97,13 +354,84 @@ def find_nearest_non_nan(  # noqa:PLR0913 (too many arguments)
     Returns:
         The input dataarray reduced to only one location
     """
-    distance = ((da[xdim] - x) ** 2 + (da[ydim] - y) ** 2) ** 0.5
-    distance = distance.where(~np.isnan(da), np.nan)
-    if max_distance is None or distance.min() < max_distance:
-        return da.isel(distance.argmin(dim=[xdim, ydim]))  # type: ignore
-    raise MissingDataError(
-        "No non-nan data could be found within specified the maximum distance."
+    nearest = find_nearest_non_nan_batch(
+        da, [x], [y], xdim=xdim, ydim=ydim, max_distance=max_distance
+    )[0]
+    if nearest is None:
+        raise MissingDataError(
+            "No non-nan data could be found within specified the maximum distance."
+        )
+    return nearest
+
+
+def _pixel_slice(bounds: tuple[float, float], size: int) -> slice:
+    """Get the slice of the pixels (with an extra pixel margin) within the bounds."""
+    start = max(int(np.floor(min(bounds))), 0)
+    stop = min(int(np.ceil(max(bounds))) + 1, size)
+    return slice(start, max(start, stop))
+
+
+def raster_window(
+    da: xr.DataArray,
+    x: Union[float, list[float]],
+    y: Union[float, list[float]],
+    half_width: float,
+) -> dict[str, slice]:
+    """Get the pixel window of a raster around one or more locations.
+
+    The window is computed from the affine transform of the raster, so the
+    coordinates are not read or sorted. Both ascending and descending x and y
+    coordinates are supported.
+
+    Args:
+        da: DataArray opened with the rasterio engine, with "x" and "y" dimensions.
+        x: x-coordinate(s) of interest
+        y: y-coordinate(s) of interest
+        half_width: Half width of the window (same units as x and y coordinates).
+
+    Returns:
+        The slices of the "x" and "y" dimensions, for use with `da.isel`. They
+            contain every pixel within half_width of the location(s).
+    """
+    transform = da.rio.transform()
+    cols = tuple(
+        (xi - transform.c) / transform.a
+        for xi in (np.min(x) - half_width, np.max(x) + half_width)
     )
+    rows = tuple(
+        (yi - transform.f) / transform.e
+        for yi in (np.min(y) - half_width, np.max(y) + half_width)
+    )
+    return {
+        "x": _pixel_slice(cols, da.sizes["x"]),  # type: ignore
+        "y": _pixel_slice(rows, da.sizes["y"]),  # type: ignore
+    }
+
+
+def find_nearest_non_nan_window(
+    da: xr.DataArray,
+    x: float,
+    y: float,
+    max_distance: float,
+) -> xr.DataArray:
+    """Extract the nearest non-nan value, only reading the data around the location.
+
+    Only the window of `max_distance` around the location is read from the (lazily
+    loaded) raster, as no data outside of it can be near enough. The result is the
+    same as that of `find_nearest_non_nan` on the whole raster.
+
+    Args:
+        da: DataArray opened with the rasterio engine, with "x" and "y" dimensions.
+        x: x-coordinate of interest
+        y: y-coordinate of interest
+        max_distance: Maximum distance between the specified location and the nearest
+            non-nan location (same units as x and y coordinates).
+
+    Returns:
+        The input dataarray reduced to only one location
+    """
+    window = da.isel(raster_window(da, x, y, max_distance))
+    return find_nearest_non_nan(window.compute(), x, y, max_distance=max_distance)
 
 
 def make_lat_lon_strings(
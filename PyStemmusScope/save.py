@@ -49,8 +49,8 @@ def _select_forcing_variables(
 
     Args:
         forcing_dict(dict): a dictionary returned by
-            `PyStemmusScope.forcing_io.read_forcing_data_plumber2()` or
-            `read_forcing_data_global()`
+            `PyStemmusScope.forcing_io.read_forcing_data_plumber2()`,
+            `read_forcing_data_global()` or `read_postprocessing_file()`
         forcing_var(str): variable name in forcing dataset.
         alma_var(str): variable name in ALMA convention.
 
@@ -190,8 +190,8 @@ def _update_dataset_attrs_dims(dataset: xr.Dataset, forcing_dict: dict) -> xr.Da
     Args:
         dataset: Dataset with varaibles in ALMA conventions.
         forcing_dict: a dictionary returned by
-            `PyStemmusScope.forcing_io.read_forcing_data_plumber2()` or
-            `read_forcing_data_global()`
+            `PyStemmusScope.forcing_io.read_forcing_data_plumber2()`,
+            `read_forcing_data_global()` or `read_postprocessing_file()`
 
     Returns:
         The dataset with dimensions ("time", "x", "y").
@@ -249,9 +249,20 @@ def to_netcdf(config_file: str, cf_filename: str) -> str:
 
     Returns:
         Path to a csv file under the output directory.
+
+    Raises:
+        ValueError: If the `Location` is a bounding box. Its grid cells are saved
+            separately, with the config file of every cell.
     """
     config = config_io.read_config(Path(config_file))
     loc, fmt = utils.check_location_fmt(config["Location"])
+    if fmt == "bbox":
+        raise ValueError(
+            "The output of a bounding box `Location` is saved per grid cell. Please "
+            "call `to_netcdf` with the config file of every grid cell instead, i.e. "
+            f"'{config_io.BBOX_CELL_CONFIG_FILE}' in the input directory of the cell "
+            f"under '{config['InputPath']}' (see `config_io.bbox_cell_configs`)."
+        )
 
     # list of required forcing variables, Alma_short_name: forcing_io_name, # model_name
     var_names = {
@@ -265,14 +276,18 @@ def to_netcdf(config_file: str, cf_filename: str) -> str:
         "Precip": "precip_conv",  # Pre
     }
 
-    if fmt == "site":
+    # use the forcing variables stored when the forcing files were prepared, or
+    #  read them again from the forcing data if they are not available
+    forcing_dict = forcing_io.read_postprocessing_file(Path(config["InputPath"]))
+
+    if forcing_dict is None and fmt == "site":
         # read forcing file into a dict
         forcing_dict = forcing_io.read_forcing_data_plumber2(
             utils.get_forcing_file(config),
             config["StartTime"],
             config["EndTime"],
         )
-    elif fmt == "latlon":
+    elif forcing_dict is None and fmt == "latlon":
         forcing_dict = forcing_io.read_forcing_data_global(
             Path(config["ForcingPath"]),
             lat=loc[0],  # type: ignore
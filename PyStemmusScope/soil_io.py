@@ -1,17 +1,37 @@
 """Module for the soil data IO of PyStemmusScope."""
 from collections.abc import Iterable
 from pathlib import Path
+from typing import Union
 import hdf5storage
 import numpy as np
 import xarray as xr
+from . import config_io
+from . import dataset_pool
 from . import utils
 from . import variable_conversion as vc
 
 
+# Depths of the soil layers of STEMMUS_SCOPE, in cm for the Schaap dataset and as
+# indices (0 - 7) of the depth dimension of the lambda and soil composition datasets.
+SCHAAP_DEPTHS = [0, 5, 30, 60, 100, 200]
+DEPTH_INDICES = [0, 2, 4, 5, 6, 7]
+
+SOIL_COMPOSITION_FILES = [
+    "CLAY1.nc",
+    "CLAY2.nc",
+    "OC1.nc",
+    "OC2.nc",
+    "SAND1.nc",
+    "SAND2.nc",
+    "SILT1.nc",
+    "SILT2.nc",
+]
+
+
 def _open_multifile_datasets(
     paths: Iterable[Path],
-    lat: float,
-    lon: float,
+    lat: Union[float, xr.DataArray],
+    lon: Union[float, xr.DataArray],
     lat_key: str = "lat",
     lon_key: str = "lon",
 ) -> xr.Dataset:
@@ -23,7 +43,8 @@ def _open_multifile_datasets(
 
     Args:
         paths: Iterable containing the paths to the netCDF files
-        lat: Latitude of the site of interest (in degrees North)
+        lat: Latitude of the site of interest (in degrees North). Many locations can
+            be selected at once by passing a DataArray, e.g. along a "cell" dimension.
         lon: Longitude of the site of interest (in degrees East)
         lat_key: Variable name corresponding to the latitude.
         lon_key: Variable name corresponding to the longitude.
@@ -33,34 +54,21 @@ def _open_multifile_datasets(
     """
     datasets: list[xr.Dataset] = []
     for file in paths:
-        ds = xr.open_dataset(file)
+        ds = dataset_pool.open_dataset(file)
         #  Drop attributes to avoid combine conflicts
         ds.attrs = ""  # type: ignore
         datasets.append(ds.sel({lat_key: lat, lon_key: lon}, method="nearest"))
     return xr.combine_by_coords(datasets)  # type: ignore
 
 
-def _read_lambda_coef(
-    lambda_directory: Path, lat: float, lon: float, depth_indices: list[int]
-) -> dict:
-    """Read the lambda coefficient files and return the data in a dict.
-
-    Args:
-        lambda_directory: Path to the directory which contains the lambda data.
-        lat: Latitude of the site of interest (in degrees North)
-        lon: Longitude of the site of interest (in degrees East)
-        depth_indices: List of which indices (0 - 7) should be selected from the
-            lambda variable dataset.
-
-    Returns:
-        dict: Dictionary containing the lambda coefficient data.
-    """
+def _check_depth_indices(depth_indices: list[int]) -> None:
     if not np.all([d in range(8) for d in depth_indices]):
         raise ValueError("Incorrect depth indices provided. Indices range from 0 to 7")
 
-    lambda_files = sorted(lambda_directory.glob("lambda_l*.nc"))
 
-    ds = _open_multifile_datasets(lambda_files, lat, lon)
+def _lambda_coef(ds: xr.Dataset, depth_indices: list[int]) -> dict:
+    """Get the lambda coefficient from the dataset of a single location."""
+    _check_depth_indices(depth_indices)
 
     # which depth indices the STEMMUS_SCOPE model expects
     ds = ds.sortby("depth")  # make sure that the depths are sorted in increasing order
@@ -69,38 +77,32 @@ def _read_lambda_coef(
     return {"Coef_Lamda": coef_lambda}
 
 
-def _read_soil_composition(
-    soil_data_path: Path, lat: float, lon: float, depth_indices: list[int]
+def _read_lambda_coef(
+    lambda_directory: Path, lat: float, lon: float, depth_indices: list[int]
 ) -> dict:
-    """Read the soil composition files and return them in a dict.
+    """Read the lambda coefficient files and return the data in a dict.
 
     Args:
-        soil_data_path: Path to the directory which contains the soil data.
+        lambda_directory: Path to the directory which contains the lambda data.
         lat: Latitude of the site of interest (in degrees North)
         lon: Longitude of the site of interest (in degrees East)
         depth_indices: List of which indices (0 - 7) should be selected from the
-            soil composition dataset.
+            lambda variable dataset.
 
     Returns:
-        Dictionary containing the soil composition data.
+        dict: Dictionary containing the lambda coefficient data.
     """
-    soil_comp_fnames = [
-        "CLAY1.nc",
-        "CLAY2.nc",
-        "OC1.nc",
-        "OC2.nc",
-        "SAND1.nc",
-        "SAND2.nc",
-        "SILT1.nc",
-        "SILT2.nc",
-    ]
-
-    soil_comp_paths = [soil_data_path / fname for fname in soil_comp_fnames]
+    _check_depth_indices(depth_indices)
 
-    ds = _open_multifile_datasets(soil_comp_paths, lat, lon)
+    lambda_files = sorted(lambda_directory.glob("lambda_l*.nc"))
+    ds = _open_multifile_datasets(lambda_files, lat, lon)
+
+    return _lambda_coef(ds, depth_indices)
 
-    if not np.all([d in range(8) for d in depth_indices]):
-        raise ValueError("Incorrect depth indices provided. Indices range from 0 to 7")
+
+def _soil_composition(ds: xr.Dataset, depth_indices: list[int]) -> dict:
+    """Get the soil composition from the dataset of a single location."""
+    _check_depth_indices(depth_indices)
 
     ds = ds.sortby("depth")  # make sure that the depths are sorted in increasing order
     ds = ds.isel(depth=depth_indices)
@@ -112,26 +114,29 @@ def _read_soil_composition(
     return {"FOC": clay_fraction, "FOS": sand_fraction, "MSOC": organic_fraction}
 
 
-def _read_hydraulic_parameters(
-    soil_data_path: Path, lat: float, lon: float, depths: list[int]
+def _read_soil_composition(
+    soil_data_path: Path, lat: float, lon: float, depth_indices: list[int]
 ) -> dict:
-    """Read the soil hydraulic parameters from the Schaap dataset and return a dict.
+    """Read the soil composition files and return them in a dict.
 
     Args:
         soil_data_path: Path to the directory which contains the soil data.
         lat: Latitude of the site of interest (in degrees North)
         lon: Longitude of the site of interest (in degrees East)
-        depths: List of depths which should be selected from the dataset. The
-            valid depths are: 0, 5, 15, 30, 60, 100 and 200 cm.
+        depth_indices: List of which indices (0 - 7) should be selected from the
+            soil composition dataset.
 
     Returns:
-        dict: Dictionary containing the hydraulic parameters.
+        Dictionary containing the soil composition data.
     """
-    ptf_files = sorted((soil_data_path / "Schaap").glob("PTF_*.nc"))
-    ds = _open_multifile_datasets(
-        ptf_files, lat, lon, lat_key="latitude", lon_key="longitude"
-    )
+    soil_comp_paths = [soil_data_path / fname for fname in SOIL_COMPOSITION_FILES]
+    ds = _open_multifile_datasets(soil_comp_paths, lat, lon)
 
+    return _soil_composition(ds, depth_indices)
+
+
+def _hydraulic_parameters(ds: xr.Dataset, depths: list[int]) -> dict:
+    """Get the soil hydraulic parameters from the Schaap dataset of a single location."""
     valid_depths = [0, 5, 15, 30, 60, 100, 200]
     if not np.all([d in valid_depths for d in depths]):
         raise ValueError(
@@ -165,6 +170,29 @@ def _read_hydraulic_parameters(
     }
 
 
+def _read_hydraulic_parameters(
+    soil_data_path: Path, lat: float, lon: float, depths: list[int]
+) -> dict:
+    """Read the soil hydraulic parameters from the Schaap dataset and return a dict.
+
+    Args:
+        soil_data_path: Path to the directory which contains the soil data.
+        lat: Latitude of the site of interest (in degrees North)
+        lon: Longitude of the site of interest (in degrees East)
+        depths: List of depths which should be selected from the dataset. The
+            valid depths are: 0, 5, 15, 30, 60, 100 and 200 cm.
+
+    Returns:
+        dict: Dictionary containing the hydraulic parameters.
+    """
+    ptf_files = sorted((soil_data_path / "Schaap").glob("PTF_*.nc"))
+    ds = _open_multifile_datasets(
+        ptf_files, lat, lon, lat_key="latitude", lon_key="longitude"
+    )
+
+    return _hydraulic_parameters(ds, depths)
+
+
 def _read_surface_data(soil_data_path: Path, lat: float, lon: float) -> dict:
     """Read the fmax variable from the surface dataset and return it in a dict.
 
@@ -176,7 +204,7 @@ def _read_surface_data(soil_data_path: Path, lat: float, lon: float) -> dict:
     Returns:
         dict: Dictionary containing the `fmax` value (maximum fractional saturated area)
     """
-    ds = xr.open_dataset(soil_data_path / "surfdata.nc")
+    ds = dataset_pool.open_dataset(soil_data_path / "surfdata.nc")
     lat, lon = utils.convert_to_lsm_coordinates(lat, lon)
     ds = ds.sel(lsmlat=lat, lsmlon=lon)
 
@@ -198,19 +226,75 @@ def _collect_soil_data(soil_data_path: Path, lat: float, lon: float) -> dict:
     """
     lambda_directory = soil_data_path / "lambda"
 
-    schaap_depths = [0, 5, 30, 60, 100, 200]
-    depth_indices = [0, 2, 4, 5, 6, 7]
-
-    matfiledata = _read_lambda_coef(lambda_directory, lat, lon, depth_indices)
+    matfiledata = _read_lambda_coef(lambda_directory, lat, lon, DEPTH_INDICES)
     matfiledata.update(
-        _read_hydraulic_parameters(soil_data_path, lat, lon, schaap_depths)
+        _read_hydraulic_parameters(soil_data_path, lat, lon, SCHAAP_DEPTHS)
     )
-    matfiledata.update(_read_soil_composition(soil_data_path, lat, lon, depth_indices))
+    matfiledata.update(_read_soil_composition(soil_data_path, lat, lon, DEPTH_INDICES))
     matfiledata.update(_read_surface_data(soil_data_path, lat, lon))
 
     return matfiledata
 
 
+def _collect_soil_data_batch(
+    soil_data_path: Path, latlons: list[tuple[float, float]]
+) -> list[dict]:
+    """Collect the soil property data of many locations at once.
+
+    Every soil dataset is opened once, and all locations are selected with a single
+    pointwise selection along a "cell" dimension, instead of opening all files again
+    for every location.
+
+    Args:
+        soil_data_path: Path to the directory which contains the soil data.
+        latlons: Latitude and longitude of every location.
+
+    Returns:
+        For every location (in the same order), a dictionary containing all the
+            processed soil property data, equal to the output of `_collect_soil_data`.
+    """
+    lats = xr.DataArray([lat for lat, _ in latlons], dims="cell")
+    lons = xr.DataArray([lon for _, lon in latlons], dims="cell")
+
+    lambda_ds = _open_multifile_datasets(
+        sorted((soil_data_path / "lambda").glob("lambda_l*.nc")), lats, lons
+    ).load()
+    schaap_ds = _open_multifile_datasets(
+        sorted((soil_data_path / "Schaap").glob("PTF_*.nc")),
+        lats,
+        lons,
+        lat_key="latitude",
+        lon_key="longitude",
+    ).load()
+    composition_ds = _open_multifile_datasets(
+        [soil_data_path / fname for fname in SOIL_COMPOSITION_FILES], lats, lons
+    ).load()
+
+    lsm_lats, lsm_lons = zip(
+        *(utils.convert_to_lsm_coordinates(lat, lon) for lat, lon in latlons)
+    )
+    ds = dataset_pool.open_dataset(soil_data_path / "surfdata.nc")
+    fmax = (
+        ds["FMAX"]
+        .sel(
+            lsmlat=xr.DataArray(list(lsm_lats), dims="cell"),
+            lsmlon=xr.DataArray(list(lsm_lons), dims="cell"),
+        )
+        .values
+    )
+
+    cell_data = []
+    for i in range(len(latlons)):
+        matfiledata = _lambda_coef(lambda_ds.isel(cell=i), DEPTH_INDICES)
+        matfiledata.update(_hydraulic_parameters(schaap_ds.isel(cell=i), SCHAAP_DEPTHS))
+        matfiledata.update(
+            _soil_composition(composition_ds.isel(cell=i), DEPTH_INDICES)
+        )
+        matfiledata.update({"fmax": fmax[i]})
+        cell_data.append(matfiledata)
+    return cell_data
+
+
 def _retrieve_latlon(file: Path) -> tuple[float, float]:
     """Retrieve the latitude and longitude coordinates from the dataset file.
 
@@ -221,21 +305,30 @@ def _retrieve_latlon(file: Path) -> tuple[float, float]:
         The latitude and longitude values. Latitude in degrees N,
             longitude in degrees E.
     """
-    ds = xr.open_dataset(file)
+    ds = dataset_pool.open_dataset(file)
     lon = ds.longitude.values.flatten()
     lat = ds.latitude.values.flatten()
     return lat, lon
 
 
+def _save_matfile(fname: Path, matfiledata: dict) -> None:
+    """Write the data to a .mat file which can be read by Matlab."""
+    hdf5storage.savemat(fname, mdict=matfiledata, appendmat=False)
+    utils.remove_dates_from_header(fname)
+
+
 def prepare_soil_data(config: dict) -> None:
     """Prepare the soil input data for the STEMMUS_SCOPE model.
 
     The data for the input location is parsed, and written to a file that can be easily
-    read in by Matlab.
+    read in by Matlab. For a bounding box ("bbox") location, the data of all grid cells
+    is collected at once and written to the input directory of every cell (see
+    `config_io.bbox_cell_configs`).
 
     Args:
         config: The PyStemmusScope configuration dictionary.
     """
+    dataset_pool.configure_pool(config)
     loc, fmt = utils.check_location_fmt(config["Location"])
 
     if fmt == "site":
@@ -250,27 +343,33 @@ def prepare_soil_data(config: dict) -> None:
         lat = loc[0]  # type: ignore
         lon = loc[1]  # type: ignore
     else:
-        raise NotImplementedError
+        cell_configs = config_io.bbox_cell_configs(config)
+        latlons = [utils.check_location_fmt(c["Location"])[0] for c in cell_configs]
+        cell_data = _collect_soil_data_batch(
+            Path(config["SoilPropertyPath"]), latlons  # type: ignore
+        )
+        for cell_config, matfiledata in zip(cell_configs, cell_data):
+            _save_matfile(
+                Path(cell_config["InputPath"]) / "soil_parameters.mat", matfiledata
+            )
+        return
 
     matfiledata = _collect_soil_data(Path(config["SoilPropertyPath"]), lat, lon)
 
-    hdf5storage.savemat(
-        Path(config["InputPath"]) / "soil_parameters.mat",
-        mdict=matfiledata,
-        appendmat=False,
-    )
-    utils.remove_dates_from_header(Path(config["InputPath"]) / "soil_parameters.mat")
+    _save_matfile(Path(config["InputPath"]) / "soil_parameters.mat", matfiledata)
 
 
 def prepare_soil_init(config: dict) -> None:
     """Prepare the soil inital conditions data for the STEMMUS_SCOPE model.
 
     The data for the input location is parsed, and written to a file that can be easily
-    read in by Matlab.
+    read in by Matlab. For a bounding box ("bbox") location, the data is prepared for
+    every grid cell in its own input directory.
 
     Args:
         config: The PyStemmusScope configuration dictionary.
     """
+    dataset_pool.configure_pool(config)
     loc, fmt = utils.check_location_fmt(config["Location"])
 
     if fmt == "site":
@@ -286,14 +385,11 @@ def prepare_soil_init(config: dict) -> None:
             start_time=config["StartTime"],
         )
     else:
-        raise NotImplementedError
+        for cell_config in config_io.bbox_cell_configs(config):
+            prepare_soil_init(cell_config)
+        return
 
-    hdf5storage.savemat(
-        Path(config["InputPath"]) / "soil_init.mat",
-        mdict=matfiledata,
-        appendmat=False,
-    )
-    utils.remove_dates_from_header(Path(config["InputPath"]) / "soil_init.mat")
+    _save_matfile(Path(config["InputPath"]) / "soil_init.mat", matfiledata)
 
 
 def _extract_soil_initial_variables(soil_init_ds: xr.Dataset):
@@ -335,7 +431,7 @@ def _read_soil_initial_conditions_plumber2(
     soil_init_path: Path,
     sitename: str,
 ) -> dict[str, float]:
-    ds = xr.open_mfdataset(str(soil_init_path / f"{sitename}*.nc"))
+    ds = dataset_pool.open_mfdataset(sorted(soil_init_path.glob(f"{sitename}*.nc")))
     ds = ds.squeeze()  # Remove lat, lon, time dims.
     ds.compute()
 
@@ -360,7 +456,7 @@ def _read_soil_initial_conditions_global(
         Dictionary containing the STEMMUS_SCOPE variable names (keys) and their intial
             soil condition values.
     """
-    ds = xr.open_mfdataset(str(soil_init_path / "*.nc"))
+    ds = dataset_pool.open_mfdataset(sorted(soil_init_path.glob("*.nc")))
     ds = ds.sel(latitude=lat, longitude=lon, method="nearest")
     ds = ds.sel(time=start_time, method="nearest")
     ds.compute()
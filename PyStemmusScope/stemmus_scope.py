@@ -4,6 +4,7 @@ import logging
 import os
 import shlex
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from typing import Union
@@ -53,12 +54,18 @@ def _check_interpreter(interpreter: Union[None, str]) -> None:
         raise ValueError(msg)
 
 
-def _run_sub_process(args: Union[str, list[str]], cwd: Optional[Path] = None) -> str:
+def _run_sub_process(
+    args: Union[str, list[str]],
+    cwd: Optional[Path] = None,
+    env: Optional[dict[str, str]] = None,
+) -> str:
     """Run subprocess' Popen, using a list of arguments.
 
     Args:
         args: Arguments to be run
         cwd: Desired working directory
+        env: Environment variables of the subprocess, by default those of the
+            current process.
 
     Raises:
         subprocess.CalledProcessError: If Popen returns an error code other than 0 or
@@ -73,6 +80,7 @@ def _run_sub_process(args: Union[str, list[str]], cwd: Optional[Path] = None) ->
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         shell=True,
+        env=env,
     )
     exit_code = result.wait()
     stdout, stderr = result.communicate()
@@ -152,8 +160,9 @@ class StemmusScope:
         Args:
             WorkDir: path to a directory where input/output directories should be
                 created.
-            Location: Location of the model run. Can be a site ("FI-Hyy") or lat/lon,
-                e.g., "(52.0, 4.05)".
+            Location: Location of the model run. Can be a site ("FI-Hyy"), lat/lon,
+                e.g., "(52.0, 4.05)", or a bounding box, e.g.,
+                "((52.0, 4.0), (52.5, 4.5))".
             ForcingFileName: forcing file name. Forcing file should be in netcdf format.
             StartTime: Start time of the model run. It must be in
                 ISO format (e.g. 2007-01-01T00:00).
@@ -193,18 +202,47 @@ class StemmusScope:
     def run(self) -> str:
         """Run model using executable.
 
+        For a bounding box location, the model is run for every grid cell (see
+        `config_io.bbox_cell_configs`). The runs are done in parallel, with at most
+        `ModelWorkers` (optional config key, by default the number of CPUs) runs at
+        the same time.
+
         Returns:
-            The model log.
+            The model log. For a bounding box, the logs of all grid cells.
+        """
+        if utils.check_location_fmt(self._config["Location"])[1] == "bbox":
+            cell_configs = config_io.bbox_cell_configs(self._config)
+            cell_config_files = [
+                config_io.bbox_cell_config_file(cell_config)
+                for cell_config in cell_configs
+            ]
+            input_paths = [cell_config["InputPath"] for cell_config in cell_configs]
+            workers = int(self._config.get("ModelWorkers", os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return "\n".join(
+                    executor.map(self._run_config, cell_config_files, input_paths)
+                )
+
+        return self._run_config(self.cfg_file, self._config["InputPath"])
+
+    def _run_config(
+        self, cfg_file: Union[str, Path], input_path: Union[str, Path]
+    ) -> str:
+        """Run the model for a config file, and return the model log.
+
+        Args:
+            cfg_file: Path to the config file of the run.
+            input_path: Input directory of the run, in which the MCR writes its log.
         """
         if self.exe_file:
             # run using MCR
-            args = [f"{self.exe_file} {self.cfg_file}"]
-            # set matlab log dir
-            os.environ["MATLAB_LOG_DIR"] = str(self._config["InputPath"])
-            result = _run_sub_process(args, None)
+            args = [f"{self.exe_file} {cfg_file}"]
+            # set matlab log dir, only for this run
+            env = {**os.environ, "MATLAB_LOG_DIR": str(input_path)}
+            result = _run_sub_process(args, None, env)
         if self.interpreter == "Matlab":
             # set Matlab arguments
-            path_to_config = f"'{self.cfg_file}'"
+            path_to_config = f"'{cfg_file}'"
             eval_code = f"STEMMUS_SCOPE_exe({path_to_config});exit;"
             args = ["matlab", "-r", eval_code, "-nodisplay", "-nosplash", "-nodesktop"]
 
@@ -216,7 +254,7 @@ class StemmusScope:
             # set Octave arguments
             # use subprocess instead of oct2py,
             # see issue STEMMUS_SCOPE_Processing/issues/46
-            path_to_config = f"'{self.cfg_file}'"
+            path_to_config = f"'{cfg_file}'"
             # fix for windows
             path_to_config = path_to_config.replace("\\", "/")
             eval_code = f"STEMMUS_SCOPE_exe({path_to_config});exit;"
@@ -80,23 +80,14 @@ def get_forcing_file(config):
     location, fmt = check_location_fmt(config["Location"])
     # check if the forcing file exists for the given location(s)
     if fmt == "site":
-        # get forcing file list
-        forcing_filenames_list = [
-            file.name for file in Path(config["ForcingPath"]).iterdir()
-        ]
-        forcing_file = [
-            filename for filename in forcing_filenames_list if location in filename
-        ]
-        if not forcing_file:
-            raise ValueError(
-                f"Forcing file does not exist for the given site {location}."
-            )
-        if len(forcing_file) > 1:
-            raise ValueError(
-                f"Multiple forcing files exist for the given site {location}."
-                + "Please check your forcing files and remove the redundant files."
-            )
-        forcing_file = Path(config["ForcingPath"]) / forcing_file[0]
+        from PyStemmusScope import forcing_index  # avoid circular import
+
+        # look up the file in the (incrementally updated) forcing directory index
+        index = forcing_index.get_index(
+            config["ForcingPath"], forcing_index.get_index_dir(config)
+        )
+        forcing_file = index.find_site(location)  # type: ignore
+        forcing_file = Path(config["ForcingPath"]) / forcing_file.name
 
     elif fmt == "latlon":
         raise NotImplementedError
@@ -155,6 +146,47 @@ def check_location_fmt(loc: str) -> tuple[Union[str, LatLonFmt, BBoxFmt], str]:
     )
 
 
+# Default resolution of the model grid in "bbox" mode, in degrees (that of ERA5-land).
+DEFAULT_GRID_RESOLUTION = 0.1
+
+
+def bbox_grid_cells(
+    bbox: BBoxFmt, resolution: float = DEFAULT_GRID_RESOLUTION
+) -> list[LatLonFmt]:
+    """Get the centers of the model grid cells inside a bounding box.
+
+    The grid is aligned to whole multiples of the resolution, e.g. with a resolution
+    of 0.1 degree the cell centers are at 52.05, 52.15, etc. A cell is inside the box
+    if its center is, where the edges of the box are included.
+
+    Args:
+        bbox: Bounding box, described with two opposing corners:
+            ((lat1, lon1), (lat2, lon2)).
+        resolution: Resolution of the grid in degrees.
+
+    Returns:
+        Latitude and longitude of the cell centers, ordered by latitude and then by
+            longitude.
+    """
+    if resolution <= 0:
+        raise ValueError("The grid resolution should be larger than 0.")
+
+    (lat1, lon1), (lat2, lon2) = bbox
+    centers = []
+    for low, high in (sorted((lat1, lat2)), sorted((lon1, lon2))):
+        # round to avoid floating point errors at the edges of the box
+        first = np.ceil(np.round(low / resolution - 0.5, 9))
+        last = np.floor(np.round(high / resolution - 0.5, 9))
+        centers.append(np.round((np.arange(first, last + 1) + 0.5) * resolution, 9))
+
+    if centers[0].size == 0 or centers[1].size == 0:
+        raise ValueError(
+            f"The bounding box {bbox} does not contain the center of any grid cell "
+            f"at a resolution of {resolution} degrees."
+        )
+    return [(float(lat), float(lon)) for lat in centers[0] for lon in centers[1]]
+
+
 def _check_lat_lon(coordinates):
     """Check if the coordinates exists."""
     raise NotImplementedError
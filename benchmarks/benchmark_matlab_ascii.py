@@ -0,0 +1,64 @@
+"""Benchmark the Matlab ascii writer engines of PyStemmusScope.forcing_io.
+
+Writes a synthetic half-hourly record (30 years by default) as the ten-column
+Mdata.txt file and as a single-column .dat file with both the "savetxt" and the
+"buffer" engine, checks that the files are identical and reports the timings.
+
+Usage:
+    python benchmarks/benchmark_matlab_ascii.py [--years 30] [--repeat 3]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from PyStemmusScope import forcing_io
+
+
+ENGINES = ("savetxt", "buffer")
+
+
+def _time_engine(fname: Path, data: np.ndarray, ncols: int, engine: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        forcing_io._write_matlab_ascii(fname, data, ncols, engine=engine)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    nrows = args.years * 365 * 48
+    rng = np.random.default_rng(42)
+    cases = {
+        "Mdata.txt": rng.normal(100, 300, (nrows, 10)),
+        "Ta_.dat": rng.normal(10, 10, nrows).astype(np.float32),
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, data in cases.items():
+            ncols = 1 if data.ndim == 1 else data.shape[1]
+            results = {}
+            for engine in ENGINES:
+                fname = Path(tmpdir) / f"{engine}_{name}"
+                results[engine] = _time_engine(fname, data, ncols, engine, args.repeat)
+
+            identical = (Path(tmpdir) / f"savetxt_{name}").read_bytes() == (
+                Path(tmpdir) / f"buffer_{name}"
+            ).read_bytes()
+            speedup = results["savetxt"] / results["buffer"]
+            print(
+                f"{name:>10} ({nrows} rows x {ncols} cols): "
+                f"savetxt {results['savetxt']:.2f} s, buffer {results['buffer']:.2f} s"
+                f" ({speedup:.1f}x), identical output: {identical}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import shutil
+from PyStemmusScope import cli
+from PyStemmusScope import config_io
+from . import data_folder
+
+
+def _write_config(config, path):
+    with path.open("w", encoding="utf8") as f:
+        for key, value in config.items():
+            f.write(f"{key}={value}\n")
+    return path
+
+
+def test_prepare_forcing(tmp_path, capsys):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["InputPath"] = str(tmp_path)
+    config_file = _write_config(config, tmp_path / "config.txt")
+
+    assert cli.main(["prepare-forcing", str(config_file)]) == 0
+    assert (tmp_path / "Mdata.txt").exists()
+    assert "ok" in capsys.readouterr().out
+
+
+def test_prepare_forcing_failure(tmp_path, capsys):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["Location"] = "XX-Yyy"  # no forcing file exists for this site
+    config["InputPath"] = str(tmp_path)
+    config_file = _write_config(config, tmp_path / "config.txt")
+
+    assert cli.main(["prepare-forcing", "--workers", "2", str(config_file)]) == 1
+    assert "FAILED" in capsys.readouterr().out
+
+
+def test_build_era5_store(tmp_path, capsys):
+    global_data_dir = tmp_path / "global"
+    for folder in ("era5", "era5-land"):
+        shutil.copytree(
+            data_folder / "directories" / "global" / folder, global_data_dir / folder
+        )
+
+    assert cli.main(["build-era5-store", str(global_data_dir)]) == 0
+    assert (global_data_dir / "era5_point_store" / "era5.nc").exists()
+    assert "era5-land.nc" in capsys.readouterr().out
@@ -52,3 +52,20 @@ class TestConfigIO:
         input_dir, _, _ = config_io.create_io_dir(dummy_config)
 
         assert (Path(input_dir) / "dummy_data.xlsx").exists()
+
+    def test_create_io_dir_bbox(self, dummy_config):
+        dummy_config["Location"] = "((52.0, 4.0), (52.2, 4.1))"
+        input_dir, output_dir, config_path = config_io.create_io_dir(dummy_config)
+        config = config_io.read_config(config_path)
+
+        cell_configs = config_io.bbox_cell_configs(config)
+        assert [cell["Location"] for cell in cell_configs] == [
+            "(52.05, 4.05)",
+            "(52.15, 4.05)",
+        ]
+        for cell_config in cell_configs:
+            assert Path(cell_config["InputPath"]).parent == input_dir
+            assert Path(cell_config["OutputPath"]).parent == output_dir
+            assert (Path(cell_config["InputPath"]) / "dummy_data.xlsx").exists()
+            cell_config_file = config_io.bbox_cell_config_file(cell_config)
+            assert config_io.read_config(cell_config_file) == cell_config
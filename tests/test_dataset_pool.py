@@ -0,0 +1,82 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import xarray as xr
+from PyStemmusScope import dataset_pool
+from . import data_folder
+
+
+LAI_FOLDER = data_folder / "directories" / "global" / "lai"
+
+
+@pytest.fixture
+def lai_files(tmp_path):
+    folder = tmp_path / "lai"
+    shutil.copytree(LAI_FOLDER, folder)
+    return sorted(folder.glob("*.nc"))
+
+
+def test_open_mfdataset_pooled(lai_files):
+    pool = dataset_pool.DatasetPool()
+    expected = xr.open_mfdataset(lai_files, chunks="auto")
+
+    first = pool.open_mfdataset(lai_files, chunks="auto")
+    second = pool.open_mfdataset(lai_files, chunks="auto")
+    assert (pool.hits, pool.misses) == (1, 1)
+    xr.testing.assert_identical(second, expected)
+
+    # the returned datasets are copies, which do not change the pooled dataset
+    first.attrs = {}
+    first.close()
+    third = pool.open_mfdataset(lai_files, chunks="auto")
+    assert third.attrs == expected.attrs
+    np.testing.assert_array_equal(third["LAI"].values, expected["LAI"].values)
+
+    # other open options are another dataset
+    pool.open_mfdataset(lai_files)
+    assert pool.misses == 2
+    assert pool.open_files == 2 * len(lai_files)
+
+
+def test_modified_file_reopened(lai_files):
+    pool = dataset_pool.DatasetPool()
+    pool.open_dataset(lai_files[0])
+
+    st = lai_files[0].stat()
+    os.utime(lai_files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    pool.open_dataset(lai_files[0])
+    assert (pool.hits, pool.misses) == (0, 2)
+
+
+def test_evict(lai_files):
+    pool = dataset_pool.DatasetPool(max_open_files=2)
+    pool.open_dataset(lai_files[0])
+    pool.open_dataset(lai_files[1])
+    pool.open_mfdataset(lai_files)
+    assert pool.open_files == 2
+
+    # the single files were evicted to make room for the multi-file dataset
+    pool.open_dataset(lai_files[0])
+    assert (pool.hits, pool.misses) == (0, 4)
+    assert pool.open_files == 1
+
+    pool.clear()
+    assert pool.open_files == 0
+
+
+def test_pool_disabled(lai_files):
+    pool = dataset_pool.DatasetPool(max_open_files=0)
+    pool.open_mfdataset(lai_files)
+    assert (pool.hits, pool.misses, pool.open_files) == (0, 0, 0)
+
+
+def test_configure_pool(monkeypatch):
+    pool = dataset_pool.DatasetPool()
+    monkeypatch.setattr(dataset_pool, "_POOL", pool)
+
+    dataset_pool.configure_pool({})
+    assert pool.max_open_files == dataset_pool.DEFAULT_MAX_OPEN_FILES
+
+    dataset_pool.configure_pool({"DatasetPoolMaxFiles": "16"})
+    assert dataset_pool.get_dataset_pool().max_open_files == 16
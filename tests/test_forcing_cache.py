@@ -0,0 +1,117 @@
+import shutil
+from pathlib import Path
+import pytest
+from PyStemmusScope import config_io
+from PyStemmusScope import forcing_cache
+from PyStemmusScope import forcing_io
+from PyStemmusScope.global_data import manifest
+from . import data_folder
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["ForcingCachePath"] = str(tmp_path / "cache")
+    return config
+
+
+def _prepare(config, input_path):
+    input_path.mkdir()
+    config = {**config, "InputPath": str(input_path)}
+    forcing_io.prepare_forcing(config)
+    return config
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [("1024", 1024), ("500MB", 500_000_000), ("1.5 GB", 1_500_000_000), (10, 10)],
+)
+def test_parse_size(size, expected):
+    assert forcing_cache.parse_size(size) == expected
+
+
+def test_parse_size_invalid():
+    with pytest.raises(ValueError, match="Invalid size"):
+        forcing_cache.parse_size("ten gigabytes")
+
+
+def test_cache_hit(config, tmp_path):
+    forcing_cache._CACHES.clear()
+    _prepare(config, tmp_path / "run1")
+    _prepare(config, tmp_path / "run2")
+
+    cache = forcing_cache.get_cache(config)
+    assert (cache.hits, cache.misses) == (1, 1)
+    for fname in forcing_io.forcing_file_names():
+        assert (tmp_path / "run1" / fname).read_bytes() == (
+            tmp_path / "run2" / fname
+        ).read_bytes()
+
+
+def test_cache_hit_not_overwritten(config, tmp_path):
+    forcing_cache._CACHES.clear()
+    _prepare(config, tmp_path / "run1")
+    run2 = _prepare(config, tmp_path / "run2")
+
+    cache = forcing_cache.get_cache(config)
+    key = cache.make_key(config, forcing_io.DEFAULT_GLOBAL_TIMESTEP, "ascii")
+    entry = Path(cache.cache_dir) / key
+    cached = {
+        fname: (entry / fname).read_bytes() for fname in forcing_io.forcing_file_names()
+    }
+
+    # a run with another time range into the same input directory
+    del run2["ForcingCachePath"]
+    forcing_io.prepare_forcing({**run2, "EndTime": "1996-01-01T01:00"})
+
+    for fname, content in cached.items():
+        assert (entry / fname).read_bytes() == content
+    assert (tmp_path / "run2" / "t_.dat").read_bytes() != cached["t_.dat"]
+
+
+def test_cache_key_changes(config):
+    cache = forcing_cache.get_cache(config)
+    key = cache.make_key(config, "1800s", "ascii")
+    assert key == cache.make_key(config, "1800s", "ascii")
+    assert key != cache.make_key(
+        {**config, "EndTime": "1996-01-01T01:00"}, "1800s", "ascii"
+    )
+    assert key != cache.make_key(config, "1800s", "binary")
+
+
+def test_cache_key_global_data(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "_MANIFESTS", {})
+    global_data_dir = tmp_path / "global"
+    shutil.copytree(data_folder / "directories" / "global", global_data_dir)
+    config = {
+        **config,
+        "ForcingPath": str(global_data_dir),
+        "Location": "(37.933804, -107.807526)",
+    }
+    cache = forcing_cache.get_cache(config)
+    key = cache.make_key(config, "1800s", "ascii")
+
+    # files written elsewhere in the global data directory do not change the key
+    (global_data_dir / "era5_point_store").mkdir()
+    (global_data_dir / "era5_point_store" / "era5.nc").write_bytes(b"\0")
+    (global_data_dir / "soil_initial" / "new.nc").write_bytes(b"\0")
+    assert cache.make_key(config, "1800s", "ascii") == key
+
+    # but modifying a file of a used dataset does
+    with next((global_data_dir / "lai").glob("*.nc")).open("ab") as f:
+        f.write(b"\0")
+    assert cache.make_key(config, "1800s", "ascii") != key
+
+
+def test_cache_disabled(config):
+    del config["ForcingCachePath"]
+    assert forcing_cache.get_cache(config) is None
+
+
+def test_cache_eviction(config, tmp_path):
+    forcing_cache._CACHES.clear()
+    config["ForcingCacheMaxSize"] = "1"  # every entry is larger than 1 byte
+    _prepare(config, tmp_path / "run1")
+
+    cache = forcing_cache.get_cache(config)
+    assert not list(Path(cache.cache_dir).iterdir())
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+from unittest.mock import patch
+import pytest
+from PyStemmusScope import config_io
+from PyStemmusScope import forcing_index
+from PyStemmusScope import forcing_io
+from PyStemmusScope import utils
+from . import data_folder
+
+
+forcing_data_folder = data_folder / "directories" / "forcing" / "plumber2_data"
+FORCING_FILE = "FI-Hyy_1996-2014_FLUXNET2015_Met.nc"
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(forcing_index, "_INDEXES", {})
+    return tmp_path / "index"
+
+
+@pytest.fixture
+def forcing_path(tmp_path):
+    forcing_path = tmp_path / "forcing"
+    forcing_path.mkdir()
+    shutil.copy(forcing_data_folder / FORCING_FILE, forcing_path)
+    return forcing_path
+
+
+def test_index_metadata(forcing_path, index_dir):
+    index = forcing_index.get_index(forcing_path, index_dir)
+
+    entry = index.entry(FORCING_FILE)
+    assert entry["site"] == "FI-Hyy"
+    assert entry["start"] == "1996-01-01T00:00:00"
+    assert entry["end"] == "1996-01-01T02:00:00"
+    assert entry["timestep"] == 1800.0
+    assert entry["ntime"] == 5
+    assert entry["latitude"] == pytest.approx(61.8475)
+
+    with index.index_file.open(encoding="utf8") as f:
+        assert FORCING_FILE in json.load(f)["files"]
+
+
+def test_index_incremental_refresh(forcing_path, index_dir):
+    forcing_index.get_index(forcing_path, index_dir)
+    read_metadata = forcing_index.read_file_metadata
+
+    with patch.object(
+        forcing_index, "read_file_metadata", side_effect=read_metadata
+    ) as mocked_read:
+        # a new index object loads the stored index, without opening any file
+        forcing_index._INDEXES.clear()
+        index = forcing_index.get_index(forcing_path, index_dir)
+        assert mocked_read.call_count == 0
+
+        # an added file is only read when its metadata is requested
+        (forcing_path / "XX-Yyy_notes.txt").write_text("not a forcing file")
+        index.refresh()
+        assert "XX-Yyy_notes.txt" in index.files
+        assert mocked_read.call_count == 0
+        assert index.entry("XX-Yyy_notes.txt")["start"] is None
+        assert mocked_read.call_count == 1
+
+        # a modified file is read again
+        st = (forcing_path / FORCING_FILE).stat()
+        os.utime(forcing_path / FORCING_FILE, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        index.entry(FORCING_FILE)
+        assert mocked_read.call_count == 2
+
+    (forcing_path / "XX-Yyy_notes.txt").unlink()
+    index.refresh()
+    assert list(index.files) == [FORCING_FILE]
+
+
+def test_index_in_memory(forcing_path, index_dir):
+    index = forcing_index.get_index(forcing_path)
+    assert index.entry(FORCING_FILE)["site"] == "FI-Hyy"
+    assert index.index_file is None
+
+    config = {"ForcingIndexPath": str(index_dir)}
+    assert forcing_index.get_index_dir(config) == index_dir
+    assert forcing_index.get_index_dir({}) is None
+
+
+def test_get_forcing_file_index(forcing_path):
+    config = {"Location": "FI-Hyy", "ForcingPath": str(forcing_path)}
+    assert utils.get_forcing_file(config) == forcing_path / FORCING_FILE
+
+    # the site is found by the file names, without opening the files
+    with patch.object(forcing_index, "read_file_metadata") as mocked_read:
+        forcing_index._INDEXES.clear()
+        assert utils.get_forcing_file(config) == forcing_path / FORCING_FILE
+        mocked_read.assert_not_called()
+
+    shutil.copy(forcing_path / FORCING_FILE, forcing_path / f"copy_{FORCING_FILE}")
+    with pytest.raises(ValueError, match="Multiple forcing files"):
+        utils.get_forcing_file(config)
+
+
+@pytest.mark.parametrize(
+    "start_time, end_time",
+    [("1996-01-01T00:00", "1996-01-01T02:00"), ("NA", "NA")],
+)
+def test_check_forcing_coverage(start_time, end_time):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config.update({"StartTime": start_time, "EndTime": end_time})
+    forcing_io.check_forcing_coverage(config)
+
+
+def test_check_forcing_coverage_out_of_range():
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["EndTime"] = "1996-01-01T02:30"
+    with pytest.raises(ValueError, match="cannot be covered"):
+        forcing_io.check_forcing_coverage(config)
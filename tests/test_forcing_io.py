@@ -1,7 +1,10 @@
+import json
 from pathlib import Path
+import hdf5storage
 import numpy as np
 import pandas as pd
 import pytest
+import xarray as xr
 from PyStemmusScope import config_io
 from PyStemmusScope import forcing_io
 from . import data_folder
@@ -144,3 +147,343 @@ def test_full_routine(tmp_path, dat_files):
     expected_files = fnames + ["LAI_.dat", "Mdata.txt", "forcing_globals.mat"]
     for file in expected_files:
         assert (Path(tmp_path) / file).exists()
+
+
+@pytest.mark.parametrize(
+    "data, ncols",
+    [
+        (np.array([0.0, -0.0, 1.0, 0.5, 1 / 3, 1.25e-7, 9.99999995, 123456785.0]), 1),
+        (np.array([np.nan, -np.inf, np.inf, 1e-99, 9.99999999e99, -(2.0**-30)]), 1),
+        (np.random.default_rng(0).uniform(-500, 500, (1000, 10)), 10),
+        (np.arange(0, 2, 1 / 48, dtype=np.float32).reshape(-1, 2), 2),
+        (np.array([1e100, 1e-300]), 1),  # three-digit exponents; savetxt fallback
+    ],
+)
+def test_write_matlab_ascii_engines_identical(tmp_path, data, ncols):
+    forcing_io._write_matlab_ascii(tmp_path / "buffer.dat", data, ncols)
+    forcing_io._write_matlab_ascii(
+        tmp_path / "savetxt.dat", data, ncols, engine="savetxt"
+    )
+
+    assert (tmp_path / "buffer.dat").read_bytes() == (
+        tmp_path / "savetxt.dat"
+    ).read_bytes()
+
+
+def test_write_matlab_ascii_wrong_ncols(tmp_path):
+    with pytest.raises(ValueError, match="column"):
+        forcing_io._write_matlab_ascii(tmp_path / "t_.dat", np.zeros((4, 2)), ncols=3)
+
+
+@pytest.mark.parametrize("file_format", ["mat", "binary"])
+def test_full_routine_binary_format(tmp_path, forcing_data, file_format):
+    cfg_file = data_folder / "config_file_test.txt"
+    config = config_io.read_config(cfg_file)
+    config["InputPath"] = str(tmp_path)
+    config["ForcingFormat"] = file_format
+
+    forcing_io.prepare_forcing(config)
+
+    assert not (tmp_path / "Mdata.txt").exists()
+    assert (tmp_path / "forcing_globals.mat").exists()
+
+    with (tmp_path / "forcing_timeseries.json").open(encoding="utf8") as f:
+        manifest = json.load(f)
+    nrows, ncols = manifest["shape"]
+    assert [col["variable"] for col in manifest["columns"]] == [
+        var for var, _, _ in forcing_io.TIMESERIES_COLUMNS
+    ]
+
+    if file_format == "mat":
+        timeseries = hdf5storage.loadmat(str(tmp_path / manifest["file"]))["forcing"]
+    else:
+        timeseries = np.fromfile(tmp_path / manifest["file"], dtype="<f8").reshape(
+            (nrows, ncols), order=manifest["order"]
+        )
+
+    assert timeseries.shape == (nrows, ncols)
+    for col in manifest["columns"]:
+        np.testing.assert_array_equal(
+            timeseries[:, col["index"] - 1], forcing_data[col["variable"]]
+        )
+
+
+def test_invalid_forcing_format(tmp_path):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["InputPath"] = str(tmp_path)
+    config["ForcingFormat"] = "csv"
+    with pytest.raises(ValueError, match="ForcingFormat"):
+        forcing_io.prepare_forcing(config)
+
+
+@pytest.mark.parametrize(
+    "start_time, end_time",
+    [
+        ("1996-01-01T00:00", "1996-01-01T02:00"),
+        ("NA", "NA"),
+        ("NA", "1996-01-01T01:00"),
+    ],
+)
+def test_read_forcing_data_plumber2_lean(start_time, end_time):
+    forcing_file = forcing_data_folder / "FI-Hyy_1996-2014_FLUXNET2015_Met.nc"
+    expected = forcing_io.read_forcing_data_plumber2(forcing_file, start_time, end_time)
+    data = forcing_io.read_forcing_data_plumber2_lean(
+        forcing_file, start_time, end_time
+    )
+
+    assert data.keys() == expected.keys()
+    for key, value in expected.items():
+        np.testing.assert_array_equal(np.asarray(data[key]), np.asarray(value))
+        assert np.asarray(data[key]).dtype == np.asarray(value).dtype
+    np.testing.assert_array_equal(data["time"]["time"], expected["time"]["time"])
+
+
+def test_read_forcing_data_plumber2_lean_out_of_range():
+    forcing_file = forcing_data_folder / "FI-Hyy_1996-2014_FLUXNET2015_Met.nc"
+    with pytest.raises(ValueError, match="cannot be covered"):
+        forcing_io.read_forcing_data_plumber2_lean(
+            forcing_file, "1995-01-01T00:00", "1996-01-01T01:00"
+        )
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_prepare_forcing_batch(tmp_path, workers):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    configs = []
+    for location in ["FI-Hyy", "XX-Yyy", "XX-Xxx"]:  # XX-Yyy does not exist
+        input_path = tmp_path / location
+        input_path.mkdir()
+        configs.append({**config, "Location": location, "InputPath": str(input_path)})
+
+    results = forcing_io.prepare_forcing_batch(configs, workers=workers)
+
+    assert [result["success"] for result in results] == [True, False, True]
+    assert "Forcing file does not exist" in results[1]["error"]
+    assert all(result["duration"] >= 0 for result in results)
+
+    single_site_path = tmp_path / "single"
+    single_site_path.mkdir()
+    forcing_io.prepare_forcing({**configs[0], "InputPath": str(single_site_path)})
+    for fname in forcing_io.forcing_file_names():
+        assert (tmp_path / "FI-Hyy" / fname).read_bytes() == (
+            single_site_path / fname
+        ).read_bytes()
+
+
+def assert_same_forcing_files(input_path, expected_path, file_format):
+    for fname in forcing_io.forcing_file_names(file_format):
+        if not (expected_path / fname).exists():
+            assert not (input_path / fname).exists()
+        elif fname.endswith(".mat"):
+            expected = hdf5storage.loadmat(str(expected_path / fname))
+            actual = hdf5storage.loadmat(str(input_path / fname))
+            assert actual.keys() == expected.keys()
+            for key, value in expected.items():
+                np.testing.assert_array_equal(actual[key], value)
+        elif fname.endswith(".nc"):
+            with xr.open_dataset(input_path / fname) as actual, xr.open_dataset(
+                expected_path / fname
+            ) as expected:
+                xr.testing.assert_identical(actual, expected)
+        else:
+            assert (input_path / fname).read_bytes() == (
+                expected_path / fname
+            ).read_bytes()
+
+
+@pytest.mark.parametrize("file_format", ["ascii", "mat", "binary"])
+@pytest.mark.parametrize(
+    "config_file, end_time, chunk_size",
+    [
+        ("config_file_test.txt", "1996-01-01T02:00", "30T"),
+        ("config_file_test.txt", "1996-01-01T02:00", "1H"),  # short last chunk
+        ("config_file_global.txt", "1996-01-01T12:00", "4H"),
+    ],
+)
+def test_prepare_forcing_chunked(
+    tmp_path, config_file, end_time, chunk_size, file_format
+):
+    config = config_io.read_config(data_folder / config_file)
+    config["EndTime"] = end_time
+    config["ForcingFormat"] = file_format
+    (tmp_path / "full").mkdir()
+    (tmp_path / "chunked").mkdir()
+
+    forcing_io.prepare_forcing({**config, "InputPath": str(tmp_path / "full")})
+    forcing_io.prepare_forcing(
+        {
+            **config,
+            "InputPath": str(tmp_path / "chunked"),
+            "ForcingChunkSize": chunk_size,
+        }
+    )
+
+    assert_same_forcing_files(tmp_path / "chunked", tmp_path / "full", file_format)
+
+
+def test_forcing_chunks():
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+
+    chunks = forcing_io.forcing_chunks(config, "1H")
+
+    assert chunks == [
+        ("1996-01-01T00:00", "1996-01-01T00:30"),
+        ("1996-01-01T01:00", "1996-01-01T02:00"),
+    ]
+
+
+@pytest.mark.parametrize("file_format", ["ascii", "mat", "binary"])
+@pytest.mark.parametrize(
+    "config_file, end_times",
+    [
+        ("config_file_test.txt", ["1996-01-01T01:00", "1996-01-01T02:00"]),
+        ("config_file_test.txt", ["1996-01-01T00:30", "1996-01-01T01:00", "NA"]),
+        ("config_file_global.txt", ["1996-01-01T06:00", "1996-01-01T12:00"]),
+    ],
+)
+def test_prepare_forcing_incremental(
+    tmp_path, caplog, config_file, end_times, file_format
+):
+    caplog.set_level("INFO", logger="PyStemmusScope.forcing_io")
+    config = config_io.read_config(data_folder / config_file)
+    config["ForcingFormat"] = file_format
+    (tmp_path / "full").mkdir()
+    (tmp_path / "incremental").mkdir()
+
+    for end_time in end_times:
+        incremental_config = {
+            **config,
+            "EndTime": end_time,
+            "InputPath": str(tmp_path / "incremental"),
+            "ForcingIncremental": "True",
+        }
+        forcing_io.prepare_forcing(incremental_config)
+    forcing_io.prepare_forcing(
+        {**config, "EndTime": end_times[-1], "InputPath": str(tmp_path / "full")}
+    )
+
+    assert caplog.text.count("Extended the forcing files") == len(end_times) - 1
+
+    assert_same_forcing_files(tmp_path / "incremental", tmp_path / "full", file_format)
+
+
+@pytest.mark.parametrize("unlimited", [True, False])
+def test_write_postprocessing_file_append(tmp_path, unlimited):
+    time = pd.date_range("1996-01-01", periods=6, freq="30min")
+    expected = xr.Dataset(
+        {
+            var: ("time", np.arange(6, dtype=float) + i)
+            for i, var in enumerate(forcing_io.POSTPROCESSING_VARIABLES)
+        },
+        coords={"time": time},
+        attrs={"latitude": 52.0, "longitude": 4.0},
+    )
+    forcing_io.write_postprocessing_file(expected.isel(time=slice(0, 4)), tmp_path)
+    if not unlimited:
+        # files written by older versions have a fixed size time dimension
+        postprocessing_file = tmp_path / forcing_io.POSTPROCESSING_FILE
+        with xr.open_dataset(postprocessing_file) as ds_file:
+            ds = ds_file.load()
+        ds.to_netcdf(postprocessing_file)
+
+    forcing_io.write_postprocessing_file(
+        expected.isel(time=slice(4, None)), tmp_path, append=True
+    )
+
+    actual = forcing_io.read_postprocessing_file(tmp_path)
+    np.testing.assert_array_equal(actual["time"], time)
+    for var in forcing_io.POSTPROCESSING_VARIABLES:
+        np.testing.assert_array_equal(actual[var], expected[var])
+    assert (actual["latitude"], actual["longitude"]) == (52.0, 4.0)
+
+
+def test_prepare_forcing_incremental_mismatch(tmp_path):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["InputPath"] = str(tmp_path)
+    config["ForcingIncremental"] = "True"
+    forcing_io.prepare_forcing({**config, "EndTime": "1996-01-01T01:00"})
+
+    # Change the stored forcing data, the files should be prepared again
+    postprocessing_file = tmp_path / forcing_io.POSTPROCESSING_FILE
+    with xr.open_dataset(postprocessing_file) as ds_file:
+        ds = ds_file.load()
+    ds["rh"][-1] = 0.0
+    ds.to_netcdf(postprocessing_file)
+
+    assert not forcing_io.extend_forcing(config)
+    forcing_io.prepare_forcing(config)
+    expected = forcing_io.read_forcing_data_plumber2(
+        forcing_data_folder / "XX-Xxx_dummy_forcing_file.nc",
+        config["StartTime"],
+        config["EndTime"],
+    )
+    actual = forcing_io.read_postprocessing_file(tmp_path)
+    np.testing.assert_array_equal(actual["rh"], expected["rh"])
+
+
+@pytest.mark.parametrize("file_format", ["ascii", "binary"])
+def test_prepare_forcing_incremental_mismatch_timeseries(tmp_path, file_format):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["InputPath"] = str(tmp_path)
+    config["ForcingIncremental"] = "True"
+    config["ForcingFormat"] = file_format
+    forcing_io.prepare_forcing({**config, "EndTime": "1996-01-01T01:00"})
+
+    # Change the CO2 of the first timestep, which is not a post-processing variable
+    if file_format == "ascii":
+        co2_file = tmp_path / "CO2_.dat"
+        lines = co2_file.read_bytes().splitlines(keepends=True)
+        lines[0] = b"  0.0000000e+00\n"
+        co2_file.write_bytes(b"".join(lines))
+    else:
+        timeseries_file = tmp_path / "forcing_timeseries.bin"
+        columns = [var for var, _, _ in forcing_io.TIMESERIES_COLUMNS]
+        timeseries = np.fromfile(timeseries_file, dtype="<f8").reshape(-1, len(columns))
+        timeseries[0, columns.index("co2_conv")] = 0.0
+        timeseries.tofile(timeseries_file)
+
+    assert not forcing_io.extend_forcing(config)
+
+
+def test_prepare_forcing_incremental_cached_files(tmp_path):
+    config = config_io.read_config(data_folder / "config_file_test.txt")
+    config["InputPath"] = str(tmp_path / "input")
+    config["ForcingCachePath"] = str(tmp_path / "cache")
+    config["ForcingIncremental"] = "True"
+    (tmp_path / "input").mkdir()
+    forcing_io.prepare_forcing({**config, "EndTime": "1996-01-01T01:00"})
+    cached_files = {
+        file: file.read_bytes() for file in (tmp_path / "cache").rglob("*.dat")
+    }
+
+    forcing_io.prepare_forcing(config)
+
+    # The files in the cache are not modified by extending the forcing files
+    assert cached_files
+    for file, content in cached_files.items():
+        assert file.read_bytes() == content
+    assert len((tmp_path / "input" / "t_.dat").read_text().splitlines()) == 5
+
+
+@pytest.mark.parametrize("file_format", ["ascii", "mat", "binary"])
+def test_write_forcing_concurrent(tmp_path, forcing_data, file_format):
+    (tmp_path / "sequential").mkdir()
+    (tmp_path / "concurrent").mkdir()
+    forcing_io.write_forcing(forcing_data, tmp_path / "sequential", file_format)
+
+    timings = forcing_io.write_forcing_concurrent(
+        forcing_data, tmp_path / "concurrent", file_format, workers=3
+    )
+
+    written_files = [
+        fname
+        for fname in forcing_io.forcing_file_names(file_format)
+        if not fname.endswith(".json")
+    ]
+    assert sorted(timings) == sorted(written_files)
+    assert all(duration >= 0 for duration in timings.values())
+    for fname in written_files:
+        assert (tmp_path / "concurrent" / fname).exists()
+    assert_same_forcing_files(
+        tmp_path / "concurrent", tmp_path / "sequential", file_format
+    )
@@ -0,0 +1,199 @@
+import json
+import shutil
+from unittest.mock import patch
+import numpy as np
+import pytest
+import xarray as xr
+from PyStemmusScope import global_data as gd
+from PyStemmusScope.global_data import manifest
+from . import data_folder
+
+
+GLOBAL_DATA_FOLDER = data_folder / "directories" / "global"
+TEST_LATLON = (37.933804, -107.807526)
+TIME_RANGE = (np.datetime64("1996-01-01T00:00"), np.datetime64("1996-01-01T12:00"))
+LAI_FILES = [
+    "c3s_LAI_19960101000000_GLOBE_PROBAV_V3.0.1.nc",
+    "c3s_LAI_19960102000000_GLOBE_PROBAV_V3.0.1.nc",
+]
+
+
+@pytest.fixture(autouse=True)
+def manifest_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "_MANIFESTS", {})
+    monkeypatch.setitem(manifest._SETTINGS, "manifest_dir", None)
+    manifest.configure_manifest({"GlobalDataManifestPath": str(tmp_path / "manifest")})
+    return tmp_path / "manifest"
+
+
+@pytest.fixture
+def split_global_data(tmp_path):
+    """Global data directory with the ERA5 files split into one file per day."""
+    global_data_dir = tmp_path / "global"
+    for folder in ("era5", "era5-land"):
+        (global_data_dir / folder).mkdir(parents=True)
+        for file in (GLOBAL_DATA_FOLDER / folder).glob("*.nc"):
+            with xr.open_dataset(file) as ds:
+                for day in ("01", "02"):
+                    ds.sel(time=f"1996-01-{day}").to_netcdf(
+                        global_data_dir / folder / f"{file.stem}_{day}.nc"
+                    )
+    return global_data_dir
+
+
+def test_manifest_metadata():
+    dataset_manifest = manifest.get_manifest(GLOBAL_DATA_FOLDER / "lai")
+    assert sorted(dataset_manifest.files) == LAI_FILES
+
+    # the metadata is read when the files are selected
+    dataset_manifest.select_files(TIME_RANGE, [TEST_LATLON])
+    entry = dataset_manifest.files[LAI_FILES[0]]
+    assert entry["start"] == "1996-01-01T00:00:00"
+    assert entry["end"] == "1996-01-01T00:00:00"
+    assert entry["latitude"][0] < TEST_LATLON[0] < entry["latitude"][1]
+    assert entry["longitude"][0] < TEST_LATLON[1] < entry["longitude"][1]
+    assert "LAI" in entry["variables"]
+
+    with dataset_manifest.manifest_file.open(encoding="utf8") as f:
+        assert set(json.load(f)["files"]) == set(LAI_FILES)
+
+
+def test_manifest_in_memory(monkeypatch, manifest_dir):
+    monkeypatch.setitem(manifest._SETTINGS, "manifest_dir", None)
+
+    with patch.object(manifest, "read_file_metadata") as mocked_read:
+        dataset_manifest = manifest.get_manifest(GLOBAL_DATA_FOLDER / "lai")
+        assert sorted(dataset_manifest.files) == LAI_FILES
+        assert not dataset_manifest.stored
+
+        # all files are selected, without opening them
+        files = dataset_manifest.select_files(TIME_RANGE, [(-60.0, 20.0)])
+        assert [file.name for file in files] == LAI_FILES
+        mocked_read.assert_not_called()
+
+    assert not manifest_dir.exists()
+
+
+def test_manifest_incremental_refresh(tmp_path):
+    folder = tmp_path / "lai"
+    shutil.copytree(GLOBAL_DATA_FOLDER / "lai", folder)
+    manifest.get_manifest(folder).select_files(TIME_RANGE, [TEST_LATLON])
+    read_metadata = manifest.read_file_metadata
+
+    with patch.object(
+        manifest, "read_file_metadata", side_effect=read_metadata
+    ) as mocked_read:
+        # a new manifest object loads the stored manifest, without opening any file
+        manifest._MANIFESTS.clear()
+        dataset_manifest = manifest.get_manifest(folder)
+        assert mocked_read.call_count == 0
+
+        # only the modified file is read again, when the files are selected
+        with (folder / LAI_FILES[1]).open("ab") as f:
+            f.write(b"\0")
+        dataset_manifest.refresh()
+        assert mocked_read.call_count == 0
+        dataset_manifest.select_files(TIME_RANGE, [TEST_LATLON])
+        mocked_read.assert_called_once_with(folder.resolve() / LAI_FILES[1])
+
+    (folder / LAI_FILES[0]).unlink()
+    dataset_manifest.refresh()
+    assert list(dataset_manifest.files) == [LAI_FILES[1]]
+
+
+def test_select_files_time_range():
+    dataset_manifest = manifest.get_manifest(GLOBAL_DATA_FOLDER / "lai")
+
+    # the next file is needed to interpolate to the end time
+    files = dataset_manifest.select_files(TIME_RANGE, [TEST_LATLON])
+    assert [file.name for file in files] == LAI_FILES
+
+    time_range = (np.datetime64("1996-01-01T00:00"), np.datetime64("1996-01-01T00:00"))
+    files = dataset_manifest.select_files(time_range, [TEST_LATLON])
+    assert [file.name for file in files] == LAI_FILES[:1]
+
+    time_range = (np.datetime64("1996-01-02T00:00"), np.datetime64("1996-01-05T00:00"))
+    files = dataset_manifest.select_files(time_range, [TEST_LATLON])
+    assert [file.name for file in files] == LAI_FILES[1:]
+
+
+def test_select_files_no_match():
+    dataset_manifest = manifest.get_manifest(GLOBAL_DATA_FOLDER / "lai")
+
+    # all files are returned, so that the dataset validation reports the error
+    files = dataset_manifest.select_files(TIME_RANGE, [(-60.0, 20.0)])
+    assert [file.name for file in files] == LAI_FILES
+
+
+def test_select_files_empty_folder(tmp_path):
+    with pytest.raises(FileNotFoundError, match="No netCDF files found in the folder"):
+        manifest.get_manifest(tmp_path).select_files(TIME_RANGE, [TEST_LATLON])
+
+
+def test_era5_split_files(split_global_data):
+    files_era5, files_era5_land = gd.era5._get_era5_files(
+        split_global_data,
+        gd.era5._get_era5_manifests(split_global_data),
+        [TEST_LATLON],
+        TIME_RANGE,
+    )
+    assert len(files_era5) == len(gd.era5.ERA5_VARIABLES)
+    assert len(files_era5_land) == len(gd.era5.ERA5LAND_VARIABLES)
+    assert all(file.stem.endswith("_01") for file in files_era5 + files_era5_land)
+
+    expected = gd.era5.retrieve_era5_data(
+        GLOBAL_DATA_FOLDER, TEST_LATLON, TIME_RANGE, "1800s"
+    )
+    result = gd.era5.retrieve_era5_data(
+        split_global_data, TEST_LATLON, TIME_RANGE, "1800s"
+    )
+    assert result.keys() == expected.keys()
+    for var, value in expected.items():
+        np.testing.assert_allclose(result[var], value, err_msg=var)
+
+
+def test_era5_point_store(split_global_data):
+    expected = gd.era5.retrieve_era5_data(
+        GLOBAL_DATA_FOLDER, TEST_LATLON, TIME_RANGE, "1800s"
+    )
+
+    stores = gd.era5.build_point_store(split_global_data, space_chunk=2)
+    with xr.open_dataset(stores[0]) as ds:
+        assert ds["sp"].encoding["chunksizes"][ds["sp"].dims.index("latitude")] == 2
+
+    files_era5, files_era5_land = gd.era5._get_era5_files(
+        split_global_data,
+        gd.era5._get_era5_manifests(split_global_data),
+        [TEST_LATLON],
+        TIME_RANGE,
+    )
+    assert (files_era5, files_era5_land) == ([stores[0]], [stores[1]])
+
+    result = gd.era5.retrieve_era5_data(
+        split_global_data, TEST_LATLON, TIME_RANGE, "1800s"
+    )
+    for var, value in expected.items():
+        np.testing.assert_array_equal(result[var], value, err_msg=var)
+
+
+def test_era5_point_store_out_of_date(split_global_data):
+    gd.era5.build_point_store(split_global_data)
+    next(iter((split_global_data / "era5").glob("*.nc"))).unlink()
+
+    manifests = gd.era5._get_era5_manifests(split_global_data)
+    for folder, up_to_date in (("era5", False), ("era5-land", True)):
+        store = gd.era5.get_point_store(split_global_data, folder, manifests[folder])
+        assert (store is not None) == up_to_date
+
+
+def test_retrieval_refreshes_manifest_once(tmp_path):
+    cache = gd.point_cache.PointCache(tmp_path / "point_cache", "1GB")
+    refresh = manifest.DatasetManifest.refresh
+
+    with patch.object(
+        manifest.DatasetManifest, "refresh", autospec=True, side_effect=refresh
+    ) as mocked_refresh:
+        gd.copernicus_lai.retrieve_lai_data(
+            GLOBAL_DATA_FOLDER, TEST_LATLON, TIME_RANGE, "1800s", cache=cache
+        )
+    assert mocked_refresh.call_count == 1
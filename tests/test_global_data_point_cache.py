@@ -0,0 +1,132 @@
+import os
+import shutil
+import time
+import numpy as np
+import pytest
+import xarray as xr
+from PyStemmusScope import global_data as gd
+from PyStemmusScope.global_data import manifest
+from PyStemmusScope.global_data import point_cache
+from . import data_folder
+
+
+GLOBAL_DATA_FOLDER = data_folder / "directories" / "global"
+TEST_LATLON = (37.933804, -107.807526)
+TIME_RANGE = (np.datetime64("1996-01-01T00:00"), np.datetime64("1996-01-01T12:00"))
+TIMESTEP = "1800S"
+
+
+@pytest.fixture(autouse=True)
+def reset_caches(monkeypatch):
+    monkeypatch.setattr(manifest, "_MANIFESTS", {})
+    monkeypatch.setattr(point_cache, "_CACHES", {})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return point_cache.PointCache(tmp_path / "point_cache", "1GB")
+
+
+def test_collect_datasets_cached(cache):
+    expected = gd.collect_datasets(
+        GLOBAL_DATA_FOLDER, TEST_LATLON, TIME_RANGE, TIMESTEP
+    )
+
+    for _ in range(2):
+        data = gd.collect_datasets(
+            GLOBAL_DATA_FOLDER, TEST_LATLON, TIME_RANGE, TIMESTEP, cache=cache
+        )
+        for var, value in expected.items():
+            np.testing.assert_array_equal(np.asarray(data[var]), np.asarray(value))
+
+    # ERA5, ERA5-land, CAMS, LAI and land cover
+    assert cache.misses == 5
+    assert cache.hits == 5
+
+
+def test_cached_series_other_time_range(cache):
+    gd.copernicus_lai.retrieve_lai_data(
+        GLOBAL_DATA_FOLDER, TEST_LATLON, TIME_RANGE, TIMESTEP, cache=cache
+    )
+
+    # a shorter time range within the same grid cell is served from the cache
+    time_range = (np.datetime64("1996-01-01T03:00"), np.datetime64("1996-01-01T06:00"))
+    latlon = (TEST_LATLON[0] + 0.001, TEST_LATLON[1])
+    result = gd.copernicus_lai.retrieve_lai_data(
+        GLOBAL_DATA_FOLDER, latlon, time_range, TIMESTEP, cache=cache
+    )
+    assert cache.hits == 1
+
+    expected = gd.copernicus_lai.retrieve_lai_data(
+        GLOBAL_DATA_FOLDER, latlon, time_range, TIMESTEP
+    )
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_cache_key(tmp_path, cache):
+    folder = tmp_path / "lai"
+    shutil.copytree(GLOBAL_DATA_FOLDER / "lai", folder)
+    resolution = gd.copernicus_lai.RESOLUTION_LAI
+    dataset_manifest = manifest.get_manifest(folder)
+    key = cache.make_key("LAI", dataset_manifest, TEST_LATLON, resolution)
+
+    latlon = (TEST_LATLON[0] + resolution / 4, TEST_LATLON[1])
+    assert cache.make_key("LAI", dataset_manifest, latlon, resolution) == key
+    latlon = (TEST_LATLON[0] + resolution, TEST_LATLON[1])
+    assert cache.make_key("LAI", dataset_manifest, latlon, resolution) != key
+
+    # the key changes when the dataset is modified
+    with next(folder.glob("*.nc")).open("ab") as f:
+        f.write(b"\0")
+    dataset_manifest = manifest.get_manifest(folder)
+    assert cache.make_key("LAI", dataset_manifest, TEST_LATLON, resolution) != key
+
+
+def test_store_merges_series(cache):
+    files = sorted((GLOBAL_DATA_FOLDER / "lai").glob("*.nc"))
+    series = gd.copernicus_lai.select_lai_data_batch(
+        GLOBAL_DATA_FOLDER, [TEST_LATLON], TIME_RANGE
+    ).compute()
+    assert series.sizes["time"] == len(files)
+
+    cache.store("key", series.isel(time=[0]), files[:1])
+    assert cache.get("key", files[:1]) is not None
+    assert cache.get("key", files) is None
+
+    # the series of another time window is merged into the entry
+    cache.store("key", series.isel(time=[1]), files[1:])
+    result = cache.get("key", files)
+    assert result is not None
+    xr.testing.assert_identical(result, series.drop_encoding())
+
+
+def test_evict(tmp_path):
+    cache = point_cache.PointCache(tmp_path / "point_cache", "1GB", max_age=1)
+    series = gd.copernicus_lai.select_lai_data_batch(
+        GLOBAL_DATA_FOLDER, [TEST_LATLON], TIME_RANGE
+    ).compute()
+    for key in ("old", "new"):
+        cache.store(key, series, [])
+    two_days_ago = time.time() - 2 * 24 * 3600
+    os.utime(cache.cache_dir / "old.nc", (two_days_ago, two_days_ago))
+
+    cache.evict()
+    assert sorted(file.stem for file in cache.cache_dir.glob("*.nc")) == ["new"]
+
+    cache.max_size = 0
+    cache.evict()
+    assert list(cache.cache_dir.glob("*.nc")) == []
+
+
+def test_get_point_cache(tmp_path):
+    assert point_cache.get_point_cache({}) is None
+
+    config = {
+        "GlobalDataCachePath": str(tmp_path / "point_cache"),
+        "GlobalDataCacheMaxSize": "500MB",
+        "GlobalDataCacheMaxAge": "30",
+    }
+    cache = point_cache.get_point_cache(config)
+    assert cache is point_cache.get_point_cache(config)
+    assert cache.max_size == 500e6
+    assert cache.max_age == 30
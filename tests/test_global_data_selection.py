@@ -1,8 +1,15 @@
+import gzip
+import threading
+import time
 from pathlib import Path
 from unittest import mock
+import dask
 import numpy as np
+import pandas as pd
 import PyStemmusScope.global_data as gd
 import pytest
+import xarray as xr
+from PyStemmusScope import dataset_pool
 from PyStemmusScope import forcing_io
 from . import data_folder
 
@@ -88,6 +95,269 @@ def test_extract_forcing_data_str(get_forcing_data, key, val):
     assert np.array([val]) == data[key][0]
 
 
+def test_collect_datasets_concurrent(get_forcing_data, monkeypatch):
+    # Start without opened datasets and manifests, so that every file is opened by
+    # the concurrent threads. The files should not be opened at the same time.
+    monkeypatch.setattr(dataset_pool, "_POOL", dataset_pool.DatasetPool())
+    monkeypatch.setattr(gd.manifest, "_MANIFESTS", {})
+    opening_threads: set[int] = set()
+    max_opening_threads = []
+
+    def exclusive(opener):
+        def wrapper(*args, **kwargs):
+            opening_threads.add(threading.get_ident())
+            max_opening_threads.append(len(opening_threads))
+            time.sleep(0.01)
+            try:
+                return opener(*args, **kwargs)
+            finally:
+                opening_threads.discard(threading.get_ident())
+
+        return wrapper
+
+    monkeypatch.setattr(xr, "open_dataset", exclusive(xr.open_dataset))
+    monkeypatch.setattr(xr, "open_mfdataset", exclusive(xr.open_mfdataset))
+
+    data = gd.collect_datasets(
+        global_data_dir=GLOBAL_DATA_FOLDER,
+        latlon=(TEST_LAT, TEST_LON),
+        time_range=(START_TIME, END_TIME),
+        timestep=TIMESTEP,
+        workers=6,
+        timeout=60,
+    )
+
+    assert max_opening_threads
+    assert max(max_opening_threads) == 1
+    assert data.keys() == get_forcing_data.keys()
+    for key, value in get_forcing_data.items():
+        np.testing.assert_array_equal(np.asarray(data[key]), np.asarray(value))
+
+
+def test_collect_datasets_batch():
+    latlons = [(TEST_LAT, TEST_LON), (37.9345, -107.8065), (TEST_LAT, TEST_LON)]
+    batch_data = gd.collect_datasets_batch(
+        global_data_dir=GLOBAL_DATA_FOLDER,
+        latlons=latlons,
+        time_range=(START_TIME, END_TIME),
+        timestep=TIMESTEP,
+    )
+
+    assert len(batch_data) == len(latlons)
+    for latlon, data in zip(latlons, batch_data):
+        expected = gd.collect_datasets(
+            global_data_dir=GLOBAL_DATA_FOLDER,
+            latlon=latlon,
+            time_range=(START_TIME, END_TIME),
+            timestep=TIMESTEP,
+        )
+        assert data.keys() == expected.keys()
+        for key, value in expected.items():
+            np.testing.assert_array_equal(np.asarray(data[key]), np.asarray(value))
+            assert type(data[key]) is type(value)
+
+
+def test_collect_datasets_batch_missing_location():
+    with pytest.raises(gd.utils.MissingDataError, match="does not cover"):
+        gd.collect_datasets_batch(
+            global_data_dir=GLOBAL_DATA_FOLDER,
+            latlons=[(TEST_LAT, TEST_LON), (0.0, TEST_LON)],
+            time_range=(START_TIME, END_TIME),
+            timestep=TIMESTEP,
+        )
+
+
+def test_dask_execution(monkeypatch):
+    config = {
+        "DaskScheduler": "synchronous",
+        "DaskWorkers": "2",
+        "DaskChunkTime": "4",
+        "DaskChunkLat": "1",
+    }
+    execution = gd.dask_execution.get_execution(config)
+    assert execution.chunk_sizes == {"time": 4, "lat": 1}
+    assert execution.compute_kwargs() == {"scheduler": "synchronous", "num_workers": 2}
+
+    # the scheduler is passed to dask.compute, the global config is not changed
+    compute_kwargs = []
+    dask_compute = dask.compute
+
+    def compute(*args, **kwargs):
+        compute_kwargs.append(kwargs)
+        return dask_compute(*args, **kwargs)
+
+    monkeypatch.setattr(dask, "compute", compute)
+    batch_data = gd.collect_datasets_batch(
+        global_data_dir=GLOBAL_DATA_FOLDER,
+        latlons=[(TEST_LAT, TEST_LON)],
+        time_range=(START_TIME, END_TIME),
+        timestep=TIMESTEP,
+        execution=execution,
+    )
+    single_data = gd.collect_datasets(
+        global_data_dir=GLOBAL_DATA_FOLDER,
+        latlon=(TEST_LAT, TEST_LON),
+        time_range=(START_TIME, END_TIME),
+        timestep=TIMESTEP,
+        execution=execution,
+    )
+    # a single compute call for all datasets, also for a single site
+    assert compute_kwargs == [execution.compute_kwargs()] * 2
+    assert dask.config.get("scheduler", None) is None
+
+    monkeypatch.setattr(dask, "compute", dask_compute)
+    expected = gd.collect_datasets(
+        global_data_dir=GLOBAL_DATA_FOLDER,
+        latlon=(TEST_LAT, TEST_LON),
+        time_range=(START_TIME, END_TIME),
+        timestep=TIMESTEP,
+    )
+    for key, value in expected.items():
+        np.testing.assert_array_equal(np.asarray(batch_data[0][key]), np.asarray(value))
+        np.testing.assert_array_equal(np.asarray(single_data[key]), np.asarray(value))
+
+
+def test_dataset_chunks():
+    assert gd.dask_execution.dataset_chunks(None, "lat", "lon") == "auto"
+    assert gd.dask_execution.dataset_chunks({}, "lat", "lon") == "auto"
+
+    chunk_sizes = gd.dask_execution.get_chunk_sizes({"DaskChunkLon": "10"})
+    chunks = gd.dask_execution.dataset_chunks(chunk_sizes, "latitude", "longitude")
+    assert chunks == {"time": "auto", "latitude": "auto", "longitude": 10}
+
+    ds = gd.cams_co2.select_co2_data_batch(
+        GLOBAL_DATA_FOLDER, [(TEST_LAT, TEST_LON)], (START_TIME, END_TIME), {"time": 1}
+    )
+    assert set(ds["co2"].chunksizes["time"]) == {1}
+
+
+def test_dask_execution_invalid_scheduler():
+    with pytest.raises(ValueError, match="DaskScheduler"):
+        gd.dask_execution.get_execution({"DaskScheduler": "cluster"})
+
+
+@pytest.mark.parametrize(
+    "freq, dtype, time_range",
+    [
+        ("3H", np.float64, ("2003-06-01T01:30", "2003-07-01")),
+        ("3H", np.float32, ("2003-06-01T01:30", "2003-07-01")),
+        ("10D", np.float64, ("2001-03-01", "2004-03-01")),
+        ("10D", np.float64, ("1999-12-01", "2000-01-03")),  # starts before the data
+    ],
+)
+def test_resample_point(freq, dtype, time_range):
+    time = pd.date_range("2000-01-01", "2004-12-31", freq=freq)
+    rng = np.random.default_rng(0)
+    ds = xr.Dataset(
+        {
+            "a": ("time", rng.random(time.size).astype(dtype)),
+            "b": (("site", "time"), rng.random((2, time.size)).astype(dtype)),
+        },
+        coords={"time": time},
+    )
+    time_range = tuple(np.datetime64(t) for t in time_range)
+
+    expected = ds.resample(time=TIMESTEP).interpolate("linear")
+    expected = expected.sel(time=slice(time_range[0], time_range[1]))
+    result = gd.utils.resample_point(ds, time_range, TIMESTEP)
+    xr.testing.assert_identical(result, expected)
+
+
+@pytest.mark.parametrize(
+    "x, y, max_distance",
+    [
+        (3.3, 6.2, None),
+        (3.5, 5.5, None),  # equally near pixels
+        (-4.0, 12.0, None),  # outside of the data
+        (3.3, 6.2, 4.0),
+    ],
+)
+def test_find_nearest_non_nan(x, y, max_distance):
+    rng = np.random.default_rng(0)
+    values = rng.random((1, 12, 10))
+    values[0, 2:9, 1:7] = np.nan
+    values[rng.random(values.shape) < 0.3] = np.nan
+    da = xr.DataArray(
+        values,
+        dims=("band", "y", "x"),
+        coords={"band": [1], "y": np.arange(12.0)[::-1], "x": np.arange(10.0)},
+    )
+
+    # brute force search over all pixels
+    distance = ((da["x"] - x) ** 2 + (da["y"] - y) ** 2) ** 0.5
+    distance = distance.where(~np.isnan(da))
+    expected = da.isel(distance.argmin(dim=["x", "y"]))
+
+    result = gd.utils.find_nearest_non_nan(da, x, y, max_distance=max_distance)
+    xr.testing.assert_identical(result, expected)
+
+
+def test_find_nearest_non_nan_batch():
+    da = xr.DataArray(
+        [[np.nan, 1.0, np.nan], [np.nan, np.nan, np.nan], [3.0, np.nan, np.nan]],
+        dims=("lat", "lon"),
+        coords={"lat": [0.0, 1.0, 2.0], "lon": [0.0, 1.0, 2.0]},
+    )
+    result = gd.utils.find_nearest_non_nan_batch(
+        da, [1.2, 0.1, 2.0], [0.8, 1.9, 2.0], xdim="lon", ydim="lat", max_distance=1.5
+    )
+    assert [float(r) if r is not None else None for r in result] == [1.0, 3.0, None]
+
+    with pytest.raises(gd.utils.MissingDataError):
+        gd.utils.find_nearest_non_nan(da, 2.0, 2.0, "lon", "lat", max_distance=1.5)
+
+
+def test_collect_datasets_timeout():
+    def slow_dem_data(*args):
+        time.sleep(2)
+        return 0.0
+
+    with mock.patch.object(gd.prism_dem, "retrieve_dem_data", slow_dem_data):
+        with pytest.raises(TimeoutError, match="prism_dem"):
+            gd.collect_datasets(
+                global_data_dir=GLOBAL_DATA_FOLDER,
+                latlon=(TEST_LAT, TEST_LON),
+                time_range=(START_TIME, END_TIME),
+                timestep=TIMESTEP,
+                workers=2,
+                timeout={"prism_dem": 0.1},
+            )
+
+
+@pytest.mark.parametrize(
+    "module, dataset, get_tile_name",
+    [
+        (
+            gd.prism_dem,
+            "dem",
+            lambda lat, lon: gd.prism_dem.get_filename_dem(lat, lon).replace(
+                "_DEM.tif", ".tar"
+            ),
+        ),
+        (
+            gd.eth_canopy_height,
+            "canopy_height",
+            gd.eth_canopy_height.get_filename_canopy_height,
+        ),
+    ],
+)
+def test_tiles_exist(module, dataset, get_tile_name):
+    asset_name, _ = gd.tile_index.TILE_ASSETS[dataset]
+    with gzip.open(gd.tile_index.ASSETS_DIR / asset_name, "rt") as f:
+        tile_names = set(f.read().splitlines())
+
+    rng = np.random.default_rng(0)
+    latlons = [(TEST_LAT, TEST_LON), (0, 0), (-33.45, -70.66), (90, 180)] + list(
+        zip(rng.uniform(-90, 90, 100), rng.uniform(-180, 180, 100))
+    )
+    expected = [get_tile_name(lat, lon) in tile_names for lat, lon in latlons]
+
+    result = module.tiles_exist(latlons)
+    np.testing.assert_array_equal(result, expected)
+    assert result[0]
+    assert not result[1]
+
+
 class TestEra5:
     def test_era5_missing_data(self):
         with pytest.raises(
@@ -287,6 +557,33 @@ class TestCanopyHeight:
                 lon=TEST_LON,
             )
 
+    def test_windowed_read_descending_y(self, tmp_path):
+        file_canopy_height = (
+            GLOBAL_DATA_FOLDER
+            / "canopy_height"
+            / gd.eth_canopy_height.get_filename_canopy_height(TEST_LAT, TEST_LON)
+        )
+        da = xr.open_dataarray(file_canopy_height, engine="rasterio").compute()
+        # north-up tile (like the ETH data) with missing pixels around the site
+        distance = ((da["x"] - TEST_LON) ** 2 + (da["y"] - TEST_LAT) ** 2) ** 0.5
+        da = da.where(distance > 0.0004).isel(y=slice(None, None, -1))
+        da = da.rio.write_transform(da.rio.transform(recalc=True))
+        da.rio.to_raster(tmp_path / file_canopy_height.name)
+
+        expected = gd.utils.find_nearest_non_nan(
+            da.sortby(["x", "y"]),
+            x=TEST_LON,
+            y=TEST_LAT,
+            max_distance=gd.eth_canopy_height.MAX_DISTANCE,
+        )
+        result = gd.eth_canopy_height.extract_canopy_height_data(
+            tmp_path / file_canopy_height.name, TEST_LAT, TEST_LON
+        )
+        assert result == expected.values[0]
+
+        window = gd.utils.raster_window(da, TEST_LON, TEST_LAT, 0.001)
+        assert window["y"].stop - window["y"].start < da.sizes["y"]
+
 
 class TestDEM:
     def test_missing_tile(self):
@@ -320,6 +617,35 @@ class TestDEM:
                 lon=TEST_LON,
             )
 
+    def test_windowed_read(self):
+        file_dem = (
+            GLOBAL_DATA_FOLDER
+            / "dem"
+            / gd.prism_dem.get_filename_dem(TEST_LAT, TEST_LON)
+        )
+        da = xr.open_dataarray(file_dem, engine="rasterio").compute()
+        # the nearest pixels are missing, so the search has to look further away
+        nearest = gd.utils.find_nearest_non_nan(da, x=TEST_LON, y=TEST_LAT)
+        da = da.where((da["x"] != nearest["x"]) | (da["y"] != nearest["y"]))
+
+        expected = gd.utils.find_nearest_non_nan(
+            da, x=TEST_LON, y=TEST_LAT, max_distance=gd.prism_dem.MAX_DISTANCE
+        )
+        result = gd.utils.find_nearest_non_nan_window(
+            da, x=TEST_LON, y=TEST_LAT, max_distance=gd.prism_dem.MAX_DISTANCE
+        )
+        xr.testing.assert_identical(result, expected)
+
+        elevation = gd.prism_dem.retrieve_dem_data(
+            GLOBAL_DATA_FOLDER, TEST_LAT, TEST_LON
+        )
+        assert (
+            elevation
+            == gd.prism_dem.retrieve_dem_data_batch(
+                GLOBAL_DATA_FOLDER, [(TEST_LAT, TEST_LON)]
+            )[0]
+        )
+
 
 class TestLandCover:
     def test_missing_data(self):
@@ -363,3 +689,41 @@ class TestLandCover:
                 time_range=time_range,
                 timestep=TIMESTEP,
             )
+
+    def test_lookup_landcover_classes(self):
+        igbp_table = gd.cci_landcover.get_lccs_to_igbp_table()
+        flag_values = np.array(sorted(igbp_table), dtype=np.uint8)
+        lccs_class = xr.DataArray(
+            0,
+            attrs={
+                "flag_values": flag_values,
+                "flag_meanings": " ".join(f"class_{value}" for value in flag_values),
+            },
+        )
+        dataset = xr.Dataset({"lccs_class": lccs_class})
+        lccs_ids = np.repeat([10.0, 70.0, 10.0, 210.0], 5)
+
+        result = gd.cci_landcover._lookup_landcover_classes(dataset, lccs_ids)
+        expected_lccs = np.array([f"class_{int(_id)}" for _id in lccs_ids])
+        expected_igbp = np.array([igbp_table[_id] for _id in lccs_ids])
+        np.testing.assert_array_equal(result["LCCS_landcover"], expected_lccs)
+        np.testing.assert_array_equal(result["IGBP_veg_long"], expected_igbp)
+        assert result["IGBP_veg_long"].dtype == expected_igbp.dtype
+
+        with pytest.raises(KeyError):
+            gd.cci_landcover._lookup_landcover_classes(dataset, np.array([5.0]))
+
+    def test_grid_indices(self):
+        files = sorted((GLOBAL_DATA_FOLDER / "landcover").glob("*.nc"))
+        with xr.open_mfdataset(files) as cci_dataset:
+            lat_bounds = cci_dataset["lat_bounds"].isel(time=0).to_numpy()
+            lon_bounds = cci_dataset["lon_bounds"].isel(time=0).to_numpy()
+            # cell centers and edges
+            latlons = list(zip(cci_dataset["lat"].to_numpy()[:20], lon_bounds[:, 0]))
+            latlons += list(zip(lat_bounds[1:, 1], cci_dataset["lon"].to_numpy()))
+            lat_idx, lon_idx = gd.cci_landcover._get_grid_indices(cci_dataset, latlons)
+
+        for i, (lat, lon) in enumerate(latlons):
+            lat_cells = (lat_bounds[:, 0] >= lat) & (lat_bounds[:, 1] < lat)
+            lon_cells = (lon_bounds[:, 0] <= lon) & (lon_bounds[:, 1] > lon)
+            assert (lat_idx[i], lon_idx[i]) == (lat_cells.argmax(), lon_cells.argmax())
@@ -91,6 +91,29 @@ class TestSaveForcingData:
         # it shouldn't have z dimentsion
         assert "z" not in dataset
 
+    def test_save_to_netcdf_without_postprocessing_file(
+        self, cf_convention, model_with_setup
+    ):
+        model, config_file = model_with_setup
+
+        # the forcing data stored in the input directory should be used
+        with patch.object(forcing_io, "read_forcing_data_plumber2") as mocked_read:
+            saved_nc_file = save.to_netcdf(config_file, cf_convention)
+            mocked_read.assert_not_called()
+        with xr.open_dataset(saved_nc_file) as dataset:
+            expected = dataset.load()
+
+        # the forcing data should be read again if it was not stored
+        postprocessing_file = (
+            Path(model.config["InputPath"]) / forcing_io.POSTPROCESSING_FILE
+        )
+        postprocessing_file.unlink()
+        saved_nc_file = save.to_netcdf(config_file, cf_convention)
+
+        with xr.open_dataset(saved_nc_file) as dataset:
+            xr.testing.assert_allclose(dataset, expected)
+            assert dataset.attrs["latitude"] == expected.attrs["latitude"]
+
 
 class TestSaveSimulatedData:
     @pytest.fixture
@@ -378,3 +401,14 @@ class TestSaveToNetcdf:
         dataset = xr.open_dataset(saved_nc_file, decode_times=False)
         assert dataset.time.attrs["units"] == f"seconds since {start_time}"
         assert dataset.time.attrs["calendar"] == "standard"
+
+
+def test_save_to_netcdf_bbox(tmp_path):
+    config_file = tmp_path / "config_file_bbox.txt"
+    config = (data_folder / "config_file_test.txt").read_text(encoding="utf8")
+    config_file.write_text(
+        config.replace("Location=XX-Xxx", "Location=((52.0, 4.0), (52.2, 4.1))"),
+        encoding="utf8",
+    )
+    with pytest.raises(ValueError, match="config file of every grid cell"):
+        save.to_netcdf(str(config_file), str(tmp_path / "cf_convention.csv"))
@@ -78,6 +78,17 @@ def test_data_collection(lat, lon, expected_values):
     assert sorted(matfiledata.keys()) == sorted(expected_values.keys())
 
 
+def test_data_collection_batch(lat, lon):
+    latlons = [(lat, lon), (37.5, -108.3), (38.2, -107.3)]
+    cell_data = soil_io._collect_soil_data_batch(soil_data_folder, latlons)
+
+    for latlon, matfiledata in zip(latlons, cell_data):
+        expected = soil_io._collect_soil_data(soil_data_folder, *latlon)
+        assert matfiledata.keys() == expected.keys()
+        for key, value in expected.items():
+            np.testing.assert_array_equal(matfiledata[key], value)
+
+
 def test_soil_composition_vars(lat, lon, depth_indices, expected_values):
     soil_composition_dict = soil_io._read_soil_composition(
         soil_data_folder, lat, lon, depth_indices
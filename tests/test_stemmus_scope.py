@@ -106,6 +106,7 @@ class TestWithDefaults:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             shell=True,
+            env={**os.environ, "MATLAB_LOG_DIR": str(model.config["InputPath"])},
         )
 
         # output of subprocess
@@ -114,8 +115,6 @@ class TestWithDefaults:
             "The calculations start now \r\n The calculations end now \r'"
         )
         assert result == expected_log
-        # matlab log dir
-        assert os.environ["MATLAB_LOG_DIR"] == str(model.config["InputPath"])
 
 
 class TestWithCustomSetup:
@@ -184,6 +183,7 @@ class TestWithCustomSetup:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             shell=True,
+            env={**os.environ, "MATLAB_LOG_DIR": str(model.config["InputPath"])},
         )
 
         # output of subprocess
@@ -192,8 +192,6 @@ class TestWithCustomSetup:
             "The calculations start now \r\n The calculations end now \r'"
         )
         assert result == expected_log
-        # matlab log dir
-        assert os.environ["MATLAB_LOG_DIR"] == str(model.config["InputPath"])
 
 
 class TestWithMatlab:
@@ -243,6 +241,7 @@ class TestWithMatlab:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             shell=True,
+            env=None,
         )
 
         # output of subprocess
@@ -303,6 +302,7 @@ class TestWithOctave:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             shell=True,
+            env=None,
         )
 
         # output of subprocess
@@ -354,3 +354,82 @@ class TestWithGlobalData:
         model, cfg_file = model_with_setup
         actual = config_io.read_config(cfg_file)
         assert actual == model.config
+
+
+class TestWithBoundingBox:
+    @pytest.fixture
+    def model(self, tmp_path):
+        config_file = str(data_folder / "config_file_global.txt")
+        exe_file = Path(tmp_path) / "STEMMUS_SCOPE"
+
+        # create dummy exe file
+        with exe_file.open(mode="x", encoding="utf8") as dummy_file:
+            dummy_file.close()
+        model = StemmusScope(config_file, model_src_path=exe_file)
+        model.config["GridResolution"] = "0.002"
+        model.config["ModelWorkers"] = "2"
+        yield model
+
+    @pytest.fixture
+    def model_with_setup(self, model, tmp_path):
+        with patch("time.strftime") as mocked_time:
+            mocked_time.return_value = "2022-07-11-1200"
+            cfg_file = model.setup(
+                WorkDir=str(tmp_path),
+                Location="((37.932, -107.809), (37.935, -107.806))",
+                StartTime="1996-01-01T00:00",
+                EndTime="1996-01-01T02:00",
+            )
+        return model, cfg_file
+
+    def test_setup(self, model_with_setup, tmp_path):
+        model, cfg_file = model_with_setup
+        name = "global_bbox_N37-932_W107-809_N37-935_W107-806_2022-07-11-1200"
+        actual_input_dir = tmp_path / "input" / name
+        actual_cfg_file = str(actual_input_dir / "global_2022-07-11-1200_config.txt")
+
+        assert actual_input_dir == Path(model.config["InputPath"])
+        assert actual_cfg_file == cfg_file
+
+        cells = sorted(
+            path.name for path in actual_input_dir.iterdir() if path.is_dir()
+        )
+        assert cells == [
+            "global_N37-933_W107-807",
+            "global_N37-933_W107-809",
+            "global_N37-935_W107-807",
+            "global_N37-935_W107-809",
+        ]
+
+        cell_config = config_io.read_config(
+            actual_input_dir / "global_N37-933_W107-809" / "config.txt"
+        )
+        assert cell_config["Location"] == "(37.933, -107.809)"
+        assert Path(cell_config["OutputPath"]).is_dir()
+        for fname in ("Mdata.txt", "soil_parameters.mat", "soil_init.mat"):
+            assert (Path(cell_config["InputPath"]) / fname).exists()
+
+    @patch("subprocess.Popen")
+    def test_run_exe_file(self, mocked_popen, model_with_setup):
+        mocked_popen.return_value.communicate.return_value = (b"log", "error")
+        mocked_popen.return_value.wait.return_value = 0
+
+        model, _ = model_with_setup
+        matlab_log_dir = os.environ.get("MATLAB_LOG_DIR")
+        result = model.run()
+
+        cell_configs = config_io.bbox_cell_configs(model.config)
+        called = sorted(
+            (call.args[0], call.kwargs["env"]["MATLAB_LOG_DIR"])
+            for call in mocked_popen.call_args_list
+        )
+        assert called == sorted(
+            (
+                [f"{model.exe_file} {config_io.bbox_cell_config_file(cell_config)}"],
+                cell_config["InputPath"],
+            )
+            for cell_config in cell_configs
+        )
+        # the environment of the process is not changed
+        assert os.environ.get("MATLAB_LOG_DIR") == matlab_log_dir
+        assert result == "\n".join(4 * ["log"])
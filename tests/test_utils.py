@@ -114,6 +114,29 @@ class TestLocation:
         with pytest.raises(NotImplementedError):
             utils.check_location_fmt(coordinates)
 
+    bbox_grids = [
+        # bbox, resolution, expected cell centers
+        (
+            ((52.0, 4.0), (52.2, 4.1)),
+            0.1,
+            [(52.05, 4.05), (52.15, 4.05)],
+        ),
+        # the corners may be given in any order, and the edges are included
+        (
+            ((-0.25, 0.25), (-0.75, -0.25)),
+            0.5,
+            [(-0.75, -0.25), (-0.75, 0.25), (-0.25, -0.25), (-0.25, 0.25)],
+        ),
+    ]
+
+    @pytest.mark.parametrize("bbox, resolution, expected", bbox_grids)
+    def test_bbox_grid_cells(self, bbox, resolution, expected):
+        assert utils.bbox_grid_cells(bbox, resolution) == expected
+
+    def test_bbox_grid_cells_empty(self):
+        with pytest.raises(ValueError, match="does not contain the center"):
+            utils.bbox_grid_cells(((52.01, 4.01), (52.02, 4.02)), 0.1)
+
 
 class TestTime:
     @pytest.fixture